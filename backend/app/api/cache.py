@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from flask import Response, make_response, request
+
+from app.db.duckdb_client import current_build
+
+
+@dataclass
+class _Entry:
+    body: bytes
+    status: int
+    mimetype: str
+    expires_at: float
+    size: int
+
+
+class ResponseCache:
+    """
+    Bounded LRU + TTL cache of serialized JSON responses.
+
+    Entries belong to one database build, so a newly published build never
+    serves stale data: the first lookup against a new build drops everything
+    cached for the previous one. Builds are ordered by their pool generation,
+    and only a newer one switches the cache: a request still reading the
+    previous build misses and caches nothing instead of flipping it back.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self._build_id: str | None = None
+        self._generation = -1
+        self._bytes = 0
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def _switch_build(self, build_id: str, generation: int) -> bool:
+        """Whether entries for this build may be served; caller holds self._lock."""
+        if generation < self._generation:
+            return False
+        if generation > self._generation:
+            if self._entries:
+                self._counters["invalidations"] += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._build_id = build_id
+            self._generation = generation
+        return True
+
+    def _pop(self, key: tuple) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def get(self, key: tuple, build_id: str, generation: int) -> _Entry | None:
+        with self._lock:
+            entry = self._entries.get(key) if self._switch_build(build_id, generation) else None
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._pop(key)
+                self._counters["expired"] += 1
+                entry = None
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry
+
+    def put(self, key: tuple, generation: int, body: bytes, status: int, mimetype: str) -> None:
+        size = len(body) + sum(len(str(part)) for part in key)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return  # a newer build landed while this response was rendered
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = _Entry(body, status, mimetype, time.monotonic() + self.ttl_seconds, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+                self._counters["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "enabled": self.enabled,
+                "build_id": self._build_id,
+                "generation": self._generation,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else None,
+                **self._counters,
+            }
+
+
+_cache: ResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache, created lazily so backend/.env is loaded first."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(
+                max_entries=int(os.getenv("API_CACHE_MAX_ENTRIES", "1024")),
+                max_bytes=int(os.getenv("API_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+                ttl_seconds=float(os.getenv("API_CACHE_TTL_SECONDS", "3600")),
+            )
+        return _cache
+
+
+def cache_stats() -> dict:
+    return get_response_cache().stats()
+
+
+def _cache_key() -> tuple:
+    # The raw values, as the routes read them: "?date=" or "?limit= 5" may answer
+    # differently from no value at all. Only the parameter order is normalized;
+    # repeated values keep theirs, since request.args.get() reads the first.
+    args = tuple(sorted((k, tuple(request.args.getlist(k))) for k in request.args))
+    return (request.path, args)
+
+
+def cached_response(view):
+    """Serve successful GET responses of `view` from the response cache."""
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        cache = get_response_cache()
+        if not cache.enabled:
+            return view(*args, **kwargs)
+
+        generation, build_id = current_build()
+        key = _cache_key()
+        hit = cache.get(key, build_id, generation)
+        if hit is not None:
+            resp = Response(hit.body, status=hit.status, mimetype=hit.mimetype)
+            resp.headers["X-Cache"] = "HIT"
+            return resp
+
+        resp = make_response(view(*args, **kwargs))
+        if resp.status_code == 200 and not resp.is_streamed:
+            cache.put(key, generation, resp.get_data(), resp.status_code, resp.mimetype)
+        resp.headers["X-Cache"] = "MISS"
+        return resp
+
+    return wrapper
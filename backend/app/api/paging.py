@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+
+from app.api.serialize import Rows
+
+
+class Keyset:
+    """
+    Keyset (seek) pagination over a fixed sort order.
+
+    `keys` are (sql expression, "ASC" | "DESC") pairs over non-null values; the
+    last one must make the order unique (e.g. video_id), so a page boundary is
+    one exact position. Each key is selected as a hidden `_cursor_<i>` column,
+    and the next page starts strictly after the last row's key values, so deep
+    pages cost the same as the first one (no OFFSET).
+    """
+
+    def __init__(self, *keys: tuple[str, str]):
+        self.keys = keys
+        self.columns = tuple(f"_cursor_{i}" for i in range(len(keys)))
+
+    def select_sql(self) -> str:
+        return ", ".join(f"{expr} AS {col}" for (expr, _), col in zip(self.keys, self.columns))
+
+    def order_sql(self) -> str:
+        return ", ".join(f"{expr} {direction}" for expr, direction in self.keys)
+
+    def after_sql(self, after: list | None) -> tuple[str, list]:
+        """Predicate (+ params) for rows sorting strictly after `after`."""
+        if after is None:
+            return "TRUE", []
+
+        # (k0 > v0) OR (k0 = v0 AND k1 > v1) OR ...; the leading k0 >= v0 conjunct
+        # is a plain range the optimizer can push into the scan
+        ops = [">" if direction == "ASC" else "<" for _, direction in self.keys]
+        branches, params = [], []
+        for i, ((expr, _), op) in enumerate(zip(self.keys, ops)):
+            equal = [f"{e} = ?" for e, _ in self.keys[:i]]
+            branches.append("(" + " AND ".join([*equal, f"{expr} {op} ?"]) + ")")
+            params += [*after[:i], after[i]]
+        first = self.keys[0][0]
+        return f"({first} {ops[0]}= ? AND ({' OR '.join(branches)}))", [after[0], *params]
+
+    def paginate(self, sql: str, params: list, after: list | None, limit: int | None) -> tuple[str, list]:
+        """
+        Wrap an unordered query whose output columns the keys refer to: adds the
+        hidden cursor columns, the seek predicate, the order and the limit (None = all rows).
+        """
+        where, where_params = self.after_sql(after)
+        return (
+            f"""
+            SELECT *, {self.select_sql()}
+            FROM ({sql})
+            WHERE {where}
+            ORDER BY {self.order_sql()}
+            LIMIT ?
+            """,
+            [*params, *where_params, limit],
+        )
+
+    def parse(self, token: str | None) -> list | None:
+        """Decode a next_cursor token; raises ValueError if it is malformed."""
+        if not token:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ValueError("invalid cursor") from e
+        if (
+            not isinstance(values, list)
+            or len(values) != len(self.keys)
+            or not all(isinstance(v, (str, int, float)) and not isinstance(v, bool) for v in values)
+        ):
+            raise ValueError("invalid cursor")
+        return values
+
+    def next_cursor(self, rows: Rows, limit: int) -> str | None:
+        """Token for the page after `rows`, or None if this was the last page."""
+        if rows.count < limit or rows.last is None:
+            return None
+        text = json.dumps(rows.last, separators=(",", ":"))
+        return base64.urlsafe_b64encode(text.encode()).decode().rstrip("=")
@@ -1,20 +1,23 @@
 from __future__ import annotations
 
-import re
 from flask import Blueprint, request, jsonify
+from app.api.cache import cached_response
+from app.api.paging import Keyset
+from app.api.search import candidate_rows, match_rank_sql, search_candidates
+from app.api.serialize import fetch_rows, json_response, stream_ndjson
+from app.db.catalog import country_slug, get_catalog
 from app.db.duckdb_client import get_conn
+from app.db.video_history import get_video_history
+from app.tag_normalize import normalize_tag
 
 api_bp = Blueprint("api", __name__)
 
+US = "United States"
+
 
 # -------------------------
 # Helpers
 # -------------------------
-def _rows_to_dicts(cur):
-    cols = [c[0] for c in cur.description]
-    return [dict(zip(cols, row)) for row in cur.fetchall()]
-
-
 def _normalize_month_str(m: str | None) -> str | None:
     """Accept 'YYYY-MM-01' or ISO datetime; return 'YYYY-MM-01'."""
     if not m:
@@ -25,15 +28,6 @@ def _normalize_month_str(m: str | None) -> str | None:
     return m
 
 
-def _normalize_tag_str(tag: str) -> str:
-    """Match cleaning rules: lowercase, trim, collapse spaces, strip leading # and quotes."""
-    t = tag.strip().lower()
-    t = re.sub(r"^#+", "", t)
-    t = re.sub(r"\s+", " ", t).strip()
-    t = t.strip('"').strip("'")
-    return t
-
-
 def _table_exists(con, table_name: str) -> bool:
     row = con.execute(
         """
@@ -47,31 +41,102 @@ def _table_exists(con, table_name: str) -> bool:
     return row is not None
 
 
-def _resolve_us_date(con, date: str | None) -> str:
+def _page_args(keyset: Keyset, default_limit: str, max_limit: int) -> tuple[int | None, list | None, bool]:
+    """
+    (limit, cursor values, stream) from ?limit=, ?cursor= and ?format=json|ndjson.
+
+    JSON pages are capped at max_limit. NDJSON streams are not capped and
+    return every remaining row when no limit is given.
+    Raises ValueError with a message suitable for a 400 response.
+    """
+    fmt = (request.args.get("format") or "json").lower()
+    if fmt not in ("json", "ndjson"):
+        raise ValueError("format must be json or ndjson")
+    stream = fmt == "ndjson"
+
+    limit_raw = request.args.get("limit")
+    if stream and not limit_raw:
+        limit = None
+    else:
+        try:
+            limit = int(limit_raw or default_limit)
+        except ValueError:
+            raise ValueError("limit must be an integer") from None
+        limit = max(1, limit) if stream else max(1, min(limit, max_limit))
+
+    return limit, keyset.parse(request.args.get("cursor")), stream
+
+
+def _page_response(keyset: Keyset, sql: str, params: list, limit: int | None, stream: bool, envelope: dict, key: str = "results"):
+    """Run a keyset-paginated query as a JSON page (with next_cursor) or an NDJSON stream."""
+    if stream:
+        return stream_ndjson(sql, params, keyset.columns)
+
+    with get_conn() as con:
+        rows = fetch_rows(con.execute(sql, params), keyset.columns)
+
+    return json_response({**envelope, "count": len(rows), key: rows, "next_cursor": keyset.next_cursor(rows, limit)})
+
+
+def _without_columns(keyset: Keyset, page_sql: str, *columns: str) -> str:
+    """
+    Drop columns that are only there to seek on (e.g. a precomputed rank) from a
+    paginated query, keeping its keyset order.
+    """
+    order = ", ".join(f"{col} {direction}" for col, (_, direction) in zip(keyset.columns, keyset.keys))
+    return f"SELECT * EXCLUDE ({', '.join(columns)}) FROM ({page_sql}) ORDER BY {order}"
+
+
+def _resolve_country(segment: str) -> str | None:
+    """Country name for a /api/<country>/ route segment ('united-states', 'United States' or 'us')."""
+    return get_catalog().country(segment)
+
+
+def _unknown_country(segment: str):
+    return jsonify({"error": f"Unknown country: {segment}"}), 404
+
+
+def _resolve_date(country: str, date: str | None) -> str | None:
     if date:
         return date
-    latest = con.execute(
-        """
-        SELECT CAST(max(video_trending_date) AS VARCHAR)
-        FROM trending
-        WHERE video_trending_country='United States'
-        """
-    ).fetchone()[0]
-    return latest
+    return get_catalog().latest(country, "date")
 
 
-def _resolve_month_clean(con, month: str | None) -> str | None:
+def _resolve_month_clean(country: str, month: str | None) -> str | None:
     month = _normalize_month_str(month)
     if month:
         return month
-    latest = con.execute(
-        """
-        SELECT CAST(month AS VARCHAR) AS month
-        FROM v_us_tag_months_clean
-        LIMIT 1
-        """
-    ).fetchone()
-    return latest[0] if latest else None
+    return get_catalog().latest(country, "tag_month")
+
+
+# Leaderboard pages seek on rank_views (views order, ties broken by video_id)
+_LEADERBOARD_KEYSET = Keyset(("rank_views", "ASC"))
+
+
+def _leaderboard_page(country: str, date: str, columns: str, limit: int | None, after: list | None, stream: bool, envelope: dict):
+    """
+    One page of a (country, date) leaderboard in views order. rank_views is a
+    dense 1..n row number, so a page is the rank range (after, after + limit].
+    """
+    keyset = _LEADERBOARD_KEYSET
+    start = after[0] if after else 0
+    if not isinstance(start, int):
+        return jsonify({"error": "invalid cursor"}), 400
+
+    sql = f"""
+        SELECT
+          {columns},
+          {keyset.select_sql()}
+        FROM daily_leaderboard
+        WHERE country = ?
+          AND date = CAST(? AS DATE)
+          AND rank_views > ?
+          AND rank_views <= coalesce(?, rank_views)
+        ORDER BY {keyset.order_sql()}
+    """
+    params = [country, date, start, None if limit is None else start + limit]
+
+    return _page_response(keyset, sql, params, limit, stream, envelope)
 
 
 # -------------------------
@@ -89,125 +154,116 @@ def countries():
       ORDER BY country
     """
     with get_conn() as con:
-        cur = con.execute(sql)
-        data = _rows_to_dicts(cur)
-    return jsonify(data)
+        rows = con.execute(sql).fetchall()
+    data = [
+        {"country": c, "slug": country_slug(c), "min_date": lo, "max_date": hi, "rows": n}
+        for c, lo, hi, n in rows
+        if c is not None
+    ]
+    return json_response(data)
 
 
 @api_bp.get("/trending")
 def trending():
-    country = request.args.get("country")
-    if not country:
+    country_raw = request.args.get("country")
+    if not country_raw:
         return jsonify({"error": "Missing required query param: country"}), 400
 
-    limit_raw = request.args.get("limit", "50")
     try:
-        limit = max(1, min(int(limit_raw), 200))
-    except ValueError:
-        return jsonify({"error": "limit must be an integer"}), 400
+        limit, after, stream = _page_args(_LEADERBOARD_KEYSET, "50", 200)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
+    country = _resolve_country(country_raw) or country_raw
     date = request.args.get("date")  # optional YYYY-MM-DD
 
-    with get_conn() as con:
+    if not date:
+        date = get_catalog().latest(country, "date")
         if not date:
-            date = con.execute(
-                """
-                SELECT CAST(max(video_trending_date) AS VARCHAR)
-                FROM trending
-                WHERE video_trending_country = ?
-                """,
-                [country],
-            ).fetchone()[0]
+            return jsonify({"error": f"No data found for country={country_raw}"}), 404
 
-            if not date:
-                return jsonify({"error": f"No data found for country={country}"}), 404
-
-        cur = con.execute(
-            """
-            SELECT
-              video_id,
-              video_title,
-              channel_title,
-              video_default_thumbnail,
-              video_category_id,
-              CAST(video_published_at AS VARCHAR) AS video_published_at,
-              CAST(video_trending_date AS VARCHAR) AS video_trending_date,
-              video_view_count,
-              video_like_count,
-              video_comment_count
-            FROM trending
-            WHERE video_trending_country = ?
-              AND video_trending_date = CAST(? AS DATE)
-            ORDER BY video_view_count DESC NULLS LAST
-            LIMIT ?
-            """,
-            [country, date, limit],
-        )
-
-        rows = _rows_to_dicts(cur)
-
-    return jsonify({"country": country, "date": date, "limit": limit, "count": len(rows), "results": rows})
+    return _leaderboard_page(
+        country,
+        date,
+        """
+          video_id,
+          video_title,
+          channel_title,
+          video_default_thumbnail,
+          video_category_id,
+          CAST(video_published_at AS VARCHAR) AS video_published_at,
+          CAST(date AS VARCHAR) AS video_trending_date,
+          video_view_count,
+          video_like_count,
+          video_comment_count
+        """,
+        limit,
+        after,
+        stream,
+        {"country": country, "date": date, "limit": limit},
+    )
 
 
 # -------------------------
-# US dashboard endpoints (current MVP)
+# Per-country dashboard endpoints: /api/<country>/...
+# <country> is a slug from /api/countries ("united-states"), the country name,
+# or "us" (the original US-only routes). Response field names ending in _us are
+# kept from the US-only API and refer to the requested country.
 # -------------------------
-@api_bp.get("/us/dates")
-def us_dates():
-    with get_conn() as con:
-        rows = con.execute(
-            """
-            SELECT CAST(video_trending_date AS VARCHAR) AS date
-            FROM v_us_dates
-            LIMIT 4000
-            """
-        ).fetchall()
-    return jsonify([r[0] for r in rows])
+@api_bp.get("/<country>/dates")
+@cached_response
+def country_dates(country: str):
+    name = _resolve_country(country)
+    if not name:
+        return _unknown_country(country)
+    return jsonify(get_catalog().values(name, "date")[:4000])
+
+
+@api_bp.get("/<country>/trending")
+@cached_response
+def country_trending(country: str):
+    name = _resolve_country(country)
+    if not name:
+        return _unknown_country(country)
 
-
-@api_bp.get("/us/trending")
-def us_trending():
-    limit_raw = request.args.get("limit", "200")
     try:
-        limit = max(1, min(int(limit_raw), 200))
-    except ValueError:
-        return jsonify({"error": "limit must be an integer"}), 400
+        limit, after, stream = _page_args(_LEADERBOARD_KEYSET, "200", 200)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     date = request.args.get("date")
 
-    with get_conn() as con:
-        date = _resolve_us_date(con, date)
-        if not date:
-            return jsonify({"error": "No US data found"}), 404
-
-        cur = con.execute(
-            """
-            SELECT
-              t.video_id,
-              d.video_title,
-              d.channel_title,
-              d.video_default_thumbnail,
-              t.video_view_count,
-              t.video_like_count,
-              t.video_comment_count,
-              CAST(t.video_trending_date AS VARCHAR) AS video_trending_date
-            FROM trending t
-            JOIN video_dim d USING (video_id)
-            WHERE t.video_trending_country='United States'
-              AND t.video_trending_date = CAST(? AS DATE)
-            ORDER BY t.video_view_count DESC NULLS LAST
-            LIMIT ?
-            """,
-            [date, limit],
-        )
+    date = _resolve_date(name, date)
+    if not date:
+        return jsonify({"error": f"No {name} data found"}), 404
 
-        data = _rows_to_dicts(cur)
+    return _leaderboard_page(
+        name,
+        date,
+        """
+          video_id,
+          video_title,
+          channel_title,
+          video_default_thumbnail,
+          video_view_count,
+          video_like_count,
+          video_comment_count,
+          CAST(date AS VARCHAR) AS video_trending_date
+        """,
+        limit,
+        after,
+        stream,
+        {"country": name, "date": date},
+    )
 
-    return jsonify({"country": "United States", "date": date, "count": len(data), "results": data})
 
+@api_bp.get("/<country>/top")
+@cached_response
+def country_top(country: str):
+    name = _resolve_country(country)
+    if not name:
+        return _unknown_country(country)
 
-@api_bp.get("/us/top")
-def us_top():
     metric = request.args.get("metric", "views")  # views | likes
     date = request.args.get("date")
 
@@ -220,41 +276,45 @@ def us_top():
     if metric not in ("views", "likes"):
         return jsonify({"error": "metric must be views or likes"}), 400
 
-    order_col = "video_view_count" if metric == "views" else "video_like_count"
+    rank_col = "rank_views" if metric == "views" else "rank_likes"
 
-    with get_conn() as con:
-        date = _resolve_us_date(con, date)
-        if not date:
-            return jsonify({"error": "No US data found"}), 404
+    date = _resolve_date(name, date)
+    if not date:
+        return jsonify({"error": f"No {name} data found"}), 404
 
+    with get_conn() as con:
         cur = con.execute(
             f"""
             SELECT
-              t.video_id,
-              d.video_title,
-              d.channel_title,
-              d.video_default_thumbnail,
-              t.video_view_count,
-              t.video_like_count,
-              t.video_comment_count,
-              CAST(t.video_trending_date AS VARCHAR) AS video_trending_date
-            FROM trending t
-            JOIN video_dim d USING (video_id)
-            WHERE t.video_trending_country='United States'
-              AND t.video_trending_date = CAST(? AS DATE)
-            ORDER BY t.{order_col} DESC NULLS LAST
-            LIMIT ?
+              video_id,
+              video_title,
+              channel_title,
+              video_default_thumbnail,
+              video_view_count,
+              video_like_count,
+              video_comment_count,
+              CAST(date AS VARCHAR) AS video_trending_date
+            FROM daily_leaderboard
+            WHERE country = ?
+              AND date = CAST(? AS DATE)
+              AND {rank_col} <= ?
+            ORDER BY {rank_col}
             """,
-            [date, limit],
+            [name, date, limit],
         )
 
-        data = _rows_to_dicts(cur)
+        data = fetch_rows(cur)
+
+    return json_response({"country": name, "date": date, "metric": metric, "count": len(data), "results": data})
 
-    return jsonify({"country": "United States", "date": date, "metric": metric, "count": len(data), "results": data})
 
+@api_bp.get("/<country>/top_advanced")
+@cached_response
+def country_top_advanced(country: str):
+    name = _resolve_country(country)
+    if not name:
+        return _unknown_country(country)
 
-@api_bp.get("/us/top_advanced")
-def us_top_advanced():
     metric = request.args.get("metric", "stickiness")  # stickiness | reach
     date = request.args.get("date")
 
@@ -267,58 +327,52 @@ def us_top_advanced():
     if metric not in ("stickiness", "reach"):
         return jsonify({"error": "metric must be stickiness or reach"}), 400
 
-    with get_conn() as con:
-        date = _resolve_us_date(con, date)
-        if not date:
-            return jsonify({"error": "No US data found"}), 404
+    date = _resolve_date(name, date)
+    if not date:
+        return jsonify({"error": f"No {name} data found"}), 404
 
+    with get_conn() as con:
         if metric == "stickiness":
             sql = """
               SELECT
-                t.video_id,
-                d.video_title,
-                d.channel_title,
-                d.video_default_thumbnail,
-                s.days_trended_us,
-                t.video_view_count,
-                t.video_like_count,
-                t.video_comment_count,
-                CAST(t.video_trending_date AS VARCHAR) AS video_trending_date
-              FROM trending t
-              JOIN video_dim d USING (video_id)
-              LEFT JOIN video_us_stickiness s USING (video_id)
-              WHERE t.video_trending_country='United States'
-                AND t.video_trending_date = CAST(? AS DATE)
-              ORDER BY s.days_trended_us DESC NULLS LAST,
-                       t.video_view_count DESC NULLS LAST
-              LIMIT ?
+                video_id,
+                video_title,
+                channel_title,
+                video_default_thumbnail,
+                days_trended AS days_trended_us,
+                video_view_count,
+                video_like_count,
+                video_comment_count,
+                CAST(date AS VARCHAR) AS video_trending_date
+              FROM daily_leaderboard
+              WHERE country = ?
+                AND date = CAST(? AS DATE)
+                AND rank_stickiness <= ?
+              ORDER BY rank_stickiness
             """
         else:
             sql = """
               SELECT
-                t.video_id,
-                d.video_title,
-                d.channel_title,
-                d.video_default_thumbnail,
-                r.countries_count,
-                t.video_view_count,
-                t.video_like_count,
-                t.video_comment_count,
-                CAST(t.video_trending_date AS VARCHAR) AS video_trending_date
-              FROM trending t
-              JOIN video_dim d USING (video_id)
-              LEFT JOIN video_reach r USING (video_id)
-              WHERE t.video_trending_country='United States'
-                AND t.video_trending_date = CAST(? AS DATE)
-              ORDER BY r.countries_count DESC NULLS LAST,
-                       t.video_view_count DESC NULLS LAST
-              LIMIT ?
+                video_id,
+                video_title,
+                channel_title,
+                video_default_thumbnail,
+                countries_count,
+                video_view_count,
+                video_like_count,
+                video_comment_count,
+                CAST(date AS VARCHAR) AS video_trending_date
+              FROM daily_leaderboard
+              WHERE country = ?
+                AND date = CAST(? AS DATE)
+                AND rank_reach <= ?
+              ORDER BY rank_reach
             """
 
-        cur = con.execute(sql, [date, limit])
-        data = _rows_to_dicts(cur)
+        cur = con.execute(sql, [name, date, limit])
+        data = fetch_rows(cur)
 
-    return jsonify({"country": "United States", "date": date, "metric": metric, "count": len(data), "results": data})
+    return json_response({"country": name, "date": date, "metric": metric, "count": len(data), "results": data})
 
 
 # -------------------------
@@ -326,77 +380,34 @@ def us_top_advanced():
 # -------------------------
 @api_bp.get("/video/<video_id>")
 def video_detail(video_id: str):
-    country = request.args.get("country", "United States")
-
-    with get_conn() as con:
-        meta_cur = con.execute(
-            """
-            SELECT
-              d.video_id,
-              d.video_title,
-              d.channel_id,
-              d.channel_title,
-              d.video_default_thumbnail,
-              d.video_category_id,
-              d.video_duration,
-              d.video_definition,
-              r.countries_count,
-              s.days_trended_us,
-              CAST(s.first_trending_us AS VARCHAR) AS first_trending_us,
-              CAST(s.last_trending_us AS VARCHAR) AS last_trending_us
-            FROM video_dim d
-            LEFT JOIN video_reach r USING (video_id)
-            LEFT JOIN video_us_stickiness s USING (video_id)
-            WHERE d.video_id = ?
-            """,
-            [video_id],
-        )
-        meta = meta_cur.fetchone()
-        if not meta:
-            return jsonify({"error": "video_id not found"}), 404
-
-        meta_cols = [c[0] for c in meta_cur.description]
-        meta_dict = dict(zip(meta_cols, meta))
+    country_raw = request.args.get("country", "United States")
+    country = _resolve_country(country_raw) or country_raw
 
-        hist_cur = con.execute(
-            """
-            SELECT
-              CAST(video_trending_date AS VARCHAR) AS date,
-              video_view_count,
-              video_like_count,
-              video_comment_count
-            FROM trending
-            WHERE video_id = ?
-              AND video_trending_country = ?
-            ORDER BY video_trending_date ASC
-            """,
-            [video_id, country],
-        )
-        history = _rows_to_dicts(hist_cur)
+    # One row of video_history, usually already in memory for popular videos
+    entry = get_video_history(video_id)
+    if entry is None:
+        return jsonify({"error": "video_id not found"}), 404
 
-        spread_cur = con.execute(
-            """
-            SELECT
-              video_trending_country AS country,
-              COUNT(DISTINCT video_trending_date) AS days
-            FROM trending
-            WHERE video_id = ?
-            GROUP BY 1
-            ORDER BY days DESC
-            LIMIT 20
-            """,
-            [video_id],
-        )
-        spread = _rows_to_dicts(spread_cur)
-
-    return jsonify({"video": meta_dict, "country": country, "history": history, "country_spread_top20": spread})
+    return json_response(
+        {
+            "video": entry.video,
+            "country": country,
+            "history": entry.history.get(country, []),
+            "country_spread_top20": entry.spread[:20],
+        }
+    )
 
 
 # -------------------------
 # Channels
 # -------------------------
-@api_bp.get("/us/channels/daily")
-def us_channels_daily():
+@api_bp.get("/<country>/channels/daily")
+@cached_response
+def country_channels_daily(country: str):
+    name = _resolve_country(country)
+    if not name:
+        return _unknown_country(country)
+
     date = request.args.get("date")
     limit_raw = request.args.get("limit", "20")
     try:
@@ -404,16 +415,9 @@ def us_channels_daily():
     except ValueError:
         return jsonify({"error": "limit must be an integer"}), 400
 
-    with get_conn() as con:
-        if not date:
-            date = con.execute(
-                """
-                SELECT CAST(max(video_trending_date) AS VARCHAR)
-                FROM trending
-                WHERE video_trending_country='United States'
-                """
-            ).fetchone()[0]
+    date = _resolve_date(name, date)
 
+    with get_conn() as con:
         cur = con.execute(
             """
             SELECT
@@ -425,23 +429,30 @@ def us_channels_daily():
               d.sum_likes,
               d.sum_comments,
               CAST(d.date AS VARCHAR) AS date
-            FROM channel_us_daily d
+            FROM channel_daily d
             LEFT JOIN channel_dim c USING (channel_id)
-            WHERE d.date = CAST(? AS DATE)
+            WHERE d.country = ?
+              AND d.date = CAST(? AS DATE)
             ORDER BY d.distinct_videos DESC NULLS LAST,
-                     d.sum_views DESC NULLS LAST
+                     d.sum_views DESC NULLS LAST,
+                     d.channel_id
             LIMIT ?
             """,
-            [date, limit],
+            [name, date, limit],
         )
 
-        data = _rows_to_dicts(cur)
+        data = fetch_rows(cur)
+
+    return json_response({"country": name, "date": date, "count": len(data), "results": data})
 
-    return jsonify({"country": "United States", "date": date, "count": len(data), "results": data})
 
+@api_bp.get("/<country>/channels/alltime")
+@cached_response
+def country_channels_alltime(country: str):
+    name = _resolve_country(country)
+    if not name:
+        return _unknown_country(country)
 
-@api_bp.get("/us/channels/alltime")
-def us_channels_alltime():
     limit_raw = request.args.get("limit", "20")
     try:
         limit = max(1, min(int(limit_raw), 100))
@@ -461,27 +472,35 @@ def us_channels_alltime():
               a.sum_likes_alltime,
               CAST(a.first_date AS VARCHAR) AS first_date,
               CAST(a.last_date AS VARCHAR) AS last_date
-            FROM channel_us_alltime a
+            FROM channel_alltime a
             LEFT JOIN channel_dim c USING (channel_id)
+            WHERE a.country = ?
             ORDER BY a.distinct_videos_alltime DESC NULLS LAST,
-                     a.days_active DESC NULLS LAST
+                     a.days_active DESC NULLS LAST,
+                     a.channel_id
             LIMIT ?
             """,
-            [limit],
+            [name, limit],
         )
 
-        data = _rows_to_dicts(cur)
+        data = fetch_rows(cur)
+
+    return json_response({"country": name, "count": len(data), "results": data})
 
-    return jsonify({"country": "United States", "count": len(data), "results": data})
 
+@api_bp.get("/<country>/channel/<channel_id>")
+@cached_response
+def country_channel_detail(country: str, channel_id: str):
+    name = _resolve_country(country)
+    if not name:
+        return _unknown_country(country)
 
-@api_bp.get("/us/channel/<channel_id>")
-def us_channel_detail(channel_id: str):
-    limit_raw = request.args.get("limit", "200")
+    # Precomputed per (country, channel): days trended DESC, max views DESC, then video_id
+    keyset = Keyset(("page_rank", "ASC"),)
     try:
-        limit = max(1, min(int(limit_raw), 500))
-    except ValueError:
-        return jsonify({"error": "limit must be an integer"}), 400
+        limit, after, stream = _page_args(keyset, "200", 500)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     with get_conn() as con:
         meta_cur = con.execute(
@@ -499,10 +518,11 @@ def us_channel_detail(channel_id: str):
               a.sum_views_alltime,
               a.sum_likes_alltime
             FROM channel_dim c
-            LEFT JOIN channel_us_alltime a USING (channel_id)
+            LEFT JOIN channel_alltime a
+              ON a.country = ? AND a.channel_id = c.channel_id
             WHERE c.channel_id = ?
             """,
-            [channel_id],
+            [name, channel_id],
         )
         meta = meta_cur.fetchone()
         if not meta:
@@ -511,53 +531,43 @@ def us_channel_detail(channel_id: str):
         meta_cols = [c[0] for c in meta_cur.description]
         channel = dict(zip(meta_cols, meta))
 
-        cur = con.execute(
-            """
-            WITH vids AS (
-              SELECT
-                t.video_id,
-                COUNT(DISTINCT t.video_trending_date) AS days_trended_us,
-                MIN(t.video_trending_date) AS first_trending_us,
-                MAX(t.video_trending_date) AS last_trending_us,
-                MAX(t.video_view_count) AS max_views,
-                MAX(t.video_like_count) AS max_likes,
-                MAX(t.video_comment_count) AS max_comments
-              FROM trending t
-              WHERE t.video_trending_country='United States'
-                AND t.channel_id = ?
-              GROUP BY t.video_id
-            )
-            SELECT
-              v.video_id,
-              d.video_title,
-              d.video_default_thumbnail,
-              v.days_trended_us,
-              CAST(v.first_trending_us AS VARCHAR) AS first_trending_us,
-              CAST(v.last_trending_us AS VARCHAR) AS last_trending_us,
-              v.max_views AS video_view_count,
-              v.max_likes AS video_like_count,
-              v.max_comments AS video_comment_count,
-              r.countries_count
-            FROM vids v
-            JOIN video_dim d USING (video_id)
-            LEFT JOIN video_reach r USING (video_id)
-            ORDER BY v.days_trended_us DESC NULLS LAST,
-                     v.max_views DESC NULLS LAST
-            LIMIT ?
-            """,
-            [channel_id, limit],
-        )
-
-        videos = _rows_to_dicts(cur)
+    sql, params = keyset.paginate(
+        """
+        SELECT
+          video_id,
+          video_title,
+          video_default_thumbnail,
+          days_trended AS days_trended_us,
+          CAST(first_trending AS VARCHAR) AS first_trending_us,
+          CAST(last_trending AS VARCHAR) AS last_trending_us,
+          max_views AS video_view_count,
+          max_likes AS video_like_count,
+          max_comments AS video_comment_count,
+          countries_count,
+          page_rank
+        FROM channel_video_stats
+        WHERE country = ?
+          AND channel_id = ?
+        """,
+        [name, channel_id],
+        after,
+        limit,
+    )
+    sql = _without_columns(keyset, sql, "page_rank")
 
-    return jsonify({"channel": channel, "count": len(videos), "videos": videos})
+    return _page_response(keyset, sql, params, limit, stream, {"channel": channel}, key="videos")
 
 
 # -------------------------
-# US Search: videos + channels
+# Search: videos + channels
 # -------------------------
-@api_bp.get("/us/search/videos")
-def us_search_videos():
+@api_bp.get("/<country>/search/videos")
+@cached_response
+def country_search_videos(country: str):
+    name = _resolve_country(country)
+    if not name:
+        return _unknown_country(country)
+
     qtext = (request.args.get("q") or "").strip()
     if len(qtext) < 2:
         return jsonify({"error": "q must be at least 2 characters"}), 400
@@ -571,65 +581,79 @@ def us_search_videos():
     except ValueError:
         return jsonify({"error": "limit must be an integer"}), 400
 
+    # Matches are case-insensitive substrings, ranked title-prefix > word-prefix > anywhere,
+    # then by the scope's usual order. Scope "day" filters one leaderboard date (small);
+    # scope "all" narrows video_dim through the n-gram index first.
     with get_conn() as con:
         if scope == "day":
-            date = _resolve_us_date(con, date)
+            date = _resolve_date(name, date)
             cur = con.execute(
-                """
+                f"""
                 SELECT
-                  t.video_id,
-                  d.video_title,
-                  d.channel_id,
-                  d.channel_title,
-                  d.video_default_thumbnail,
-                  t.video_view_count,
-                  t.video_like_count,
-                  t.video_comment_count,
-                  CAST(t.video_trending_date AS VARCHAR) AS video_trending_date
-                FROM trending t
-                JOIN video_dim d USING (video_id)
-                WHERE t.video_trending_country = 'United States'
-                  AND t.video_trending_date = CAST(? AS DATE)
-                  AND d.video_title ILIKE '%' || ? || '%'
-                ORDER BY t.video_view_count DESC NULLS LAST
+                  video_id,
+                  video_title,
+                  channel_id,
+                  channel_title,
+                  video_default_thumbnail,
+                  video_view_count,
+                  video_like_count,
+                  video_comment_count,
+                  CAST(date AS VARCHAR) AS video_trending_date
+                FROM daily_leaderboard
+                WHERE country = ?
+                  AND date = CAST(? AS DATE)
+                  AND contains(lower(video_title), lower(?))
+                ORDER BY {match_rank_sql("video_title")},
+                         rank_views
                 LIMIT ?
                 """,
-                [date, qtext, limit],
+                [name, date, qtext, qtext, qtext, limit],
             )
         elif scope == "all":
+            ids = search_candidates(con, "video", qtext, name)
+            source, source_params = candidate_rows("video_dim", "video_id", ids)
+            sticky, sticky_params = candidate_rows("video_stickiness", "video_id", ids, "country = ?", [name])
             cur = con.execute(
-                """
+                f"""
+                WITH d AS {source},
+                s AS {sticky}
                 SELECT
                   d.video_id,
                   d.video_title,
                   d.channel_id,
                   d.channel_title,
                   d.video_default_thumbnail,
-                  s.days_trended_us,
-                  CAST(s.first_trending_us AS VARCHAR) AS first_trending_us,
-                  CAST(s.last_trending_us AS VARCHAR) AS last_trending_us,
+                  s.days_trended AS days_trended_us,
+                  CAST(s.first_trending AS VARCHAR) AS first_trending_us,
+                  CAST(s.last_trending AS VARCHAR) AS last_trending_us,
                   r.countries_count
-                FROM video_dim d
-                JOIN video_us_stickiness s USING (video_id)
-                LEFT JOIN video_reach r USING (video_id)
-                WHERE d.video_title ILIKE '%' || ? || '%'
-                ORDER BY s.days_trended_us DESC NULLS LAST,
-                         s.last_trending_us DESC NULLS LAST
+                FROM d
+                JOIN s USING (video_id)
+                LEFT JOIN video_reach r ON r.video_id = d.video_id
+                WHERE contains(lower(d.video_title), lower(?))
+                ORDER BY {match_rank_sql("d.video_title")},
+                         s.days_trended DESC NULLS LAST,
+                         s.last_trending DESC NULLS LAST
                 LIMIT ?
                 """,
-                [qtext, limit],
+                [*source_params, *sticky_params, qtext, qtext, qtext, limit],
             )
             date = None
         else:
             return jsonify({"error": "scope must be day or all"}), 400
 
-        data = _rows_to_dicts(cur)
+        data = fetch_rows(cur)
+
+    return json_response({"q": qtext, "scope": scope, "date": date, "limit": limit, "count": len(data), "results": data})
 
-    return jsonify({"q": qtext, "scope": scope, "date": date, "limit": limit, "count": len(data), "results": data})
 
+@api_bp.get("/<country>/search/channels")
+@cached_response
+def country_search_channels(country: str):
+    name = _resolve_country(country)
+    if not name:
+        return _unknown_country(country)
 
-@api_bp.get("/us/search/channels")
-def us_search_channels():
     qtext = (request.args.get("q") or "").strip()
     if len(qtext) < 2:
         return jsonify({"error": "q must be at least 2 characters"}), 400
@@ -643,313 +667,293 @@ def us_search_channels():
     except ValueError:
         return jsonify({"error": "limit must be an integer"}), 400
 
+    # Same matching and ranking as /<country>/search/videos, on channel title or id
     with get_conn() as con:
         if scope == "day":
-            date = _resolve_us_date(con, date)
+            date = _resolve_date(name, date)
             cur = con.execute(
-                """
+                f"""
                 SELECT
-                  d.channel_id,
-                  max(d.channel_title) AS channel_title,
-                  count(DISTINCT t.video_id) AS distinct_videos,
-                  sum(t.video_view_count) AS sum_views,
-                  sum(t.video_like_count) AS sum_likes,
-                  sum(t.video_comment_count) AS sum_comments
-                FROM trending t
-                JOIN video_dim d USING (video_id)
-                WHERE t.video_trending_country = 'United States'
-                  AND t.video_trending_date = CAST(? AS DATE)
+                  channel_id,
+                  max(channel_title) AS channel_title,
+                  count(DISTINCT video_id) AS distinct_videos,
+                  sum(video_view_count) AS sum_views,
+                  sum(video_like_count) AS sum_likes,
+                  sum(video_comment_count) AS sum_comments
+                FROM daily_leaderboard
+                WHERE country = ?
+                  AND date = CAST(? AS DATE)
                   AND (
-                    d.channel_title ILIKE '%' || ? || '%'
-                    OR d.channel_id ILIKE '%' || ? || '%'
+                    contains(lower(channel_title), lower(?))
+                    OR contains(lower(channel_id), lower(?))
                   )
                 GROUP BY 1
-                ORDER BY distinct_videos DESC, sum_views DESC
+                ORDER BY {match_rank_sql("max(channel_title)")},
+                         distinct_videos DESC, sum_views DESC
                 LIMIT ?
                 """,
-                [date, qtext, qtext, limit],
+                [name, date, qtext, qtext, qtext, qtext, limit],
             )
         elif scope == "all":
+            source, source_params = candidate_rows(
+                "video_dim", "channel_id", search_candidates(con, "channel", qtext, name)
+            )
             cur = con.execute(
-                """
+                f"""
+                WITH d AS {source}
                 SELECT
                   d.channel_id,
                   max(d.channel_title) AS channel_title,
                   count(*) AS distinct_videos_alltime,
-                  sum(s.days_trended_us) AS total_days_trended_us,
-                  CAST(min(s.first_trending_us) AS VARCHAR) AS first_trending_us,
-                  CAST(max(s.last_trending_us) AS VARCHAR) AS last_trending_us
-                FROM video_dim d
-                JOIN video_us_stickiness s USING (video_id)
+                  sum(s.days_trended) AS total_days_trended_us,
+                  CAST(min(s.first_trending) AS VARCHAR) AS first_trending_us,
+                  CAST(max(s.last_trending) AS VARCHAR) AS last_trending_us
+                FROM d
+                JOIN video_stickiness s
+                  ON s.country = ? AND s.video_id = d.video_id
                 WHERE (
-                  d.channel_title ILIKE '%' || ? || '%'
-                  OR d.channel_id ILIKE '%' || ? || '%'
+                  contains(lower(d.channel_title), lower(?))
+                  OR contains(lower(d.channel_id), lower(?))
                 )
                 GROUP BY 1
-                ORDER BY distinct_videos_alltime DESC, total_days_trended_us DESC
+                ORDER BY {match_rank_sql("max(d.channel_title)")},
+                         distinct_videos_alltime DESC, total_days_trended_us DESC
                 LIMIT ?
                 """,
-                [qtext, qtext, limit],
+                [*source_params, name, qtext, qtext, qtext, qtext, limit],
             )
             date = None
         else:
             return jsonify({"error": "scope must be day or all"}), 400
 
-        data = _rows_to_dicts(cur)
+        data = fetch_rows(cur)
 
-    return jsonify({"q": qtext, "scope": scope, "date": date, "limit": limit, "count": len(data), "results": data})
+    return json_response({"q": qtext, "scope": scope, "date": date, "limit": limit, "count": len(data), "results": data})
 
 
 # ----------------------------
-# US Monthly Tag Analytics (CLEANED)
+# Monthly Tag Analytics (CLEANED), per country
 # Tables / views created by: backend/scripts/create_tag_clean_analytics.py
-# - us_tag_events_clean
-# - us_tag_monthly_clean
-# - v_us_tag_months_clean
+# - tag_dim
+# - tag_events_clean
+# - tag_monthly_clean
+# - tag_monthly_by_tag
+# - tag_movers_clean
+# - tag_video_stats_clean
+# - v_tag_months_clean
 # ----------------------------
-@api_bp.get("/us/tags/months")
-def us_tag_months():
-    with get_conn() as con:
-        rows = con.execute(
-            """
-            SELECT CAST(month AS VARCHAR) AS month
-            FROM v_us_tag_months_clean
-            ORDER BY month DESC
-            """
-        ).fetchall()
-    return jsonify([r[0] for r in rows])
-
-
-@api_bp.get("/us/tags/top")
-def us_tags_top():
-    month = request.args.get("month")  # YYYY-MM-01
-    limit_raw = request.args.get("limit", "50")
-    try:
-        limit = max(1, min(int(limit_raw), 200))
-    except ValueError:
-        return jsonify({"error": "limit must be an integer"}), 400
-
-    with get_conn() as con:
-        month = _resolve_month_clean(con, month)
-        if not month:
-            return jsonify({"error": "No months available"}), 404
+def _with_tag_text(keyset: Keyset, page_sql: str, hidden: tuple[str, ...] = ()) -> str:
+    """
+    Swap tag_id for the tag text on a paginated query: the tag_dim join runs
+    on the page's rows only, which are then put back in keyset order.
+    `hidden` columns are dropped from the output.
+    """
+    order = ", ".join(f"p.{col} {direction}" for col, (_, direction) in zip(keyset.columns, keyset.keys))
+    return f"""
+        SELECT d.tag, p.* EXCLUDE ({", ".join(("tag_id", *hidden))})
+        FROM ({page_sql}) p
+        JOIN tag_dim d USING (tag_id)
+        ORDER BY {order}
+    """
 
-        cur = con.execute(
-            """
-            SELECT
-              tag,
-              distinct_videos,
-              total_videos_tagged AS total_videos,
-              video_share
-            FROM us_tag_monthly_clean
-            WHERE month = CAST(? AS DATE)
-            ORDER BY video_share DESC
-            LIMIT ?
-            """,
-            [month, limit],
-        )
 
-        data = _rows_to_dicts(cur)
+@api_bp.get("/<country>/tags/months")
+@cached_response
+def country_tag_months(country: str):
+    name = _resolve_country(country)
+    if not name:
+        return _unknown_country(country)
+    return jsonify(get_catalog().values(name, "tag_month"))
 
-    return jsonify({"month": month, "count": len(data), "results": data})
 
+@api_bp.get("/<country>/tags/top")
+@cached_response
+def country_tags_top(country: str):
+    name = _resolve_country(country)
+    if not name:
+        return _unknown_country(country)
 
-@api_bp.get("/us/tags/rising")
-def us_tags_rising():
-    month = request.args.get("month")
-    limit_raw = request.args.get("limit", "50")
+    month = request.args.get("month")  # YYYY-MM-01
+    # tag_id is numbered in tag order, so it is the alphabetical tiebreak
+    keyset = Keyset(("coalesce(video_share, -1)", "DESC"), ("tag_id", "ASC"))
     try:
-        limit = max(1, min(int(limit_raw), 200))
-    except ValueError:
-        return jsonify({"error": "limit must be an integer"}), 400
+        limit, after, stream = _page_args(keyset, "50", 200)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    with get_conn() as con:
-        month = _resolve_month_clean(con, month)
-        if not month:
-            return jsonify({"error": "No months available"}), 404
+    month = _resolve_month_clean(name, month)
+    if not month:
+        return jsonify({"error": "No months available"}), 404
 
-        cur = con.execute(
-            """
-            WITH now AS (
-              SELECT tag, video_share AS share_now
-              FROM us_tag_monthly_clean
-              WHERE month = CAST(? AS DATE)
-            ),
-            prev AS (
-              SELECT tag, video_share AS share_prev
-              FROM us_tag_monthly_clean
-              WHERE month = date_add(CAST(? AS DATE), INTERVAL '-1 month')
-            )
-            SELECT
-              n.tag,
-              p.share_prev,
-              n.share_now,
-              (n.share_now - coalesce(p.share_prev, 0)) AS delta,
-              CASE
-                WHEN p.share_prev IS NULL OR p.share_prev = 0 THEN NULL
-                ELSE n.share_now / p.share_prev
-              END AS lift
-            FROM now n
-            LEFT JOIN prev p USING (tag)
-            ORDER BY delta DESC
-            LIMIT ?
-            """,
-            [month, month, limit],
-        )
+    sql, params = keyset.paginate(
+        """
+        SELECT
+          tag_id,
+          distinct_videos,
+          total_videos_tagged AS total_videos,
+          video_share
+        FROM tag_monthly_clean
+        WHERE country = ?
+          AND month = CAST(? AS DATE)
+        """,
+        [name, month],
+        after,
+        limit,
+    )
 
-        data = _rows_to_dicts(cur)
+    return _page_response(keyset, _with_tag_text(keyset, sql), params, limit, stream, {"month": month})
 
-    return jsonify({"month": month, "count": len(data), "results": data})
 
+def _tag_movers(country: str, rank_col: str):
+    """
+    /tags/rising and /tags/falling: a top-N range of tag_movers_clean in
+    `rank_col` order (share this month vs the previous month, ranked by the tags stage).
+    """
+    name = _resolve_country(country)
+    if not name:
+        return _unknown_country(country)
 
-@api_bp.get("/us/tags/falling")
-def us_tags_falling():
     month = request.args.get("month")
-    limit_raw = request.args.get("limit", "50")
+    keyset = Keyset((rank_col, "ASC"),)
     try:
-        limit = max(1, min(int(limit_raw), 200))
-    except ValueError:
-        return jsonify({"error": "limit must be an integer"}), 400
+        limit, after, stream = _page_args(keyset, "50", 200)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    month = _resolve_month_clean(name, month)
+    if not month:
+        return jsonify({"error": "No months available"}), 404
+
+    sql, params = keyset.paginate(
+        f"""
+        SELECT tag_id, share_prev, share_now, delta, lift, {rank_col}
+        FROM tag_movers_clean
+        WHERE country = ?
+          AND month = CAST(? AS DATE)
+          AND {rank_col} IS NOT NULL
+        """,
+        [name, month],
+        after,
+        limit,
+    )
 
-    with get_conn() as con:
-        month = _resolve_month_clean(con, month)
-        if not month:
-            return jsonify({"error": "No months available"}), 404
+    return _page_response(
+        keyset, _with_tag_text(keyset, sql, hidden=(rank_col,)), params, limit, stream, {"month": month}
+    )
+
+
+@api_bp.get("/<country>/tags/rising")
+@cached_response
+def country_tags_rising(country: str):
+    return _tag_movers(country, "rising_rank")
 
-        cur = con.execute(
-            """
-            WITH now AS (
-              SELECT tag, video_share AS share_now
-              FROM us_tag_monthly_clean
-              WHERE month = CAST(? AS DATE)
-            ),
-            prev AS (
-              SELECT tag, video_share AS share_prev
-              FROM us_tag_monthly_clean
-              WHERE month = date_add(CAST(? AS DATE), INTERVAL '-1 month')
-            )
-            SELECT
-              n.tag,
-              p.share_prev,
-              n.share_now,
-              (n.share_now - coalesce(p.share_prev, 0)) AS delta,
-              CASE
-                WHEN p.share_prev IS NULL OR p.share_prev = 0 THEN NULL
-                ELSE n.share_now / p.share_prev
-              END AS lift
-            FROM now n
-            LEFT JOIN prev p USING (tag)
-            WHERE p.share_prev IS NOT NULL
-            ORDER BY delta ASC
-            LIMIT ?
-            """,
-            [month, month, limit],
-        )
 
-        data = _rows_to_dicts(cur)
+@api_bp.get("/<country>/tags/falling")
+@cached_response
+def country_tags_falling(country: str):
+    return _tag_movers(country, "falling_rank")
 
-    return jsonify({"month": month, "count": len(data), "results": data})
 
+@api_bp.get("/<country>/tags/videos")
+@cached_response
+def country_tag_videos(country: str):
+    name = _resolve_country(country)
+    if not name:
+        return _unknown_country(country)
 
-@api_bp.get("/us/tags/videos")
-def us_tag_videos():
     tag_raw = request.args.get("tag")
     if not tag_raw:
         return jsonify({"error": "Missing required query param: tag"}), 400
 
-    tag = _normalize_tag_str(tag_raw)
+    tag = normalize_tag(tag_raw)
 
     month = request.args.get("month")
     metric = request.args.get("metric", "views")  # views | likes
-    limit_raw = request.args.get("limit", "20")
-
-    try:
-        limit = max(1, min(int(limit_raw), 200))
-    except ValueError:
-        return jsonify({"error": "limit must be an integer"}), 400
 
     if metric not in ("views", "likes"):
         return jsonify({"error": "metric must be views or likes"}), 400
 
-    order_col = "max_views" if metric == "views" else "max_likes"
-
-    with get_conn() as con:
-        month = _resolve_month_clean(con, month)
-        if not month:
-            return jsonify({"error": "No months available"}), 404
-
-        sql = f"""
-        WITH vids AS (
-          SELECT DISTINCT video_id
-          FROM us_tag_events_clean
-          WHERE month = CAST(? AS DATE)
-            AND tag = ?
-        )
-        SELECT
-          t.video_id,
-          d.video_title,
-          d.channel_id,
-          d.channel_title,
-          d.video_default_thumbnail,
-          max(t.video_view_count) AS max_views,
-          max(t.video_like_count) AS max_likes,
-          max(t.video_comment_count) AS max_comments,
-          count(DISTINCT t.video_trending_date) AS days_trended_in_month,
-          CAST(min(t.video_trending_date) AS VARCHAR) AS first_date,
-          CAST(max(t.video_trending_date) AS VARCHAR) AS last_date
-        FROM trending t
-        JOIN video_dim d USING (video_id)
-        JOIN vids v USING (video_id)
-        WHERE t.video_trending_country = 'United States'
-          AND date_trunc('month', t.video_trending_date) = CAST(? AS DATE)
-        GROUP BY 1,2,3,4,5
-        ORDER BY {order_col} DESC NULLS LAST
-        LIMIT ?
-        """
+    # Precomputed per (country, month, tag): max views/likes DESC, then video_id
+    rank_col = "views_rank" if metric == "views" else "likes_rank"
+    keyset = Keyset((rank_col, "ASC"),)
+    try:
+        limit, after, stream = _page_args(keyset, "20", 200)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-        cur = con.execute(sql, [month, tag, month, limit])
-        data = _rows_to_dicts(cur)
+    month = _resolve_month_clean(name, month)
+    if not month:
+        return jsonify({"error": "No months available"}), 404
 
-    return jsonify(
-        {
-            "country": "United States",
-            "month": month,
-            "tag": tag,
-            "metric": metric,
-            "count": len(data),
-            "results": data,
-        }
+    sql, params = keyset.paginate(
+        f"""
+        SELECT
+          video_id,
+          video_title,
+          channel_id,
+          channel_title,
+          video_default_thumbnail,
+          max_views,
+          max_likes,
+          max_comments,
+          days_trended_in_month,
+          CAST(first_date AS VARCHAR) AS first_date,
+          CAST(last_date AS VARCHAR) AS last_date,
+          {rank_col}
+        FROM tag_video_stats_clean
+        WHERE country = ?
+          AND month = CAST(? AS DATE)
+          AND tag_id = (SELECT tag_id FROM tag_dim WHERE tag = ?)
+        """,
+        [name, month, tag],
+        after,
+        limit,
+    )
+    sql = _without_columns(keyset, sql, rank_col)
+
+    return _page_response(
+        keyset,
+        sql,
+        params,
+        limit,
+        stream,
+        {"country": name, "month": month, "tag": tag, "metric": metric},
     )
 
 
-@api_bp.get("/us/tags/series")
-def us_tags_series():
+@api_bp.get("/<country>/tags/series")
+@cached_response
+def country_tags_series(country: str):
     """
-    Return a time series (monthly) of a tag's share + counts in the US (cleaned tables).
-    NOTE: us_tag_monthly_clean has total_videos_tagged, not total_videos.
+    Return a time series (monthly) of a tag's share + counts in one country (cleaned tables).
+    NOTE: tag_monthly_clean has total_videos_tagged, not total_videos.
     """
+    name = _resolve_country(country)
+    if not name:
+        return _unknown_country(country)
+
     tag_raw = request.args.get("tag")
     if not tag_raw:
         return jsonify({"error": "Missing required query param: tag"}), 400
 
-    tag = _normalize_tag_str(tag_raw)
+    tag = normalize_tag(tag_raw)
 
     with get_conn() as con:
-        # Prefer cleaned table if it exists; fall back to original
-        table = "us_tag_monthly_clean" if _table_exists(con, "us_tag_monthly_clean") else "us_tag_monthly"
-
-        if table == "us_tag_monthly_clean":
+        # Prefer cleaned table if it exists; fall back to the original (US-only) table
+        if _table_exists(con, "tag_monthly_by_tag"):
             sql = """
                 SELECT
                   CAST(month AS VARCHAR) AS month,
                   video_share,
                   distinct_videos,
                   total_videos_tagged AS total_videos
-                FROM us_tag_monthly_clean
-                WHERE tag = ?
+                FROM tag_monthly_by_tag
+                WHERE country = ?
+                  AND tag_id = (SELECT tag_id FROM tag_dim WHERE tag = ?)
                 ORDER BY month ASC
             """
-        else:
+            params = [name, tag]
+        elif name == US:
             # original table naming
             sql = """
                 SELECT
@@ -961,8 +965,11 @@ def us_tags_series():
                 WHERE tag = ?
                 ORDER BY month ASC
             """
+            params = [tag]
+        else:
+            return jsonify({"error": f"No tag data for {name}"}), 404
 
-        cur = con.execute(sql, [tag])
-        series = _rows_to_dicts(cur)
+        cur = con.execute(sql, params)
+        series = fetch_rows(cur)
 
-    return jsonify({"tag": tag, "count": len(series), "series": series})
+    return json_response({"tag": tag, "count": len(series), "series": series})
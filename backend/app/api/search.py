@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+# Built by backend/scripts/create_search_index.py:
+#   search_video_grams / search_video_gram_df      (video_dim.video_title)
+#   search_channel_grams / search_channel_gram_df  (video_dim.channel_title, channel_id)
+# Postings are per country, docs numbered in the search routes' order there.
+_INDEXES = {"video": "video_id", "channel": "channel_id"}
+
+# Intersect the postings of at most this many (rarest) trigrams; the final
+# substring check on the candidates removes any false positives.
+_MAX_GRAMS = 3
+
+# Queries matching more texts in a country than this are answered from the
+# MAX_CANDIDATES most trended of them there (5x the largest search page). The id lookups cost roughly
+# linear time in the candidate count, ~0.1 ms per id on a 2M-video catalog.
+MAX_CANDIDATES = 250
+
+
+def _cutoff(con, grams_table: str, match: str, params: list, n: int, distinct: bool = False) -> int | None:
+    """
+    Doc number of the first document past the n most trended ones with a gram
+    matching `match`, or None when there are no more than n. Docs are numbered
+    most trended first and postings sorted by (gram, country, doc), so this reads
+    the head of the matching postings only. `distinct` when `match` spans several grams.
+    """
+    count, last = con.execute(
+        f"""
+        SELECT count(*), max(doc)
+        FROM (SELECT {"DISTINCT " if distinct else ""}doc FROM {grams_table} WHERE {match} ORDER BY doc LIMIT ?)
+        """,
+        [*params, n + 1],
+    ).fetchone()
+    return last if count > n else None
+
+
+def search_candidates(con, index: str, q: str, country: str) -> list[str]:
+    """
+    Ids trended in `country` whose indexed text may contain `q` (case-insensitive),
+    from the n-gram index: all of them, or the MAX_CANDIDATES most trended there
+    when there are more.
+    """
+    key = _INDEXES[index]
+    grams_table = f"search_{index}_grams"
+    df_table = f"search_{index}_gram_df"
+
+    if len(q) < 3:
+        # Any trigram starting with q (texts are padded, so q at the very end counts
+        # too): a contiguous range of the sorted postings
+        lo, hi, total = con.execute(
+            f"""
+            SELECT min(gram), max(gram), coalesce(sum(n), 0)
+            FROM {df_table}
+            WHERE starts_with(gram, lower(?)) AND country = ?
+            """,
+            [q, country],
+        ).fetchone()
+        if total == 0:
+            return []
+        match, params = "gram BETWEEN ? AND ? AND country = ?", [lo, hi, country]
+        cutoff = _cutoff(con, grams_table, match, params, MAX_CANDIDATES, distinct=True) if total > MAX_CANDIDATES else None
+        if cutoff is not None:
+            match, params = f"{match} AND doc < ?", [*params, cutoff]
+        rows = con.execute(f"SELECT DISTINCT {key} FROM {grams_table} WHERE {match}", params).fetchall()
+        return [r[0] for r in rows]
+
+    grams = con.execute(
+        f"""
+        WITH grams AS (
+          SELECT DISTINCT substring(lower(?), i, 3) AS gram
+          FROM range(1, length(lower(?)) - 1) r(i)
+        )
+        SELECT g.gram, coalesce(df.n, 0) AS n
+        FROM grams g
+        LEFT JOIN {df_table} df ON df.gram = g.gram AND df.country = ?
+        ORDER BY n
+        """,
+        [q, q, country],
+    ).fetchall()
+
+    if grams[0][1] == 0:
+        return []  # some trigram never occurs
+
+    # Every candidate has the rarest trigram. For a common query only the head of
+    # its postings in the country (the most trended docs) is intersected with the other grams',
+    # widened until it yields MAX_CANDIDATES or the postings run out.
+    rarest = [g for g, _ in grams[:_MAX_GRAMS]]
+    window = MAX_CANDIDATES
+    while True:
+        match, params = f"gram IN ({', '.join('?' * len(rarest))}) AND country = ?", [*rarest, country]
+        cutoff = (
+            _cutoff(con, grams_table, "gram = ? AND country = ?", [rarest[0], country], window)
+            if grams[0][1] > window
+            else None
+        )
+        if cutoff is not None:
+            match, params = f"{match} AND doc < ?", [*params, cutoff]
+        rows = con.execute(
+            f"""
+            SELECT {key}
+            FROM {grams_table}
+            WHERE {match}
+            GROUP BY 1
+            HAVING count(*) = ?
+            ORDER BY min(doc)
+            LIMIT {MAX_CANDIDATES}
+            """,
+            [*params, len(rarest)],
+        ).fetchall()
+        if cutoff is None or len(rows) == MAX_CANDIDATES:
+            return [r[0] for r in rows]
+        window *= 4
+
+
+def candidate_rows(table: str, column: str, ids: list[str], where: str = "", params: list | None = None) -> tuple[str, list]:
+    """
+    CTE body (+ params) selecting the rows of `table` whose `column` is a candidate id,
+    optionally also matching `where` (with its `params`). MATERIALIZED keeps DuckDB
+    from merging later filters into the id lookup, which would turn the index scan
+    back into a table scan.
+    """
+    placeholders = ", ".join("?" * len(ids)) or "NULL"
+    extra = f"{where} AND " if where else ""
+    return (
+        f"MATERIALIZED (SELECT * FROM {table} WHERE {extra}{column} IN ({placeholders}))",
+        [*(params or []), *ids],
+    )
+
+
+def match_rank_sql(column: str) -> str:
+    """
+    0 = text starts with the query, 1 = a word starts with it, 2 = anywhere else.
+    Takes the query twice as parameters.
+    """
+    return f"""
+      CASE
+        WHEN starts_with(lower({column}), lower(?)) THEN 0
+        WHEN contains(lower({column}), ' ' || lower(?)) THEN 1
+        ELSE 2
+      END
+    """
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import json
+import math
+import uuid
+from json.encoder import encode_basestring_ascii
+
+import pyarrow as pa
+import pyarrow.compute as pc
+from flask import Response, current_app, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+
+from app.db.duckdb_client import get_conn
+
+_INT_TYPES = {
+    "TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT",
+    "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT", "UHUGEINT",
+}
+_FLOAT_TYPES = {"FLOAT", "DOUBLE"}
+_FAST_TYPES = _INT_TYPES | _FLOAT_TYPES | {"VARCHAR", "BOOLEAN"}
+
+
+# Rows per Arrow batch when streaming NDJSON
+STREAM_BATCH_ROWS = 2048
+
+
+class Rows:
+    """
+    A query result already encoded as a JSON array of objects.
+    `last` holds the last row's values of the hidden (non-output) columns, if any.
+    """
+
+    __slots__ = ("json", "count", "last")
+
+    def __init__(self, json_text: str, count: int, last: list | None = None):
+        self.json = json_text
+        self.count = count
+        self.last = last
+
+    def __len__(self) -> int:
+        return self.count
+
+
+def _encode_float(v: float) -> str:
+    # Same spelling as json.dumps(v)
+    if v != v:
+        return "NaN"
+    if v == math.inf:
+        return "Infinity"
+    if v == -math.inf:
+        return "-Infinity"
+    return float.__repr__(v)
+
+
+def _encode_column(col: pa.ChunkedArray, duck_type: str) -> list[str]:
+    """Encode one Arrow column into JSON value fragments."""
+    if duck_type in _INT_TYPES:
+        # Vectorized int -> decimal text in Arrow (HUGEINT arrives as decimal128(38, 0))
+        return ["null" if v is None else v for v in pc.cast(col, pa.string()).to_pylist()]
+    values = col.to_pylist()
+    if duck_type == "VARCHAR":
+        return ["null" if v is None else encode_basestring_ascii(v) for v in values]
+    if duck_type in _FLOAT_TYPES:
+        return ["null" if v is None else _encode_float(v) for v in values]
+    return ["null" if v is None else ("true" if v else "false") for v in values]
+
+
+def _encode_value(v) -> str:
+    return json.dumps(
+        v,
+        default=current_app.json.default,
+        ensure_ascii=True,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+
+
+class _RowEncoder:
+    """Encodes batches of a result set into one JSON object text per row."""
+
+    def __init__(self, description, hidden: tuple[str, ...] = ()):
+        columns = [d[0] for d in description]
+        self.duck_types = [str(d[1]) for d in description]
+        self.fast = all(t in _FAST_TYPES for t in self.duck_types)
+        self.hidden = [columns.index(name) for name in hidden]
+
+        # Keys sorted like jsonify(sort_keys=True); like dict(zip(...)) the last duplicate name wins
+        positions = {name: i for i, name in enumerate(columns) if name not in hidden}
+        keys = sorted(positions)
+        self.template = "{" + ",".join(encode_basestring_ascii(k).replace("%", "%%") + ":%s" for k in keys) + "}"
+        self.order = [positions[k] for k in keys]
+
+    def _join(self, encoded: list[list[str]], count: int) -> list[str]:
+        if not encoded:
+            return ["{}"] * count
+        return [self.template % values for values in zip(*encoded)]
+
+    def encode_arrow(self, batch) -> list[str]:
+        return self._join([_encode_column(batch.column(i), self.duck_types[i]) for i in self.order], batch.num_rows)
+
+    def encode_tuples(self, rows: list[tuple]) -> list[str]:
+        return self._join([[_encode_value(row[i]) for row in rows] for i in self.order], len(rows))
+
+    def last_hidden_arrow(self, batch) -> list | None:
+        if not batch.num_rows:
+            return None
+        return [batch.column(i)[batch.num_rows - 1].as_py() for i in self.hidden]
+
+    def last_hidden_tuples(self, rows: list[tuple]) -> list | None:
+        return [rows[-1][i] for i in self.hidden] if rows else None
+
+
+def fetch_rows(cur, hidden: tuple[str, ...] = ()) -> Rows:
+    """
+    Fetch a result set column-wise and encode it straight to JSON.
+
+    Columns come back as Arrow arrays and are encoded in bulk; rows are then
+    stitched together with a per-query template, so no per-row dicts are built.
+    The text matches jsonify() of the equivalent list of dicts under Flask's
+    default compact settings. Types without a bulk encoder (DATE, DECIMAL,
+    LIST, ...) fall back to per-value json.dumps.
+
+    `hidden` columns are left out of the JSON; their last-row values end up in Rows.last.
+    """
+    encoder = _RowEncoder(cur.description, hidden)
+    if encoder.fast:
+        table = cur.fetch_arrow_table()
+        objects, last = encoder.encode_arrow(table), encoder.last_hidden_arrow(table)
+    else:
+        rows = cur.fetchall()
+        objects, last = encoder.encode_tuples(rows), encoder.last_hidden_tuples(rows)
+    return Rows(f"[{','.join(objects)}]", len(objects), last)
+
+
+def stream_ndjson(sql: str, params: list, hidden: tuple[str, ...] = ()) -> Response:
+    """
+    Stream a query as newline-delimited JSON, one object per row, batch by batch
+    as DuckDB produces them, so memory stays bounded by the batch size.
+    Objects are encoded exactly like fetch_rows() does.
+    """
+
+    def generate():
+        with get_conn() as con:
+            cur = con.execute(sql, params)
+            encoder = _RowEncoder(cur.description, hidden)
+            if encoder.fast:
+                for batch in cur.fetch_record_batch(STREAM_BATCH_ROWS):
+                    if batch.num_rows:
+                        yield "\n".join(encoder.encode_arrow(batch)) + "\n"
+            else:
+                while rows := cur.fetchmany(STREAM_BATCH_ROWS):
+                    yield "\n".join(encoder.encode_tuples(rows)) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+def _uses_default_compact_json() -> bool:
+    provider = current_app.json
+    if not isinstance(provider, DefaultJSONProvider):
+        return False
+    if not (provider.ensure_ascii and provider.sort_keys):
+        return False
+    return not (provider.compact is False or (provider.compact is None and current_app.debug))
+
+
+def _materialize(obj):
+    if isinstance(obj, Rows):
+        return json.loads(obj.json)
+    if isinstance(obj, dict):
+        return {k: _materialize(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_materialize(v) for v in obj]
+    return obj
+
+
+def json_response(payload, status: int = 200) -> Response:
+    """jsonify() for payloads that may contain Rows, splicing their JSON in without re-encoding."""
+    if not _uses_default_compact_json():
+        # Debug / customised provider (e.g. indented output): take the regular path
+        resp = jsonify(_materialize(payload))
+        resp.status_code = status
+        return resp
+
+    fragments: dict[str, str] = {}
+
+    def swap(obj):
+        if isinstance(obj, Rows):
+            token = f"rows-{uuid.uuid4().hex}"
+            fragments[encode_basestring_ascii(token)] = obj.json
+            return token
+        if isinstance(obj, dict):
+            return {k: swap(v) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [swap(v) for v in obj]
+        return obj
+
+    body = _encode_value(swap(payload))
+    for token, fragment in fragments.items():
+        body = body.replace(token, fragment, 1)
+
+    return current_app.response_class(f"{body}\n", status=status, mimetype=current_app.json.mimetype)
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import re
+import threading
+from collections import defaultdict
+
+import duckdb
+
+from app.db.duckdb_client import current_build_id, get_conn
+
+
+# Short route segments kept from the US-only API (/api/us/...)
+COUNTRY_ALIASES = {"us": "United States"}
+
+
+def country_slug(name: str) -> str:
+    """URL segment for a country name: 'United States' -> 'united-states'."""
+    return re.sub(r"[^a-z0-9]+", "-", name.strip().lower()).strip("-")
+
+
+class Catalog:
+    """
+    Available dates / months per country, loaded once per database build.
+
+    Built from the `catalog` table written by the pipeline
+    (create_analytics.py: kind 'date' and 'month'; create_tag_clean_analytics.py:
+    kind 'tag_month'). Values are the strings the API returns, newest first.
+    """
+
+    def __init__(self, build_id: str, rows: list[tuple[str, str, str]]):
+        self.build_id = build_id
+        values: dict[tuple[str, str], list[str]] = defaultdict(list)
+        for country, kind, value in rows:
+            values[(country, kind)].append(value)
+        self._values = {key: sorted(vals, reverse=True) for key, vals in values.items()}
+        self._by_slug = {country_slug(country): country for country, _ in self._values}
+
+    def values(self, country: str, kind: str) -> list[str]:
+        return self._values.get((country, kind), [])
+
+    def latest(self, country: str, kind: str) -> str | None:
+        vals = self.values(country, kind)
+        return vals[0] if vals else None
+
+    def countries(self) -> list[str]:
+        return sorted({country for country, _ in self._values})
+
+    def country(self, segment: str) -> str | None:
+        """Country name for a route segment: a slug, the name itself, or an alias like 'us'."""
+        slug = country_slug(segment)
+        if slug in COUNTRY_ALIASES:
+            slug = country_slug(COUNTRY_ALIASES[slug])
+        return self._by_slug.get(slug)
+
+
+# Builds published before the catalog table existed: each kind derived from the
+# tables it is built from, trying the per-country tables before the US-only ones
+# of older builds. A kind none of whose tables exist stays empty.
+_DERIVED_ROWS = {
+    "date": (
+        """
+        SELECT DISTINCT video_trending_country, 'date', CAST(video_trending_date AS VARCHAR)
+        FROM trending
+        WHERE video_trending_country IS NOT NULL AND video_trending_date IS NOT NULL
+        """,
+    ),
+    "month": (
+        """
+        SELECT DISTINCT
+          video_trending_country,
+          'month',
+          CAST(CAST(date_trunc('month', video_trending_date) AS DATE) AS VARCHAR)
+        FROM trending
+        WHERE video_trending_country IS NOT NULL AND video_trending_date IS NOT NULL
+        """,
+    ),
+    "tag_month": (
+        "SELECT DISTINCT country, 'tag_month', CAST(month AS VARCHAR) FROM tag_monthly_clean WHERE country IS NOT NULL",
+        "SELECT 'United States', 'tag_month', month FROM v_us_tag_months_clean",
+    ),
+}
+
+
+def _load_rows(con) -> list[tuple[str, str, str]]:
+    try:
+        return con.execute(
+            """
+            SELECT country, kind, value
+            FROM catalog
+            WHERE country IS NOT NULL AND value IS NOT NULL
+            """
+        ).fetchall()
+    except duckdb.CatalogException:
+        pass
+
+    rows = []
+    for queries in _DERIVED_ROWS.values():
+        for sql in queries:
+            try:
+                rows += con.execute(sql).fetchall()
+                break
+            except duckdb.CatalogException:
+                continue
+    return rows
+
+
+_catalog: Catalog | None = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> Catalog:
+    global _catalog
+    build_id = current_build_id()
+    with _catalog_lock:
+        if _catalog is not None and _catalog.build_id == build_id:
+            return _catalog
+        with get_conn() as con:
+            _catalog = Catalog(build_id, _load_rows(con))
+        return _catalog
@@ -1,4 +1,7 @@
+import json
 import os
+import threading
+import time
 from pathlib import Path
 from contextlib import contextmanager
 import duckdb
@@ -12,11 +15,263 @@ def _resolve_db_path() -> Path:
     db_rel = os.getenv("DUCKDB_PATH", "../data/processed/trending.duckdb")
     return (backend_dir / db_rel).resolve()
 
+
+def _resolve_manifest_path() -> Path:
+    """current.json written by scripts/db_versions.py when a new build is published."""
+    backend_dir = Path(__file__).resolve().parents[2]  # .../backend
+    manifest_rel = os.getenv("DUCKDB_MANIFEST", "../data/processed/current.json")
+    return (backend_dir / manifest_rel).resolve()
+
+
+def _resolve_build() -> tuple[str, Path]:
+    """
+    (build_id, db_path) of the database new requests should read.
+    Falls back to DUCKDB_PATH when no versioned build has been published yet.
+    """
+    manifest_path = _resolve_manifest_path()
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        db_path = _resolve_db_path()
+        try:
+            stamp = db_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            stamp = 0
+        return f"{db_path.stem}@{stamp}", db_path
+    return manifest["version"], (manifest_path.parent / manifest["path"]).resolve()
+
+
+def _env_number(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if raw is None or raw.strip() == "":
+        return default
+    return float(raw)
+
+
+class ConnectionPool:
+    """
+    Keeps one read-only DuckDB database handle open for the whole process.
+
+    Each request borrows a cursor (a lightweight connection that shares the
+    database instance, catalog and buffer pool with the root handle) and hands
+    it back afterwards, so only the first request pays for opening the file.
+    At most `pool_size` idle cursors are kept; idle cursors that have not been
+    used for `health_check_interval` seconds are probed with `SELECT 1` before
+    they are handed out again.
+
+    When a newer build is published the pool is retired: it stops taking new
+    requests and closes the database handle once the last in-flight one returns.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        build_id: str,
+        generation: int = 0,
+        pool_size: int = 8,
+        health_check_interval: float = 30.0,
+        threads: int | None = None,
+    ):
+        self.db_path = db_path
+        self.build_id = build_id
+        self.generation = generation
+        self.pool_size = max(0, pool_size)
+        self.health_check_interval = health_check_interval
+        self.threads = threads
+        self._lock = threading.Lock()
+        self._root: duckdb.DuckDBPyConnection | None = None
+        self._idle: list[tuple[duckdb.DuckDBPyConnection, float]] = []
+        self._in_use = 0
+        self._retired = False
+        self._counters = {
+            "checkouts": 0,
+            "reused": 0,
+            "opened": 0,
+            "discarded": 0,
+            "failed_health_checks": 0,
+            "database_opens": 0,
+        }
+
+    def _root_conn(self) -> duckdb.DuckDBPyConnection:
+        # Caller holds self._lock
+        if self._root is None:
+            # threads: DuckDB's per-query parallelism; with several server processes
+            # the default (all cores each) oversubscribes the CPU
+            config = {"threads": self.threads} if self.threads else {}
+            self._root = duckdb.connect(str(self.db_path), read_only=True, config=config)
+            self._counters["database_opens"] += 1
+        return self._root
+
+    def _is_healthy(self, cur: duckdb.DuckDBPyConnection) -> bool:
+        try:
+            cur.execute("SELECT 1").fetchone()
+            return True
+        except duckdb.Error:
+            return False
+
+    def acquire(self) -> duckdb.DuckDBPyConnection:
+        with self._lock:
+            self._counters["checkouts"] += 1
+            self._in_use += 1
+
+        while True:
+            with self._lock:
+                if not self._idle:
+                    try:
+                        cur = self._root_conn().cursor()
+                    except duckdb.Error:
+                        self._in_use -= 1
+                        raise
+                    self._counters["opened"] += 1
+                    return cur
+                cur, last_used = self._idle.pop()
+
+            stale = time.monotonic() - last_used >= self.health_check_interval
+            if not stale or self._is_healthy(cur):
+                with self._lock:
+                    self._counters["reused"] += 1
+                return cur
+
+            with self._lock:
+                self._counters["failed_health_checks"] += 1
+            self._discard(cur)
+
+    def release(self, cur: duckdb.DuckDBPyConnection, healthy: bool = True) -> None:
+        with self._lock:
+            self._in_use -= 1
+            if healthy and not self._retired and len(self._idle) < self.pool_size:
+                self._idle.append((cur, time.monotonic()))
+                return
+            drained = self._retired and self._in_use == 0
+        self._discard(cur)
+        if drained:
+            self.close()
+
+    def retire(self) -> None:
+        """Stop pooling; close the database once in-flight requests are done."""
+        with self._lock:
+            self._retired = True
+            drained = self._in_use == 0
+        if drained:
+            self.close()
+
+    def _discard(self, cur: duckdb.DuckDBPyConnection) -> None:
+        with self._lock:
+            self._counters["discarded"] += 1
+        try:
+            cur.close()
+        except duckdb.Error:
+            pass
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+            root, self._root = self._root, None
+        for cur, _ in idle:
+            cur.close()
+        if root is not None:
+            root.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "build_id": self.build_id,
+                "generation": self.generation,
+                "db_path": str(self.db_path),
+                "pool_size": self.pool_size,
+                "health_check_interval": self.health_check_interval,
+                "threads": self.threads,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                **self._counters,
+            }
+
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+_build_checked_at = 0.0
+_build_swaps = 0
+# Bumped for every pool this process opens, so a later build always compares greater
+_generation = 0
+
+
+def get_pool() -> ConnectionPool:
+    """
+    Process-wide pool for the currently published build, created lazily so
+    backend/.env is loaded first. The manifest is re-read at most every
+    DUCKDB_MANIFEST_POLL_SECONDS; a new build swaps in a fresh pool.
+    """
+    global _pool, _build_checked_at, _build_swaps, _generation
+    retired = None
+    with _pool_lock:
+        now = time.monotonic()
+        poll_interval = _env_number("DUCKDB_MANIFEST_POLL_SECONDS", 2.0)
+        if _pool is None or now - _build_checked_at >= poll_interval:
+            _build_checked_at = now
+            build_id, db_path = _resolve_build()
+            if _pool is None or _pool.build_id != build_id:
+                retired = _pool
+                _generation += 1
+                _pool = ConnectionPool(
+                    db_path,
+                    build_id=build_id,
+                    generation=_generation,
+                    pool_size=int(_env_number("DUCKDB_POOL_SIZE", 8)),
+                    health_check_interval=_env_number("DUCKDB_HEALTH_CHECK_SECONDS", 30.0),
+                    threads=int(_env_number("DUCKDB_THREADS", 0)) or None,
+                )
+                if retired is not None:
+                    _build_swaps += 1
+        pool = _pool
+    if retired is not None:
+        retired.retire()
+    return pool
+
+
+def reset_pool() -> None:
+    """
+    Forget this process's pool and close its database handle once idle.
+
+    Called in a pre-forking server's parent before workers are forked: a DuckDB
+    handle must not be shared across fork(), so each worker opens its own.
+    """
+    global _pool, _build_checked_at
+    with _pool_lock:
+        pool, _pool = _pool, None
+        _build_checked_at = 0.0
+    if pool is not None:
+        pool.retire()
+
+
+def current_build_id() -> str:
+    return get_pool().build_id
+
+
+def current_build() -> tuple[int, str]:
+    """(generation, build_id) of the build new requests read; generations only grow."""
+    pool = get_pool()
+    return pool.generation, pool.build_id
+
+
+def pool_stats() -> dict:
+    return {**get_pool().stats(), "build_swaps": _build_swaps}
+
+
 @contextmanager
 def get_conn(read_only: bool = True):
-    db_path = _resolve_db_path()
-    con = duckdb.connect(str(db_path), read_only=read_only)
+    if not read_only:
+        # Published builds are immutable snapshots that other processes may be reading;
+        # the pipeline writes a new build (scripts/db_versions.py) and publishes it.
+        raise ValueError("the API reads published builds only; write through scripts/db_versions.py build_target()")
+
+    pool = get_pool()
+    cur = pool.acquire()
+    healthy = True
     try:
-        yield con
+        yield cur
+    except duckdb.Error:
+        # A failed query may leave the cursor unusable; request errors (400/404) do not
+        healthy = False
+        raise
     finally:
-        con.close()
+        pool.release(cur, healthy=healthy)
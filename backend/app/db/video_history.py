@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.db.duckdb_client import current_build_id, get_conn
+
+US = "United States"
+
+_VIDEO_FIELDS = (
+    "video_id",
+    "video_title",
+    "channel_id",
+    "channel_title",
+    "video_default_thumbnail",
+    "video_category_id",
+    "video_duration",
+    "video_definition",
+    "countries_count",
+)
+
+
+@dataclass
+class VideoHistory:
+    """
+    One row of the `video_history` table (create_analytics.py), unpacked into
+    the pieces /api/video/<video_id> returns.
+    """
+
+    video: dict
+    # country -> [{date, video_view_count, video_like_count, video_comment_count}, ...]
+    history: dict[str, list[dict]]
+    # [{country, days}, ...], most days first
+    spread: list[dict]
+
+    @classmethod
+    def from_row(cls, row: tuple) -> VideoHistory:
+        *fields, countries = row
+        video = dict(zip(_VIDEO_FIELDS, fields))
+        us = next((c for c in countries if c["country"] == US), None)
+        video["days_trended_us"] = us["days_trended"] if us else None
+        video["first_trending_us"] = us["first_trending"].isoformat() if us else None
+        video["last_trending_us"] = us["last_trending"].isoformat() if us else None
+        history = {
+            c["country"]: [
+                {
+                    "date": date.isoformat(),
+                    "video_view_count": views,
+                    "video_like_count": likes,
+                    "video_comment_count": comments,
+                }
+                for date, views, likes, comments in zip(c["dates"], c["views"], c["likes"], c["comments"])
+            ]
+            for c in countries
+        }
+        spread = [{"country": c["country"], "days": c["days_trended"]} for c in countries]
+        return cls(video, history, spread)
+
+
+class VideoHistoryCache:
+    """
+    LRU of unpacked video_history rows for the current database build.
+
+    A video page reads one row, so keeping the most requested videos in memory
+    skips DuckDB (and the unpacking) entirely for them. Entries are dropped when
+    a new build is published. Unknown video ids are not cached.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, VideoHistory] = OrderedDict()
+        self._build_id: str | None = None
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, video_id: str) -> VideoHistory | None:
+        build_id = current_build_id()
+        with self._lock:
+            if build_id != self._build_id:
+                self._entries.clear()
+                self._build_id = build_id
+            entry = self._entries.get(video_id)
+            if entry is not None:
+                self._entries.move_to_end(video_id)
+                self._counters["hits"] += 1
+                return entry
+            self._counters["misses"] += 1
+
+        with get_conn() as con:
+            row = con.execute(
+                f"SELECT {', '.join(_VIDEO_FIELDS)}, countries FROM video_history WHERE video_id = ?",
+                [video_id],
+            ).fetchone()
+        if row is None:
+            return None
+        entry = VideoHistory.from_row(row)
+
+        with self._lock:
+            if build_id != self._build_id or self.max_entries <= 0:
+                return entry  # a newer build landed meanwhile, or caching is off
+            self._entries[video_id] = entry
+            self._entries.move_to_end(video_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+        return entry
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else None,
+                **self._counters,
+            }
+
+
+_cache: VideoHistoryCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_video_cache() -> VideoHistoryCache:
+    """Process-wide cache, created lazily so backend/.env is loaded first."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = VideoHistoryCache(max_entries=int(os.getenv("VIDEO_CACHE_MAX_ENTRIES", "4096")))
+        return _cache
+
+
+def get_video_history(video_id: str) -> VideoHistory | None:
+    return get_video_cache().get(video_id)
+
+
+def video_cache_stats() -> dict:
+    return get_video_cache().stats()
@@ -5,7 +5,10 @@ from flask import Flask, jsonify, render_template
 from dotenv import load_dotenv
 from flask_cors import CORS
 
+from app.api.cache import cache_stats
 from app.api.routes import api_bp
+from app.db.duckdb_client import pool_stats
+from app.db.video_history import video_cache_stats
 
 
 def create_app() -> Flask:
@@ -19,7 +22,7 @@ def create_app() -> Flask:
 
     @app.get("/health")
     def health():
-        return jsonify({"status": "ok"})
+        return jsonify({"status": "ok", "db": pool_stats(), "cache": cache_stats(), "videos": video_cache_stats()})
 
     # --- Pages ---
     @app.get("/")
@@ -51,6 +54,7 @@ def create_app() -> Flask:
 
 
 if __name__ == "__main__":
+    # Development server; see app/wsgi.py and gunicorn.conf.py for production
     app = create_app()
     port = int(os.getenv("PORT", "5000"))
     app.run(host="0.0.0.0", port=port, debug=True)
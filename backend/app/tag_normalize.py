@@ -0,0 +1,66 @@
+"""
+Tag cleaning rules, shared by the tag pipeline and the API.
+
+The rules run as Arrow compute kernels over whole string arrays, so the
+pipeline cleans millions of exploded tags in a few vectorized passes.
+normalize_tag() feeds a single value through the same kernels; a lookup key
+typed into the API is therefore cleaned exactly like the stored tags (Python's
+str.lower does not lowercase every character the way Arrow does, e.g. a
+final sigma).
+
+Rules, in order:
+  - lowercase
+  - collapse whitespace runs to one space and trim
+  - strip leading '#' and surrounding '"' (with any spaces next to them)
+A cleaned tag is kept when it is 2..80 characters long and is not a
+yt:* marker, a URL or an @mention.
+"""
+from __future__ import annotations
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+MIN_LENGTH = 2
+MAX_LENGTH = 80
+
+# ASCII whitespace, spelled out so the rule does not depend on the regex engine
+_WHITESPACE = r"[\t\n\v\f\r ]+"
+_JUNK_PREFIXES = ("yt:",)
+_JUNK_SUBSTRINGS = ("http", "www.", "@")
+
+
+def normalize_tags(tags: pa.Array | pa.ChunkedArray) -> pa.Array | pa.ChunkedArray:
+    """Cleaned form of every tag in a string array (nulls stay null)."""
+    t = pc.utf8_lower(tags)
+    t = pc.replace_substring_regex(t, pattern=_WHITESPACE, replacement=" ")
+    t = pc.utf8_trim(t, characters=" ")
+    t = pc.utf8_ltrim(t, characters="# ")
+    return pc.utf8_trim(t, characters='" ')
+
+
+def keep_mask(tags: pa.Array | pa.ChunkedArray) -> pa.Array | pa.ChunkedArray:
+    """True for cleaned tags worth counting (null for null tags, which filter() drops)."""
+    n = pc.utf8_length(tags)
+    keep = pc.and_(pc.greater_equal(n, MIN_LENGTH), pc.less_equal(n, MAX_LENGTH))
+    for prefix in _JUNK_PREFIXES:
+        keep = pc.and_(keep, pc.invert(pc.starts_with(tags, prefix)))
+    for sub in _JUNK_SUBSTRINGS:
+        keep = pc.and_(keep, pc.invert(pc.match_substring(tags, sub)))
+    return keep
+
+
+def explode_tags(batch: pa.RecordBatch, column: str = "video_tags") -> pa.RecordBatch:
+    """
+    One row per comma-separated tag of `column`, cleaned and filtered; the
+    other columns are repeated for each tag and the cleaned value is `tag`.
+    """
+    lists = pc.split_pattern(batch.column(column), ",")
+    parents = pc.list_parent_indices(lists)
+    tags = normalize_tags(pc.list_flatten(lists))
+    rows = batch.drop_columns([column]).take(parents).append_column("tag", tags)
+    return rows.filter(keep_mask(tags))
+
+
+def normalize_tag(tag: str) -> str:
+    """Cleaned form of one tag, through the same kernels as the batch path."""
+    return normalize_tags(pa.array([tag], type=pa.string()))[0].as_py()
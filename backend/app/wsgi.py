@@ -0,0 +1,44 @@
+"""
+Production entry point (run from backend/):
+
+    gunicorn -c gunicorn.conf.py app.wsgi:app    # Linux / macOS: pre-forked workers x threads
+    python -m app.wsgi                           # any OS incl. Windows: waitress, one process
+
+`python -m app.main` stays the development server (debugger + reloader).
+"""
+from __future__ import annotations
+
+import os
+
+from app.db.catalog import get_catalog
+from app.db.duckdb_client import reset_pool
+from app.main import create_app
+
+app = create_app()
+
+
+def preload() -> None:
+    """
+    Open the published build once and load the date/month catalog, so a missing
+    or broken database fails at startup and forked workers inherit a warm
+    catalog. The DuckDB handle itself is closed again: workers open their own.
+    """
+    get_catalog()
+    reset_pool()
+
+
+def serve() -> None:
+    """Threaded waitress server; DuckDB releases the GIL while a query runs."""
+    from waitress import serve as waitress_serve
+
+    preload()
+    waitress_serve(
+        app,
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "5000")),
+        threads=int(os.getenv("WAITRESS_THREADS", "8")),
+    )
+
+
+if __name__ == "__main__":
+    serve()
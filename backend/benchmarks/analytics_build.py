@@ -0,0 +1,379 @@
+"""
+Analytics build: one GROUP BY scan of trending per table vs the fused build.
+
+Run from backend/:  python -m benchmarks.analytics_build [--repeat 3] [--scale 1]
+
+Both variants run against a private copy of the published database's trending
+table (--scale N stacks N copies of it, with distinct video ids, for a bigger
+input). For each variant the benchmark reports how many times the statements
+scan trending (counted from EXPLAIN) and the best wall time; it then checks
+that every analytics table comes out identical.
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR / "scripts"))
+
+from create_analytics import US, build  # noqa: E402
+from db_objects import replace_view  # noqa: E402
+from db_versions import published_db_path  # noqa: E402
+from duckdb_settings import connect  # noqa: E402
+
+TABLES = [
+    "video_dim",
+    "video_reach",
+    "video_stickiness",
+    "daily_leaderboard",
+    "channel_dim",
+    "channel_daily",
+    "channel_alltime",
+    "catalog",
+    "video_history",
+    "channel_video_stats",
+]
+
+# ANY_VALUE over values that differ between a video's rows: either pick is correct
+UNSTABLE_COLUMNS = {"video_dim": ["video_category_id"], "video_history": ["video_category_id"]}
+
+# create_analytics.py before the fused build: every table aggregates trending itself
+LEGACY_STATEMENTS = [
+    """
+    CREATE OR REPLACE TABLE video_dim AS
+    SELECT
+      video_id,
+      ANY_VALUE(video_title) AS video_title,
+      ANY_VALUE(channel_id) AS channel_id,
+      ANY_VALUE(channel_title) AS channel_title,
+      ANY_VALUE(video_default_thumbnail) AS video_default_thumbnail,
+      ANY_VALUE(video_category_id) AS video_category_id,
+      ANY_VALUE(video_duration) AS video_duration,
+      ANY_VALUE(video_definition) AS video_definition
+    FROM trending
+    GROUP BY video_id;
+    """,
+    """
+    CREATE OR REPLACE TABLE video_reach AS
+    SELECT video_id, COUNT(DISTINCT video_trending_country) AS countries_count
+    FROM trending
+    GROUP BY video_id;
+    """,
+    """
+    CREATE OR REPLACE TABLE video_stickiness AS
+    SELECT
+      video_trending_country AS country,
+      video_id,
+      COUNT(DISTINCT video_trending_date) AS days_trended,
+      MIN(video_trending_date) AS first_trending,
+      MAX(video_trending_date) AS last_trending
+    FROM trending
+    WHERE video_trending_country IS NOT NULL
+    GROUP BY 1, 2
+    ORDER BY country, video_id;
+    """,
+    """
+    CREATE OR REPLACE TABLE daily_leaderboard AS
+    WITH base AS (
+      SELECT
+        t.video_trending_country AS country,
+        t.video_trending_date AS date,
+        t.video_id,
+        d.video_title,
+        d.channel_id,
+        d.channel_title,
+        d.video_default_thumbnail,
+        t.video_category_id,
+        t.video_published_at,
+        t.video_view_count,
+        t.video_like_count,
+        t.video_comment_count,
+        s.days_trended,
+        r.countries_count
+      FROM trending t
+      JOIN video_dim d USING (video_id)
+      LEFT JOIN video_stickiness s
+        ON s.country = t.video_trending_country AND s.video_id = t.video_id
+      LEFT JOIN video_reach r USING (video_id)
+      WHERE t.video_trending_country IS NOT NULL
+    )
+    SELECT
+      *,
+      row_number() OVER (
+        PARTITION BY country, date ORDER BY video_view_count DESC NULLS LAST, video_id
+      ) AS rank_views,
+      row_number() OVER (
+        PARTITION BY country, date ORDER BY video_like_count DESC NULLS LAST, video_id
+      ) AS rank_likes,
+      row_number() OVER (
+        PARTITION BY country, date
+        ORDER BY days_trended DESC NULLS LAST, video_view_count DESC NULLS LAST, video_id
+      ) AS rank_stickiness,
+      row_number() OVER (
+        PARTITION BY country, date
+        ORDER BY countries_count DESC NULLS LAST, video_view_count DESC NULLS LAST, video_id
+      ) AS rank_reach
+    FROM base
+    ORDER BY country, date, rank_views;
+    """,
+    "CREATE TABLE IF NOT EXISTS catalog (country VARCHAR, kind VARCHAR, value VARCHAR);",
+    "DELETE FROM catalog WHERE kind IN ('date', 'month');",
+    """
+    INSERT INTO catalog
+    WITH d AS (
+      SELECT DISTINCT video_trending_country AS country, video_trending_date AS date
+      FROM trending
+      WHERE video_trending_country IS NOT NULL
+    )
+    SELECT country, 'date', CAST(date AS VARCHAR) FROM d
+    UNION ALL
+    SELECT DISTINCT country, 'month', CAST(CAST(date_trunc('month', date) AS DATE) AS VARCHAR) FROM d;
+    """,
+    """
+    CREATE OR REPLACE TABLE channel_dim AS
+    SELECT
+      channel_id,
+      ANY_VALUE(channel_title) AS channel_title,
+      ANY_VALUE(channel_custom_url) AS channel_custom_url,
+      ANY_VALUE(channel_country) AS channel_country
+    FROM trending
+    GROUP BY channel_id;
+    """,
+    """
+    CREATE OR REPLACE TABLE channel_daily AS
+    SELECT
+      video_trending_country AS country,
+      video_trending_date AS date,
+      channel_id,
+      COUNT(DISTINCT video_id) AS distinct_videos,
+      COUNT(*) AS appearances,
+      SUM(video_view_count) AS sum_views,
+      SUM(video_like_count) AS sum_likes,
+      SUM(video_comment_count) AS sum_comments
+    FROM trending
+    WHERE video_trending_country IS NOT NULL
+    GROUP BY 1, 2, 3
+    ORDER BY country, date, distinct_videos DESC, sum_views DESC NULLS LAST;
+    """,
+    """
+    CREATE OR REPLACE TABLE channel_alltime AS
+    SELECT
+      video_trending_country AS country,
+      channel_id,
+      COUNT(DISTINCT video_id) AS distinct_videos_alltime,
+      COUNT(DISTINCT video_trending_date) AS days_active,
+      COUNT(*) AS appearances_alltime,
+      MIN(video_trending_date) AS first_date,
+      MAX(video_trending_date) AS last_date,
+      SUM(video_view_count) AS sum_views_alltime,
+      SUM(video_like_count) AS sum_likes_alltime
+    FROM trending
+    WHERE video_trending_country IS NOT NULL
+    GROUP BY 1, 2
+    ORDER BY country, distinct_videos_alltime DESC, days_active DESC;
+    """,
+    # Added after the fused build; their own scans of trending, as they would have been written then
+    """
+    CREATE OR REPLACE TABLE video_history AS
+    WITH per_country AS (
+      SELECT
+        video_id,
+        video_trending_country AS country,
+        COUNT(DISTINCT video_trending_date) AS days_trended,
+        MIN(video_trending_date) AS first_trending,
+        MAX(video_trending_date) AS last_trending,
+        list(video_trending_date ORDER BY video_trending_date) AS dates,
+        list(video_view_count ORDER BY video_trending_date) AS views,
+        list(video_like_count ORDER BY video_trending_date) AS likes,
+        list(video_comment_count ORDER BY video_trending_date) AS comments
+      FROM trending
+      WHERE video_trending_country IS NOT NULL
+      GROUP BY 1, 2
+    ),
+    per_video AS (
+      SELECT
+        video_id,
+        list(
+          {
+            'country': country,
+            'days_trended': days_trended,
+            'first_trending': first_trending,
+            'last_trending': last_trending,
+            'dates': dates,
+            'views': views,
+            'likes': likes,
+            'comments': comments
+          }
+          ORDER BY days_trended DESC, country
+        ) AS countries
+      FROM per_country
+      GROUP BY video_id
+    )
+    SELECT d.*, r.countries_count, coalesce(v.countries, []) AS countries
+    FROM video_dim d
+    LEFT JOIN video_reach r USING (video_id)
+    LEFT JOIN per_video v USING (video_id)
+    ORDER BY video_id;
+    """,
+    """
+    CREATE OR REPLACE TABLE channel_video_stats AS
+    WITH agg AS (
+      SELECT
+        video_trending_country AS country,
+        channel_id,
+        video_id,
+        COUNT(DISTINCT video_trending_date) AS days_trended,
+        MIN(video_trending_date) AS first_trending,
+        MAX(video_trending_date) AS last_trending,
+        MAX(video_view_count) AS max_views,
+        MAX(video_like_count) AS max_likes,
+        MAX(video_comment_count) AS max_comments
+      FROM trending
+      WHERE video_trending_country IS NOT NULL
+        AND channel_id IS NOT NULL
+      GROUP BY 1, 2, 3
+    ),
+    ranked AS (
+      SELECT
+        a.country, a.channel_id, a.video_id, d.video_title, d.video_default_thumbnail,
+        a.days_trended, a.first_trending, a.last_trending, a.max_views, a.max_likes, a.max_comments,
+        r.countries_count,
+        row_number() OVER (
+          PARTITION BY a.country, a.channel_id
+          ORDER BY a.days_trended DESC, coalesce(a.max_views, -1) DESC, a.video_id
+        ) AS page_rank
+      FROM agg a
+      JOIN video_dim d USING (video_id)
+      LEFT JOIN video_reach r USING (video_id)
+    )
+    SELECT * FROM ranked
+    ORDER BY country, channel_id, page_rank;
+    """,
+]
+
+_TRENDING_SCAN = re.compile(r"Table: trending\b")
+
+
+def legacy_build(con) -> None:
+    for sql in LEGACY_STATEMENTS:
+        con.execute(sql)
+    # Unchanged by the fused build, run for a like-for-like wall time
+    replace_view(con, "v_us_dates", f"""
+        SELECT DISTINCT video_trending_date FROM trending
+        WHERE video_trending_country = '{US}' ORDER BY video_trending_date DESC;
+    """)
+    replace_view(con, "video_us_stickiness", f"""
+        SELECT video_id, days_trended AS days_trended_us, first_trending AS first_trending_us,
+               last_trending AS last_trending_us
+        FROM video_stickiness WHERE country = '{US}';
+    """)
+    replace_view(con, "channel_us_daily", f"SELECT * EXCLUDE (country) FROM channel_daily WHERE country = '{US}';")
+    replace_view(con, "channel_us_alltime", f"SELECT * EXCLUDE (country) FROM channel_alltime WHERE country = '{US}';")
+
+
+class _ScanCounter:
+    """Connection stand-in that EXPLAINs each statement before running it and counts scans of trending."""
+
+    def __init__(self, con):
+        self.con = con
+        self.scans = 0
+
+    def execute(self, sql: str, params=None):
+        try:
+            plan = "".join(row[1] for row in self.con.execute(f"EXPLAIN {sql}", params).fetchall())
+        except Exception:  # noqa: BLE001 - DDL without a plan (DROP, CREATE VIEW, ...)
+            plan = ""
+        self.scans += len(_TRENDING_SCAN.findall(plan))
+        return self.con.execute(sql, params)
+
+
+def _make_source(path: Path, scale: int) -> int:
+    published = published_db_path()
+    if published is None:
+        raise SystemExit("No published database; run scripts/refresh_data.py first")
+    con = connect(path)
+    try:
+        con.execute(f"ATTACH '{published.as_posix()}' AS src (READ_ONLY);")
+        con.execute(
+            f"""
+            CREATE TABLE trending AS
+            SELECT t.* REPLACE (CASE WHEN i = 0 THEN video_id ELSE video_id || '~' || i END AS video_id)
+            FROM src.trending t, range({scale}) r(i)
+            ORDER BY video_trending_country, video_trending_date;
+            """
+        )
+        con.execute("DETACH src;")
+        return con.execute("SELECT count(*) FROM trending").fetchone()[0]
+    finally:
+        con.close()
+
+
+def _run(source: Path, target: Path, fn, count: bool = False) -> tuple[float, int]:
+    shutil.copyfile(source, target)
+    con = connect(target)
+    try:
+        runner = _ScanCounter(con) if count else con
+        t0 = time.perf_counter()
+        fn(runner)
+        return time.perf_counter() - t0, runner.scans if count else 0
+    finally:
+        con.close()
+
+
+def _compare(con, table: str) -> int:
+    """Rows in one variant's table but not the other's (both directions)."""
+    cols = ", ".join(UNSTABLE_COLUMNS.get(table, []))
+    select = f"SELECT * EXCLUDE ({cols})" if cols else "SELECT *"
+    return con.execute(
+        f"""
+        SELECT
+          (SELECT count(*) FROM ({select} FROM legacy.{table} EXCEPT ALL {select} FROM fused.{table}))
+          + (SELECT count(*) FROM ({select} FROM fused.{table} EXCEPT ALL {select} FROM legacy.{table}))
+        """
+    ).fetchone()[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scale", type=int, default=1, help="Stack this many copies of trending.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="analytics_bench_") as tmp:
+        tmp_dir = Path(tmp)
+        source = tmp_dir / "source.duckdb"
+        rows = _make_source(source, args.scale)
+        print(f"trending rows: {rows:,}")
+
+        variants = {"legacy": legacy_build, "fused": build}
+        results = {}
+        for name, fn in variants.items():
+            _, scans = _run(source, tmp_dir / f"{name}.duckdb", fn, count=True)
+            best = min(_run(source, tmp_dir / f"{name}.duckdb", fn)[0] for _ in range(args.repeat))
+            results[name] = (scans, best * 1000)
+
+        con = connect()
+        try:
+            for name in variants:
+                con.execute(f"ATTACH '{(tmp_dir / f'{name}.duckdb').as_posix()}' AS {name} (READ_ONLY);")
+            for table in TABLES:
+                diff = _compare(con, table)
+                assert diff == 0, f"{table}: {diff} rows differ between legacy and fused"
+        finally:
+            con.close()
+
+        print(f"{'variant':<10}{'trending scans':>16}{'best ms':>12}")
+        for name, (scans, ms) in results.items():
+            print(f"{name:<10}{scans:>16}{ms:>12.1f}")
+        legacy_ms, fused_ms = results["legacy"][1], results["fused"][1]
+        print(f"speedup: {legacy_ms / fused_ms:.2f}x (tables identical: {', '.join(TABLES)})")
+
+
+if __name__ == "__main__":
+    main()
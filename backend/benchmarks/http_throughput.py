@@ -0,0 +1,159 @@
+"""
+HTTP throughput: development server vs the production entry points.
+
+Run from backend/:  python -m benchmarks.http_throughput [--servers dev,gunicorn,waitress]
+                        [--concurrency 16] [--duration 10] [--cache]
+
+Each server is started as a subprocess on a free port against the published
+database, warmed up, then hit by `concurrency` keep-alive clients cycling
+through a mix of dashboard routes for `duration` seconds. The response cache
+is disabled unless --cache is given, so every request runs its query.
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+PATHS = [
+    "/api/us/trending?limit=200",
+    "/api/us/top?metric=views&limit=20",
+    "/api/us/top_advanced?metric=stickiness&limit=20",
+    "/api/us/channels/daily?limit=20",
+    "/api/us/channels/alltime?limit=20",
+    "/api/us/tags/top?limit=50",
+    "/api/us/tags/rising?limit=50",
+    "/api/us/search/videos?q=music&scope=all",
+]
+
+SERVERS = {
+    # What `python -m app.main` runs, minus the reloader's second process
+    "dev": [
+        sys.executable,
+        "-c",
+        "import os; from app.main import create_app; "
+        "create_app().run(host='127.0.0.1', port=int(os.environ['PORT']), debug=True, use_reloader=False)",
+    ],
+    "gunicorn": [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.wsgi:app"],
+    "waitress": [sys.executable, "-m", "app.wsgi"],
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(port: int, proc: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+
+def _client(port: int, offset: int, stop_at: float, latencies: list[float], errors: list[int]) -> None:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    i = offset
+    while time.monotonic() < stop_at:
+        path = PATHS[i % len(PATHS)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                errors.append(resp.status)
+        except (OSError, http.client.HTTPException):
+            errors.append(0)
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - started)
+    conn.close()
+
+
+def run(name: str, concurrency: int, duration: float, cache: bool) -> dict:
+    port = _free_port()
+    env = {**os.environ, "PORT": str(port), "HOST": "127.0.0.1"}
+    if not cache:
+        env["API_CACHE_MAX_ENTRIES"] = "0"
+
+    proc = subprocess.Popen(
+        SERVERS[name], cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        _wait_ready(port, proc)
+        # Warm-up: open the database and pool cursors in every worker
+        _client(port, 0, time.monotonic() + 1.0, [], [])
+
+        latencies: list[float] = []
+        errors: list[int] = []
+        stop_at = time.monotonic() + duration
+        threads = [
+            threading.Thread(target=_client, args=(port, i, stop_at, latencies, errors))
+            for i in range(concurrency)
+        ]
+        started = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.monotonic() - started
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else float("nan"),
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else float("nan"),
+        "errors": len(errors),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servers", default="dev,gunicorn,waitress")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--cache", action="store_true", help="keep the response cache enabled")
+    args = parser.parse_args()
+
+    print(f"{'server':<10} {'requests':>9} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for name in args.servers.split(","):
+        try:
+            r = run(name, args.concurrency, args.duration, args.cache)
+        except (RuntimeError, FileNotFoundError) as e:
+            print(f"{name:<10} skipped: {e}")
+            continue
+        print(
+            f"{name:<10} {r['requests']:>9} {r['rps']:>9.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
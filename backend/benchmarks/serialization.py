@@ -0,0 +1,93 @@
+"""
+Microbenchmark: row-dict + jsonify vs columnar fetch_rows + json_response.
+
+Run from backend/:  python -m benchmarks.serialization [--repeat 20]
+
+Both paths run the same SQL against the published database. That their
+response bodies are byte-identical is tested in tests/test_serialize.py.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from flask import jsonify
+
+from app.api.serialize import fetch_rows, json_response
+from app.db.duckdb_client import get_conn
+from app.main import create_app
+
+CASES = {
+    "leaderboard_200": """
+        SELECT video_id, video_title, channel_title, video_default_thumbnail,
+               video_view_count, video_like_count, video_comment_count,
+               CAST(date AS VARCHAR) AS video_trending_date
+        FROM daily_leaderboard
+        ORDER BY country, date DESC, rank_views
+        LIMIT 200
+    """,
+    "leaderboard_500": """
+        SELECT video_id, video_title, channel_title, video_default_thumbnail,
+               video_view_count, video_like_count, video_comment_count, days_trended,
+               countries_count, CAST(date AS VARCHAR) AS video_trending_date
+        FROM daily_leaderboard
+        ORDER BY country, date DESC, rank_views
+        LIMIT 500
+    """,
+    "leaderboard_20000": """
+        SELECT video_id, video_title, channel_title, video_default_thumbnail,
+               video_view_count, video_like_count, video_comment_count,
+               CAST(date AS VARCHAR) AS video_trending_date
+        FROM daily_leaderboard
+        LIMIT 20000
+    """,
+    # Escaping, NULLs, floats and HUGEINT sums
+    "mixed_types": """
+        SELECT
+          'Título "quoted" \\ 日本語 ' || i AS title,
+          CASE WHEN i % 3 = 0 THEN NULL ELSE i * 1.0 / 7 END AS ratio,
+          sum(i) OVER () AS total,
+          i % 2 = 0 AS even
+        FROM range(500) r(i)
+    """,
+}
+
+
+def _legacy(con, sql: str):
+    cur = con.execute(sql)
+    cols = [c[0] for c in cur.description]
+    rows = [dict(zip(cols, row)) for row in cur.fetchall()]
+    return jsonify({"count": len(rows), "results": rows}).get_data()
+
+
+def _columnar(con, sql: str):
+    rows = fetch_rows(con.execute(sql))
+    return json_response({"count": len(rows), "results": rows}).get_data()
+
+
+def _best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context(), get_conn() as con:
+        print(f"{'case':<20}{'rows':>8}{'legacy ms':>12}{'columnar ms':>14}{'speedup':>10}")
+        for name, sql in CASES.items():
+            n = len(con.execute(sql).fetchall())
+            legacy_ms = _best_ms(lambda: _legacy(con, sql), args.repeat)
+            columnar_ms = _best_ms(lambda: _columnar(con, sql), args.repeat)
+            print(f"{name:<20}{n:>8}{legacy_ms:>12.2f}{columnar_ms:>14.2f}{legacy_ms / columnar_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Tag routes: rows scanned and latency with the tag tables unsorted vs in their layouts.
+
+Run from backend/:  python -m benchmarks.tag_layouts [--repeat 20] [--scale 200] [--vocab-scale 20000]
+
+Two private copies of the published database's tag tables are built, stacked
+into many copies with distinct tag ids for a realistically large input:
+--scale copies of the per-video tables (tag_events_clean, tag_video_stats_clean)
+and --vocab-scale copies of the much smaller tag_dim, tag_monthly_clean and
+tag_movers_clean.
+  - unsorted: every table in arbitrary (shuffled) order, /tags/series read from
+    tag_monthly_clean
+  - sorted:   the LAYOUTS of create_tag_clean_analytics.py, /tags/series read
+    from the tag_monthly_by_tag copy
+For the lookup behind each tag route (first page, US, latest month, a mid-range
+tag) the benchmark reports the rows in the row groups whose min/max admit the
+lookup, which is what DuckDB's zone maps leave to scan, and the best latency.
+It also checks that both layouts return the same rows.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR / "scripts"))
+
+from create_tag_clean_analytics import LAYOUTS, US  # noqa: E402
+from db_versions import published_db_path  # noqa: E402
+from duckdb_settings import connect  # noqa: E402
+
+# DuckDB's default rows per row group, the granularity of its zone maps
+ROW_GROUP_SIZE = 122_880
+
+# Copy of each tag table with its tag ids (and ranks) spread over `{copies}` copies
+SCALED = {
+    "tag_dim": "SELECT t.tag_id + i * {span} AS tag_id, t.tag || '~' || i AS tag FROM src.tag_dim t",
+    "tag_events_clean": "SELECT t.* REPLACE (t.tag_id + i * {span} AS tag_id) FROM src.tag_events_clean t",
+    "tag_video_stats_clean": "SELECT t.* REPLACE (t.tag_id + i * {span} AS tag_id) FROM src.tag_video_stats_clean t",
+    "tag_monthly_clean": "SELECT t.* REPLACE (t.tag_id + i * {span} AS tag_id) FROM src.tag_monthly_clean t",
+    "tag_movers_clean": """
+        SELECT t.* REPLACE (
+          t.tag_id + i * {span} AS tag_id,
+          (t.rising_rank - 1) * {copies} + i + 1 AS rising_rank,
+          (t.falling_rank - 1) * {copies} + i + 1 AS falling_rank
+        )
+        FROM src.tag_movers_clean t
+    """,
+}
+
+# route -> (table, zone-map filter columns, first-page query); {series} is the series table
+ROUTES = {
+    "top": (
+        "tag_monthly_clean",
+        ("country", "month"),
+        """
+        SELECT tag_id, distinct_videos, total_videos_tagged, video_share
+        FROM tag_monthly_clean WHERE country = $country AND month = $month
+        ORDER BY coalesce(video_share, -1) DESC, tag_id LIMIT 50
+        """,
+    ),
+    "rising": (
+        "tag_movers_clean",
+        ("country", "month"),
+        """
+        SELECT tag_id, share_prev, share_now, delta, lift
+        FROM tag_movers_clean WHERE country = $country AND month = $month AND rising_rank IS NOT NULL
+        ORDER BY rising_rank LIMIT 50
+        """,
+    ),
+    "falling": (
+        "tag_movers_clean",
+        ("country", "month"),
+        """
+        SELECT tag_id, share_prev, share_now, delta, lift
+        FROM tag_movers_clean WHERE country = $country AND month = $month AND falling_rank IS NOT NULL
+        ORDER BY falling_rank LIMIT 50
+        """,
+    ),
+    "videos": (
+        "tag_video_stats_clean",
+        ("country", "month", "tag_id"),
+        """
+        SELECT * EXCLUDE (country, month, tag_id)
+        FROM tag_video_stats_clean WHERE country = $country AND month = $month AND tag_id = $tag_id
+        ORDER BY views_rank LIMIT 20
+        """,
+    ),
+    "series": (
+        "{series}",
+        ("country", "tag_id"),
+        """
+        SELECT month, video_share, distinct_videos, total_videos_tagged
+        FROM {series} WHERE country = $country AND tag_id = $tag_id
+        ORDER BY month
+        """,
+    ),
+}
+
+SERIES_TABLE = {"unsorted": "tag_monthly_clean", "sorted": "tag_monthly_by_tag"}
+
+
+def _build(path: Path, published: Path, layout: str, scale: int, vocab_scale: int) -> None:
+    con = connect(path)
+    try:
+        con.execute(f"ATTACH '{published.as_posix()}' AS src (READ_ONLY);")
+        span = con.execute("SELECT max(tag_id) FROM src.tag_dim").fetchone()[0]
+        con.execute("SELECT setseed(0.5);")
+        for table, select in SCALED.items():
+            order = LAYOUTS[table] if layout == "sorted" else "random()"
+            copies = scale if table in ("tag_events_clean", "tag_video_stats_clean") else vocab_scale
+            con.execute(
+                f"""
+                CREATE TABLE {table} AS
+                SELECT * FROM ({select.format(span=span, copies=copies)}, range({copies}) r(i))
+                ORDER BY {order};
+                """
+            )
+        if layout == "sorted":
+            con.execute(
+                f"CREATE TABLE tag_monthly_by_tag AS SELECT * FROM tag_monthly_clean ORDER BY {LAYOUTS['tag_monthly_by_tag']};"
+            )
+        con.execute("DETACH src;")
+        con.execute("CHECKPOINT;")
+    finally:
+        con.close()
+
+
+def _rows_scanned(con, table: str, filters: dict) -> int:
+    """Rows in the row groups whose min/max on every filter column admit the lookup."""
+    zones = ", ".join(f"min({c}) AS lo_{c}, max({c}) AS hi_{c}" for c in filters)
+    admit = " AND ".join(f"${c} BETWEEN lo_{c} AND hi_{c}" for c in filters)
+    return con.execute(
+        f"""
+        SELECT coalesce(sum(n), 0)
+        FROM (SELECT rowid // {ROW_GROUP_SIZE} AS rg, count(*) AS n, {zones} FROM {table} GROUP BY rg)
+        WHERE {admit}
+        """,
+        filters,
+    ).fetchone()[0]
+
+
+def _measure(con, layout: str, lookup: dict, repeat: int) -> dict:
+    results = {}
+    for route, (table, columns, sql) in ROUTES.items():
+        table = table.format(series=SERIES_TABLE[layout])
+        sql = sql.format(series=SERIES_TABLE[layout])
+        params = {c: lookup[c] for c in ("country", "month", "tag_id") if f"${c}" in sql}
+        rows = con.execute(sql, params).fetchall()
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            con.execute(sql, params).fetchall()
+            best = min(best, time.perf_counter() - t0)
+        scanned = _rows_scanned(con, table, {c: lookup[c] for c in columns})
+        results[route] = (scanned, best * 1000, sorted(rows, key=repr))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--scale", type=int, default=200, help="Stack this many copies of the per-video tag tables.")
+    parser.add_argument(
+        "--vocab-scale", type=int, default=20000, help="Stack this many copies of the per-tag tables."
+    )
+    args = parser.parse_args()
+
+    published = published_db_path()
+    if published is None:
+        raise SystemExit("No published database; run scripts/refresh_data.py first")
+
+    with tempfile.TemporaryDirectory(prefix="tag_layouts_bench_") as tmp:
+        results = {}
+        for layout in ("unsorted", "sorted"):
+            path = Path(tmp) / f"{layout}.duckdb"
+            _build(path, published, layout, args.scale, args.vocab_scale)
+            con = connect(path)
+            try:
+                if layout == "unsorted":
+                    month = con.execute("SELECT max(month) FROM tag_monthly_clean WHERE country = ?", [US]).fetchone()[0]
+                    tag_id = con.execute(
+                        "SELECT quantile_disc(tag_id, 0.5) FROM tag_events_clean WHERE country = ? AND month = ?",
+                        [US, month],
+                    ).fetchone()[0]
+                    lookup = {"country": US, "month": month, "tag_id": tag_id}
+                    sizes = {t: con.execute(f"SELECT count(*) FROM {t}").fetchone()[0] for t in SCALED}
+                    print("rows: " + ", ".join(f"{t} {n:,}" for t, n in sizes.items()))
+                results[layout] = _measure(con, layout, lookup, args.repeat)
+            finally:
+                con.close()
+
+    print(f"{'route':<10}{'unsorted rows':>16}{'sorted rows':>14}{'unsorted ms':>14}{'sorted ms':>12}")
+    for route in ROUTES:
+        (u_rows, u_ms, u_out), (s_rows, s_ms, s_out) = results["unsorted"][route], results["sorted"][route]
+        assert u_out == s_out, f"{route}: layouts return different rows"
+        print(f"{route:<10}{u_rows:>16,}{s_rows:>14,}{u_ms:>14.2f}{s_ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Tag explode + clean: the regexp_replace chain in SQL vs the shared Arrow normalizer.
+
+Run from backend/:  python -m benchmarks.tag_normalize [--repeat 3] [--country "United States"]
+
+Both variants build tag_events_clean from the published database's trending
+rows of one country (the full US history by default) and the benchmark
+reports the best wall time of each. It then cleans every distinct raw tag of
+that history with the shared normalizer and counts the tags the old SQL rules
+cleaned differently, with examples. The rules themselves are pinned by
+tests/test_tag_normalize.py.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pyarrow as pa
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR / "scripts"))
+
+from app.tag_normalize import normalize_tags  # noqa: E402
+from create_tag_clean_analytics import US, clean_tag_events  # noqa: E402
+from db_versions import published_db_path  # noqa: E402
+from duckdb_settings import connect  # noqa: E402
+
+# create_tag_clean_analytics.py before the shared normalizer (regexp_replace without
+# 'g' only rewrites the first match, so '"tag"' kept its closing quote)
+LEGACY_CLEAN = r"""
+    regexp_replace(
+      regexp_replace(
+        regexp_replace(lower(trim({col})), '^#+', ''),
+        '\s+', ' '
+      ),
+      '(^"+|"+$)', ''
+    )
+"""
+
+LEGACY_SQL = f"""
+    CREATE OR REPLACE TEMP TABLE bench_tag_events AS
+    WITH base AS (
+      SELECT
+        t.video_trending_country AS country,
+        t.video_id,
+        t.video_trending_date,
+        date_trunc('month', t.video_trending_date) AS month,
+        unnest(str_split(t.video_tags, ',')) AS tag_raw
+      FROM src.trending t
+      WHERE t.video_trending_country = ?
+        AND t.video_trending_date IS NOT NULL
+        AND t.video_tags IS NOT NULL
+    ),
+    cleaned AS (
+      SELECT country, video_id, video_trending_date, month, {LEGACY_CLEAN.format(col="tag_raw")} AS tag
+      FROM base
+    )
+    SELECT DISTINCT country, video_id, video_trending_date, month, tag
+    FROM cleaned
+    WHERE tag IS NOT NULL
+      AND tag <> ''
+      AND length(tag) >= 2
+      AND length(tag) <= 80
+      AND tag NOT LIKE 'yt:%'
+      AND tag NOT LIKE '%http%'
+      AND tag NOT LIKE '%https%'
+      AND tag NOT LIKE '%www.%'
+      AND tag NOT LIKE '%@%'
+    ORDER BY country, month, tag;
+"""
+
+ARROW_SQL = """
+    CREATE OR REPLACE TEMP TABLE bench_tag_events AS
+    SELECT DISTINCT
+      country,
+      video_id,
+      video_trending_date,
+      date_trunc('month', video_trending_date) AS month,
+      tag
+    FROM tag_events_raw
+    ORDER BY country, month, tag;
+"""
+
+
+class _Source:
+    """Connection stand-in that reads `trending` from the attached published database."""
+
+    def __init__(self, con):
+        self.con = con
+
+    def cursor(self):
+        cur = self.con.cursor()
+        cur.execute("USE src;")
+        return cur
+
+
+def legacy_build(con, country: str) -> int:
+    con.execute(LEGACY_SQL, [country])
+    return con.execute("SELECT count(*) FROM bench_tag_events").fetchone()[0]
+
+
+def arrow_build(con, country: str) -> int:
+    con.register("tag_events_raw", clean_tag_events(_Source(con), country))
+    try:
+        con.execute(ARROW_SQL)
+    finally:
+        con.unregister("tag_events_raw")
+    return con.execute("SELECT count(*) FROM bench_tag_events").fetchone()[0]
+
+
+def _best(fn, con, country: str, repeat: int) -> tuple[float, int]:
+    best, rows = float("inf"), 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        rows = fn(con, country)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000, rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--country", default=US)
+    args = parser.parse_args()
+
+    published = published_db_path()
+    if published is None:
+        raise SystemExit("No published database; run scripts/refresh_data.py first")
+
+    con = connect()
+    try:
+        con.execute(f"ATTACH '{published.as_posix()}' AS src (READ_ONLY);")
+        trending_rows = con.execute(
+            "SELECT count(*) FROM src.trending WHERE video_trending_country = ?", [args.country]
+        ).fetchone()[0]
+        print(f"{args.country} trending rows: {trending_rows:,}")
+
+        results = {
+            "sql regexp": _best(legacy_build, con, args.country, args.repeat),
+            "arrow": _best(arrow_build, con, args.country, args.repeat),
+        }
+        print(f"{'variant':<12}{'tag events':>12}{'best ms':>12}")
+        for name, (ms, rows) in results.items():
+            print(f"{name:<12}{rows:>12,}{ms:>12.1f}")
+        print(f"speedup: {results['sql regexp'][0] / results['arrow'][0]:.2f}x")
+
+        # Every distinct raw tag, with the old SQL cleaning alongside for the drift count
+        raw = con.execute(
+            f"""
+            SELECT tag_raw, {LEGACY_CLEAN.format(col="tag_raw")} AS legacy
+            FROM (
+              SELECT DISTINCT unnest(str_split(video_tags, ',')) AS tag_raw
+              FROM src.trending
+              WHERE video_trending_country = ? AND video_tags IS NOT NULL
+            )
+            ORDER BY tag_raw
+            """,
+            [args.country],
+        ).fetch_arrow_table()
+    finally:
+        con.close()
+
+    batch = normalize_tags(raw.column("tag_raw")).to_pylist()
+    print(f"\n{len(batch):,} distinct raw tags")
+
+    drift = pa.table({"raw": raw.column("tag_raw"), "legacy": raw.column("legacy"), "now": pa.array(batch)})
+    drift = [row for row in drift.to_pylist() if row["legacy"] != row["now"]]
+    print(f"old SQL rules cleaned {len(drift):,} of them differently")
+    for row in drift[:5]:
+        print(f"  {row['raw']!r}: {row['legacy']!r} -> {row['now']!r}")
+
+
+if __name__ == "__main__":
+    main()
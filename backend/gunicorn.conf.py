@@ -0,0 +1,62 @@
+"""
+Gunicorn settings for the API. Run from backend/:
+
+    gunicorn -c gunicorn.conf.py app.wsgi:app
+
+Every setting can be overridden with the environment variable next to it
+(backend/.env is read too). Workers are pre-forked processes, each running
+`threads` request threads over its own read-only DuckDB handle and cursor pool.
+"""
+import multiprocessing
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).resolve().parent / ".env")
+
+_cpus = multiprocessing.cpu_count()
+
+bind = os.getenv("GUNICORN_BIND", f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '5000')}")
+workers = int(os.getenv("GUNICORN_WORKERS", str(min(4, _cpus))))
+
+# Threaded workers: DuckDB calls block but release the GIL, so threads overlap
+# queries without an async framework. Keep threads <= DUCKDB_POOL_SIZE so
+# every request thread can reuse a pooled cursor.
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+
+# Split the cores between workers instead of letting every DuckDB instance use all of them
+os.environ.setdefault("DUCKDB_THREADS", str(max(1, _cpus // workers)))
+
+# Import the app (and check the database opens) once in the parent, then fork
+preload_app = True
+
+# SIGTERM / SIGINT: stop accepting, let in-flight requests finish for up to
+# graceful_timeout seconds, then exit
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+
+
+def when_ready(server):
+    from app.wsgi import preload
+
+    preload()
+    server.log.info("Database preloaded; forking %s workers x %s threads", workers, threads)
+
+
+def pre_fork(server, worker):
+    # Never hand a DuckDB handle opened in the parent to a child
+    from app.db.duckdb_client import reset_pool
+
+    reset_pool()
+
+
+def worker_exit(server, worker):
+    from app.db.duckdb_client import reset_pool
+
+    reset_pool()
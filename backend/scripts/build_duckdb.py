@@ -1,122 +1,287 @@
+import argparse
+import json
+from datetime import datetime, timezone
 from pathlib import Path
-import duckdb
 
-DATASET_CSV_REL = Path("data/raw/youtube_trending_global/youtube_trending_videos_global.csv")
-OUT_DB_REL = Path("data/processed/trending.duckdb")
+from db_versions import PROCESSED_DIR, build_target
+from duckdb_settings import Settings, add_arguments, connect
+from stage_parquet import RAW_CSV, parquet_glob, read_parquet_sql, stage
 
 # YouTube video IDs are typically 11 chars: letters, numbers, _ or -
 VIDEO_ID_REGEX = r"^[A-Za-z0-9_-]{11}$"
 
+QA_DIR = PROCESSED_DIR / "qa"
 
-def main():
-    project_root = Path(__file__).resolve().parents[2]  # youtube-trending-app/
+# Reject reason codes stored in trending_rejects, in the order the checks run
+# (a row is rejected for the first check it fails)
+REJECT_BAD_DATE = "bad_trending_date"
+REJECT_BAD_VIDEO_ID = "invalid_video_id"
 
-    raw_csv = project_root / DATASET_CSV_REL
-    out_db = project_root / OUT_DB_REL
-    out_db.parent.mkdir(parents=True, exist_ok=True)
 
-    if not raw_csv.exists():
-        raise FileNotFoundError(f"Raw CSV not found at: {raw_csv}")
+def _classify_sql(source: str, where: str = "") -> str:
+    """Every staged row classified once: parsed date, id check, first failing check."""
+    return f"""
+    SELECT
+      *,
+      CASE
+        WHEN parsed_trending_date IS NULL THEN '{REJECT_BAD_DATE}'
+        WHEN NOT is_valid_video_id THEN '{REJECT_BAD_VIDEO_ID}'
+      END AS reject_reason
+    FROM (
+      SELECT
+        *,
+        try_cast(replace(video_trending__date, '.', '-') AS DATE) AS parsed_trending_date,
+        coalesce(regexp_matches(video_id, '{VIDEO_ID_REGEX}'), false) AS is_valid_video_id
+      FROM {source}
+      {where}
+    )
+    """
 
-    # DuckDB prefers forward slashes in file paths on Windows
-    csv_path = raw_csv.as_posix()
 
-    con = duckdb.connect(str(out_db))
-    try:
-        # Performance + progress bar
-        con.execute("PRAGMA threads=4;")
-        con.execute("PRAGMA enable_progress_bar;")
+# Cleaned columns of `trending`, selected from the accepted rows of trending_staged
+CLEAN_SELECT = """
+    SELECT
+      video_id,
+      try_cast(video_published_at AS TIMESTAMPTZ) AS video_published_at,
+      parsed_trending_date AS video_trending_date,
+      video_trending_country,
+      channel_id,
+      video_title,
+      video_description,
+      video_default_thumbnail,
+      try_cast(video_category_id AS INTEGER) AS video_category_id,
+      video_tags,
+      video_duration,
+      video_dimension,
+      video_definition,
+      video_licensed_content,
+      try_cast(video_view_count AS BIGINT) AS video_view_count,
+      try_cast(video_like_count AS BIGINT) AS video_like_count,
+      try_cast(video_comment_count AS BIGINT) AS video_comment_count,
+      channel_title,
+      channel_description,
+      channel_custom_url,
+      try_cast(channel_published_at AS TIMESTAMPTZ) AS channel_published_at,
+      channel_country,
+      try_cast(channel_view_count AS BIGINT) AS channel_view_count,
+      try_cast(channel_subscriber_count AS BIGINT) AS channel_subscriber_count,
+      channel_have_hidden_subscribers,
+      try_cast(channel_video_count AS BIGINT) AS channel_video_count,
+      channel_localized_title,
+      channel_localized_description
+    FROM trending_staged
+    WHERE reject_reason IS NULL
+"""
 
-        # ---------------------------------------------------------------------
-        # 1) Load raw safely: force tricky columns to VARCHAR to avoid auto-detect
-        # ---------------------------------------------------------------------
-        con.execute("DROP TABLE IF EXISTS trending_raw;")
-        con.execute(
-            f"""
-            CREATE TABLE trending_raw AS
-            SELECT *
-            FROM read_csv(
-                '{csv_path}',
-                header=true,
-                auto_detect=true,
-                sample_size=-1,
-                types={{
-                    'video_trending__date': 'VARCHAR',
-                    'video_published_at': 'VARCHAR',
-                    'channel_published_at': 'VARCHAR'
-                }}
-            );
-            """
-        )
+# Rejected rows keep every source column plus the reason and the parsed date (if any)
+REJECTS_SELECT = """
+    SELECT
+      reject_reason,
+      parsed_trending_date AS video_trending_date,
+      * EXCLUDE (reject_reason, parsed_trending_date, is_valid_video_id, trending_month),
+      now() AS rejected_at
+    FROM trending_staged
+    WHERE reject_reason IS NOT NULL
+"""
 
-        # QA stats on raw
-        raw_stats = con.execute(
-            f"""
-            SELECT
-              count(*) AS total_raw,
-              sum(CAST(try_cast(replace(video_trending__date, '.', '-') AS DATE) IS NULL AS INT)) AS bad_date_rows,
-              sum(CAST(NOT regexp_matches(video_id, '{VIDEO_ID_REGEX}') AS INT)) AS invalid_video_id_rows
-            FROM trending_raw;
-            """
-        ).fetchone()
+INCREMENTAL_TABLES = {"trending", "ingest_watermark", "trending_rejects"}
+
+
+def _existing_tables(con) -> set[str]:
+    return {
+        r[0]
+        for r in con.execute(
+            "SELECT table_name FROM information_schema.tables WHERE table_schema = 'main'"
+        ).fetchall()
+    }
+
+
+def _watermarks(con) -> list[tuple[str, str, str]]:
+    """(country, max_date, 'YYYY-MM' of max_date) for every country in ingest_watermark."""
+    return con.execute(
+        "SELECT country, CAST(max_date AS VARCHAR), strftime(max_date, '%Y-%m') FROM ingest_watermark"
+    ).fetchall()
 
-        total_raw, bad_date_rows, invalid_video_id_rows = raw_stats
 
-        print(f"\nRaw table built: trending_raw")
-        print(f"Total raw rows: {total_raw:,}")
-        print(f"Rows with bad/unparseable trending date: {bad_date_rows:,}")
-        print(f"Rows with invalid video_id format: {invalid_video_id_rows:,}")
+def _delta_rows(marks: list[tuple[str, str, str]]) -> str:
+    """
+    Which source rows the incremental load re-reads: rows dated on/after their
+    country's watermark, every row with an unparseable date, and every row of a
+    country without a watermark. Only reads raw source columns, so it applies to
+    trending_rejects (which keeps them) as well as to the staged Parquet.
+    """
+    known = ", ".join(f"'{_sql_str(country)}'" for country, _, _ in marks) or "NULL"
+    rows = [
+        f"(video_trending_country = '{_sql_str(country)}'"
+        f" AND try_cast(replace(video_trending__date, '.', '-') AS DATE) >= DATE '{max_date}')"
+        for country, max_date, _ in marks
+    ]
+    unseen = f"video_trending_country NOT IN ({known})"
+    bad_dates = "try_cast(replace(video_trending__date, '.', '-') AS DATE) IS NULL"
+    return "(" + "\n                OR ".join(rows + [bad_dates, unseen]) + ")"
+
+
+def _delta_filter(marks: list[tuple[str, str, str]]) -> str:
+    """
+    Row filter for the incremental load: _delta_rows, plus a partition-only half
+    written with literals so DuckDB skips whole country/month Parquet files before
+    reading them. Rows with an unparseable date (trending_month=NULL) are always
+    re-read, so their rejects stay current.
+    """
+    known = ", ".join(f"'{_sql_str(country)}'" for country, _, _ in marks) or "NULL"
+    partitions = [
+        f"(video_trending_country = '{_sql_str(country)}' AND trending_month >= '{month}')"
+        for country, _, month in marks
+    ]
+    unseen = f"video_trending_country NOT IN ({known})"
+    sep = "\n                OR "
+    return f"WHERE ({sep.join(partitions + ['trending_month IS NULL', unseen])})\n              AND {_delta_rows(marks)}"
+
+
+def _sql_str(value: str) -> str:
+    return value.replace("'", "''")
+
+
+def _country_stats(con) -> list[dict]:
+    """Per-country QA counters, aggregated in one pass over trending_staged."""
+    cur = con.execute(
+        f"""
+        SELECT
+          video_trending_country AS country,
+          count(*) AS rows_read,
+          count(*) FILTER (WHERE reject_reason IS NULL) AS rows_accepted,
+          count(*) FILTER (WHERE reject_reason = '{REJECT_BAD_DATE}') AS rejected_{REJECT_BAD_DATE},
+          count(*) FILTER (WHERE reject_reason = '{REJECT_BAD_VIDEO_ID}') AS rejected_{REJECT_BAD_VIDEO_ID},
+          count(*) FILTER (WHERE parsed_trending_date IS NULL) AS failed_{REJECT_BAD_DATE},
+          count(*) FILTER (WHERE NOT is_valid_video_id) AS failed_{REJECT_BAD_VIDEO_ID},
+          CAST(min(parsed_trending_date) FILTER (WHERE reject_reason IS NULL) AS VARCHAR) AS min_date,
+          CAST(max(parsed_trending_date) FILTER (WHERE reject_reason IS NULL) AS VARCHAR) AS max_date
+        FROM trending_staged
+        GROUP BY 1
+        ORDER BY 1 NULLS LAST
+        """
+    )
+    names = [d[0] for d in cur.description]
+    return [dict(zip(names, row)) for row in cur.fetchall()]
+
+
+def _qa_report(stats: list[dict], **extra) -> dict:
+    reasons = (REJECT_BAD_DATE, REJECT_BAD_VIDEO_ID)
+    rows_read = sum(s["rows_read"] for s in stats)
+    rows_accepted = sum(s["rows_accepted"] for s in stats)
+    return {
+        **extra,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "rows_read": rows_read,
+        "rows_accepted": rows_accepted,
+        "rows_rejected": rows_read - rows_accepted,
+        # A row counts once, under the first check it failed
+        "rejects_by_reason": {r: sum(s[f"rejected_{r}"] for s in stats) for r in reasons},
+        # Every failed check, so one row can count under several
+        "failed_checks": {r: sum(s[f"failed_{r}"] for s in stats) for r in reasons},
+        "countries": stats,
+    }
+
+
+def _load(out_db: Path, args: argparse.Namespace, settings: Settings) -> None:
+    out_db.parent.mkdir(parents=True, exist_ok=True)
+
+    # No-op when the CSV's content hash matches the staged Parquet
+    staged = stage(RAW_CSV, settings=settings)
+
+    con = connect(out_db, settings)
+    try:
+        print(f"DuckDB settings: {settings.describe()}")
+        con.execute("PRAGMA enable_progress_bar;")
+
+        # Incremental unless asked otherwise: the database already holds `trending`,
+        # its rejects and ingest_watermark (max trending date per country) from an earlier build.
+        missing = INCREMENTAL_TABLES - _existing_tables(con)
+        incremental = not args.full and not missing
+        if incremental:
+            print("Incremental load: rows on or after each country's watermark date")
+            for country, max_date in con.execute(
+                "SELECT country, CAST(max_date AS VARCHAR) FROM ingest_watermark ORDER BY country"
+            ).fetchall():
+                print(f" - {country}: {max_date}")
+        elif args.full:
+            print("Full load of the staged raw data")
+        else:
+            print(f"Full load of the staged raw data (no earlier {', '.join(sorted(missing))})")
 
         # ---------------------------------------------------------------------
-        # 2) Build cleaned table with controlled parsing + strict validity filters
+        # 1) Read the staged Parquet (typed, partitioned by country/month) once and
+        #    classify every row:
         #    - parsed_trending_date must be non-null
         #    - video_id must match YouTube ID regex
+        #    Incremental: keep only rows dated on/after their country's watermark
+        #    (the watermark day itself is re-read so late rows for it are merged),
+        #    plus every row of countries not seen before.
         # ---------------------------------------------------------------------
-        con.execute("DROP TABLE IF EXISTS trending;")
+        con.execute("DROP TABLE IF EXISTS trending_raw;")  # pre-Parquet builds kept a raw copy
+        marks = _watermarks(con) if incremental else []
         con.execute(
-            f"""
-            CREATE TABLE trending AS
-            WITH parsed AS (
-              SELECT
-                *,
-                try_cast(replace(video_trending__date, '.', '-') AS DATE) AS parsed_trending_date,
-                regexp_matches(video_id, '{VIDEO_ID_REGEX}') AS is_valid_video_id
-              FROM trending_raw
+            "CREATE OR REPLACE TEMP TABLE trending_staged AS "
+            + _classify_sql(read_parquet_sql(parquet_glob()), _delta_filter(marks) if incremental else "")
+        )
+        stats = _country_stats(con)
+
+        # ---------------------------------------------------------------------
+        # 2) Accepted rows -> trending, stored sorted by (country, date) so
+        #    per-country scans skip other countries; failures -> trending_rejects.
+        #    Incremental: the delta replaces each country's rows from its watermark day on
+        # ---------------------------------------------------------------------
+        replaced = 0
+        if incremental:
+            delta_countries = "SELECT DISTINCT video_trending_country FROM trending_staged"
+            replaced = con.execute(
+                f"""
+                DELETE FROM trending t
+                USING ingest_watermark w
+                WHERE t.video_trending_country = w.country
+                  AND t.video_trending_date >= w.max_date
+                  AND w.country IN ({delta_countries});
+                """
+            ).fetchone()[0]
+            # Every reject the delta re-reads is classified again, so the old copy goes
+            # (including rejects without a country, or of countries with no accepted rows)
+            con.execute(f"DELETE FROM trending_rejects WHERE {_delta_rows(marks)};")
+            con.execute(
+                f"""
+                INSERT INTO trending
+                {CLEAN_SELECT}
+                ORDER BY video_trending_country, video_trending_date;
+                """
             )
-            SELECT
-              video_id,
-              try_cast(video_published_at AS TIMESTAMPTZ) AS video_published_at,
-              parsed_trending_date AS video_trending_date,
-              video_trending_country,
-              channel_id,
-              video_title,
-              video_description,
-              video_default_thumbnail,
-              try_cast(video_category_id AS INTEGER) AS video_category_id,
-              video_tags,
-              video_duration,
-              video_dimension,
-              video_definition,
-              video_licensed_content,
-              try_cast(video_view_count AS BIGINT) AS video_view_count,
-              try_cast(video_like_count AS BIGINT) AS video_like_count,
-              try_cast(video_comment_count AS BIGINT) AS video_comment_count,
-              channel_title,
-              channel_description,
-              channel_custom_url,
-              try_cast(channel_published_at AS TIMESTAMPTZ) AS channel_published_at,
-              channel_country,
-              try_cast(channel_view_count AS BIGINT) AS channel_view_count,
-              try_cast(channel_subscriber_count AS BIGINT) AS channel_subscriber_count,
-              channel_have_hidden_subscribers,
-              try_cast(channel_video_count AS BIGINT) AS channel_video_count,
-              channel_localized_title,
-              channel_localized_description
-            FROM parsed
-            WHERE parsed_trending_date IS NOT NULL
-              AND is_valid_video_id;
+            con.execute(f"INSERT INTO trending_rejects BY NAME {REJECTS_SELECT};")
+        else:
+            con.execute("DROP TABLE IF EXISTS trending;")
+            con.execute(
+                f"""
+                CREATE TABLE trending AS
+                {CLEAN_SELECT}
+                ORDER BY video_trending_country, video_trending_date;
+                """
+            )
+            con.execute("DROP TABLE IF EXISTS trending_rejects;")
+            con.execute(f"CREATE TABLE trending_rejects AS {REJECTS_SELECT};")
+
+        # Watermark: max trending date per country now in `trending`
+        con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ingest_watermark (
+              country VARCHAR PRIMARY KEY,
+              max_date DATE,
+              updated_at TIMESTAMPTZ
+            );
             """
         )
+        if not incremental:
+            con.execute("DELETE FROM ingest_watermark;")
+        con.executemany(
+            "INSERT OR REPLACE INTO ingest_watermark VALUES (?, CAST(? AS DATE), now())",
+            [(s["country"], s["max_date"]) for s in stats if s["country"] is not None and s["max_date"]],
+        )
 
         # ---------------------------------------------------------------------
         # 3) Create a view for quick country coverage checks
@@ -135,46 +300,81 @@ def main():
             """
         )
 
-        # QA stats on cleaned table
+        # Catalog filled by create_analytics.py and create_tag_clean_analytics.py; those run
+        # concurrently under refresh_data.py, so create it here rather than race to create it there
+        con.execute("CREATE TABLE IF NOT EXISTS catalog (country VARCHAR, kind VARCHAR, value VARCHAR);")
+
+        # ---------------------------------------------------------------------
+        # 4) QA report from the classification pass (no rescans of the source)
+        # ---------------------------------------------------------------------
         total_clean = con.execute("SELECT count(*) FROM trending;").fetchone()[0]
-        distinct_countries = con.execute(
-            "SELECT count(DISTINCT video_trending_country) FROM trending;"
-        ).fetchone()[0]
-        null_date_clean = con.execute(
-            "SELECT count(*) FROM trending WHERE video_trending_date IS NULL;"
-        ).fetchone()[0]
+        distinct_countries = con.execute("SELECT count(*) FROM ingest_watermark;").fetchone()[0]
+        samples = con.execute(
+            """
+            SELECT reject_reason, video_id, video_trending__date, video_trending_country
+            FROM trending_rejects
+            LIMIT 8;
+            """
+        ).fetchall()
 
-        dropped = total_raw - total_clean
+        report = _qa_report(
+            stats,
+            build=out_db.name,
+            mode="incremental" if incremental else "full",
+            source_sha256=staged["sha256"],
+            trending_rows=total_clean,
+            trending_countries=distinct_countries,
+            rows_replaced=replaced,
+            reject_samples=[
+                dict(zip(("reject_reason", "video_id", "video_trending__date", "video_trending_country"), r))
+                for r in samples
+            ],
+        )
+        qa_path = args.qa_report or QA_DIR / f"{out_db.stem}.json"
+        qa_path.parent.mkdir(parents=True, exist_ok=True)
+        qa_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+        print(f"\nRows read{' (delta)' if incremental else ''}: {report['rows_read']:,}")
+        print(f"Rows accepted: {report['rows_accepted']:,}")
+        print(f"Rows rejected -> trending_rejects: {report['rows_rejected']:,}")
+        for reason, n in report["rejects_by_reason"].items():
+            print(f" - {reason}: {n:,}")
+        if incremental:
+            print(f"Boundary-day rows replaced: {replaced:,}")
 
         print(f"\nBuilt DuckDB: {out_db}")
         print(f"Rows in cleaned trending: {total_clean:,}")
-        print(f"Dropped rows (corrupt/invalid): {dropped:,}")
         print(f"Distinct countries (cleaned): {distinct_countries}")
-        print(f"NULL trending_date rows in cleaned table (should be 0): {null_date_clean}")
+        print(f"QA report: {qa_path}")
 
         # Show a few examples of "bad rows" for debugging / confidence
-        print("\nSample rows that were considered BAD (up to 8):")
-        bad_samples = con.execute(
-            f"""
-            SELECT
-              video_id,
-              video_trending__date,
-              video_trending_country,
-              video_category_id,
-              video_default_thumbnail
-            FROM trending_raw
-            WHERE try_cast(replace(video_trending__date, '.', '-') AS DATE) IS NULL
-               OR NOT regexp_matches(video_id, '{VIDEO_ID_REGEX}')
-            LIMIT 8;
-            """
-        ).fetchall()
-
-        for r in bad_samples:
+        print("\nSample rejected rows (up to 8):")
+        for r in samples:
             print(" -", r)
 
     finally:
         con.close()
 
 
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Load the staged raw data into the cleaned `trending` table.")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Rebuild `trending` from the whole CSV instead of ingesting rows past the per-country watermark.",
+    )
+    parser.add_argument(
+        "--qa-report",
+        type=Path,
+        help="Where to write the JSON QA report (default: data/processed/qa/<build>.json).",
+    )
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    settings = Settings.resolve(args)
+
+    with build_target() as out_db:
+        _load(out_db, args, settings)
+
+
 if __name__ == "__main__":
     main()
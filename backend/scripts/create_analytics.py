@@ -1,119 +1,863 @@
-from pathlib import Path
-import duckdb
-
-DB_PATH = Path(__file__).resolve().parents[2] / "data" / "processed" / "trending.duckdb"
-
-def main():
-    con = duckdb.connect(str(DB_PATH))
-    try:
-        con.execute("PRAGMA threads=4;")
-        con.execute("PRAGMA enable_progress_bar;")
-
-        # -------------------------
-        # Video analytics (existing)
-        # -------------------------
-        con.execute("DROP TABLE IF EXISTS video_dim;")
-        con.execute("""
-            CREATE TABLE video_dim AS
-            SELECT
-              video_id,
-              ANY_VALUE(video_title) AS video_title,
-              ANY_VALUE(channel_id) AS channel_id,
-              ANY_VALUE(channel_title) AS channel_title,
-              ANY_VALUE(video_default_thumbnail) AS video_default_thumbnail,
-              ANY_VALUE(video_category_id) AS video_category_id,
-              ANY_VALUE(video_duration) AS video_duration,
-              ANY_VALUE(video_definition) AS video_definition
-            FROM trending
-            GROUP BY video_id;
-        """)
-
-        con.execute("DROP TABLE IF EXISTS video_reach;")
-        con.execute("""
-            CREATE TABLE video_reach AS
-            SELECT
-              video_id,
-              COUNT(DISTINCT video_trending_country) AS countries_count
-            FROM trending
-            GROUP BY video_id;
-        """)
-
-        con.execute("DROP TABLE IF EXISTS video_us_stickiness;")
-        con.execute("""
-            CREATE TABLE video_us_stickiness AS
-            SELECT
-              video_id,
-              COUNT(DISTINCT video_trending_date) AS days_trended_us,
-              MIN(video_trending_date) AS first_trending_us,
-              MAX(video_trending_date) AS last_trending_us
-            FROM trending
-            WHERE video_trending_country = 'United States'
-            GROUP BY video_id;
-        """)
-
-        con.execute("""
-            CREATE OR REPLACE VIEW v_us_dates AS
-            SELECT DISTINCT video_trending_date
-            FROM trending
-            WHERE video_trending_country = 'United States'
-            ORDER BY video_trending_date DESC;
-        """)
-
-        # -------------------------
-        # NEW: Channel analytics
-        # -------------------------
-        con.execute("DROP TABLE IF EXISTS channel_dim;")
-        con.execute("""
-            CREATE TABLE channel_dim AS
-            SELECT
-              channel_id,
-              ANY_VALUE(channel_title) AS channel_title,
-              ANY_VALUE(channel_custom_url) AS channel_custom_url,
-              ANY_VALUE(channel_country) AS channel_country
-            FROM trending
-            GROUP BY channel_id;
-        """)
-
-        con.execute("DROP TABLE IF EXISTS channel_us_daily;")
-        con.execute("""
-            CREATE TABLE channel_us_daily AS
-            SELECT
-              video_trending_date AS date,
-              channel_id,
-              COUNT(DISTINCT video_id) AS distinct_videos,
-              COUNT(*) AS appearances,
-              SUM(video_view_count) AS sum_views,
-              SUM(video_like_count) AS sum_likes,
-              SUM(video_comment_count) AS sum_comments
-            FROM trending
-            WHERE video_trending_country = 'United States'
-            GROUP BY 1, 2;
-        """)
-
-        con.execute("DROP TABLE IF EXISTS channel_us_alltime;")
-        con.execute("""
-            CREATE TABLE channel_us_alltime AS
+import argparse
+
+from db_objects import replace_view
+from db_versions import build_target, current_db_path
+from duckdb_settings import Settings, add_arguments, connect
+
+US = "United States"
+
+# The only columns of trending the analytics tables read. build() copies them
+# out of trending in one scan; every table below is derived from that copy, so
+# the wide text columns (descriptions, tags, localized fields) are read once
+# instead of once per GROUP BY.
+FACT_COLUMNS = """
+  video_trending_country AS country,
+  video_trending_date AS date,
+  video_id,
+  channel_id,
+  video_category_id,
+  video_published_at,
+  video_view_count,
+  video_like_count,
+  video_comment_count,
+  video_title,
+  video_default_thumbnail,
+  video_duration,
+  video_definition,
+  channel_title,
+  channel_custom_url,
+  channel_country
+"""
+
+# Every table build() maintains. An incremental build needs all of them from an
+# earlier build and recomputes only the rows the new days touch (see _apply_delta)
+# instead of re-aggregating all of trending. channel_videos holds the (channel,
+# video) pairs that channel_alltime's distinct video count is rolled up from.
+INCREMENTAL_TABLES = {
+    "video_dim",
+    "video_reach",
+    "video_stickiness",
+    "daily_leaderboard",
+    "video_history",
+    "channel_dim",
+    "channel_daily",
+    "channel_alltime",
+    "channel_videos",
+    "channel_video_stats",
+    "catalog",
+}
+
+
+def _existing_tables(con) -> set[str]:
+    return {
+        r[0]
+        for r in con.execute(
+            "SELECT table_name FROM information_schema.tables WHERE table_schema = 'main'"
+        ).fetchall()
+    }
+
+
+def _day_spans_select(source: str, keys: tuple[str, ...]) -> str:
+    """Days trended, first and last trending date per key (country first)."""
+    key_list = ", ".join(keys)
+    return f"""
+        SELECT
+          {key_list},
+          COUNT(DISTINCT date) AS days_trended,
+          MIN(date) AS first_trending,
+          MAX(date) AS last_trending
+        FROM {source}
+        WHERE country IS NOT NULL
+        GROUP BY {key_list}
+    """
+
+
+def _channel_daily_select(source: str) -> str:
+    return f"""
+        SELECT
+          country,
+          date,
+          channel_id,
+          COUNT(DISTINCT video_id) AS distinct_videos,
+          COUNT(*) AS appearances,
+          SUM(video_view_count) AS sum_views,
+          SUM(video_like_count) AS sum_likes,
+          SUM(video_comment_count) AS sum_comments
+        FROM {source}
+        WHERE country IS NOT NULL
+        GROUP BY 1, 2, 3
+    """
+
+
+def _channel_alltime_select(only: str | None = None) -> str:
+    """
+    channel_alltime rolled up from channel_daily (a row per channel and day)
+    and channel_videos (a row per channel and video); `only` names a table of
+    (country, channel_id) pairs to restrict it to.
+    """
+    restrict = (
+        f"JOIN {only} o ON o.country = c.country AND o.channel_id IS NOT DISTINCT FROM c.channel_id"
+        if only
+        else ""
+    )
+    return f"""
+        SELECT
+          c.country,
+          c.channel_id,
+          v.distinct_videos_alltime,
+          COUNT(*) AS days_active,
+          CAST(SUM(c.appearances) AS BIGINT) AS appearances_alltime,
+          MIN(c.date) AS first_date,
+          MAX(c.date) AS last_date,
+          SUM(c.sum_views) AS sum_views_alltime,
+          SUM(c.sum_likes) AS sum_likes_alltime
+        FROM channel_daily c
+        {restrict}
+        JOIN (
+          SELECT country, channel_id, COUNT(*) AS distinct_videos_alltime
+          FROM channel_videos
+          GROUP BY 1, 2
+        ) v ON v.country = c.country AND v.channel_id IS NOT DISTINCT FROM c.channel_id
+        GROUP BY c.country, c.channel_id, v.distinct_videos_alltime
+    """
+
+
+def _video_dim_select(source: str) -> str:
+    return f"""
+        SELECT
+          video_id,
+          ANY_VALUE(video_title) AS video_title,
+          ANY_VALUE(channel_id) AS channel_id,
+          ANY_VALUE(channel_title) AS channel_title,
+          ANY_VALUE(video_default_thumbnail) AS video_default_thumbnail,
+          ANY_VALUE(video_category_id) AS video_category_id,
+          ANY_VALUE(video_duration) AS video_duration,
+          ANY_VALUE(video_definition) AS video_definition
+        FROM {source}
+        GROUP BY video_id
+    """
+
+
+def _video_reach_select(source: str) -> str:
+    return f"""
+        SELECT
+          video_id,
+          COUNT(DISTINCT country) AS countries_count
+        FROM {source}
+        GROUP BY video_id
+    """
+
+
+def _channel_dim_select(source: str) -> str:
+    return f"""
+        SELECT
+          channel_id,
+          ANY_VALUE(channel_title) AS channel_title,
+          ANY_VALUE(channel_custom_url) AS channel_custom_url,
+          ANY_VALUE(channel_country) AS channel_country
+        FROM {source}
+        GROUP BY channel_id
+    """
+
+
+def _leaderboard_select(source: str, stickiness: str = "video_stickiness", reach: str = "video_reach") -> str:
+    """
+    daily_leaderboard rows for the (country, date) days in `source`, which must hold
+    every trending row of those days: the ranks are per day.
+    """
+    return f"""
+        WITH base AS (
+          SELECT
+            f.country,
+            f.date,
+            f.video_id,
+            f.video_category_id,
+            f.video_published_at,
+            f.video_view_count,
+            f.video_like_count,
+            f.video_comment_count,
+            s.days_trended,
+            r.countries_count
+          FROM {source} f
+          LEFT JOIN {stickiness} s
+            ON s.country = f.country AND s.video_id = f.video_id
+          LEFT JOIN {reach} r ON r.video_id = f.video_id
+          WHERE f.country IS NOT NULL
+        ),
+        ranked AS (
+          SELECT
+            *,
+            row_number() OVER (
+              PARTITION BY country, date
+              ORDER BY video_view_count DESC NULLS LAST, video_id
+            ) AS rank_views,
+            row_number() OVER (
+              PARTITION BY country, date
+              ORDER BY video_like_count DESC NULLS LAST, video_id
+            ) AS rank_likes,
+            row_number() OVER (
+              PARTITION BY country, date
+              ORDER BY days_trended DESC NULLS LAST, video_view_count DESC NULLS LAST, video_id
+            ) AS rank_stickiness,
+            row_number() OVER (
+              PARTITION BY country, date
+              ORDER BY countries_count DESC NULLS LAST, video_view_count DESC NULLS LAST, video_id
+            ) AS rank_reach
+          FROM base
+        )
+        SELECT
+          k.country,
+          k.date,
+          k.video_id,
+          d.video_title,
+          d.channel_id,
+          d.channel_title,
+          d.video_default_thumbnail,
+          k.video_category_id,
+          k.video_published_at,
+          k.video_view_count,
+          k.video_like_count,
+          k.video_comment_count,
+          k.days_trended,
+          k.countries_count,
+          k.rank_views,
+          k.rank_likes,
+          k.rank_stickiness,
+          k.rank_reach
+        FROM ranked k
+        JOIN video_dim d USING (video_id)
+    """
+
+
+def _video_history_select(source: str, reach: str = "video_reach", only: str | None = None) -> str:
+    """
+    video_history rows for the videos of video_dim (only those in the `only` table of
+    video_ids, if given), from `source`, which must hold every trending row of them.
+    """
+    restrict = f"SEMI JOIN {only} o ON o.video_id = d.video_id" if only else ""
+    return f"""
+        WITH per_country AS (
+          SELECT
+            video_id,
+            country,
+            COUNT(DISTINCT date) AS days_trended,
+            MIN(date) AS first_trending,
+            MAX(date) AS last_trending,
+            list(date ORDER BY date) AS dates,
+            list(video_view_count ORDER BY date) AS views,
+            list(video_like_count ORDER BY date) AS likes,
+            list(video_comment_count ORDER BY date) AS comments
+          FROM {source}
+          WHERE country IS NOT NULL
+          GROUP BY video_id, country
+        ),
+        per_video AS (
+          SELECT
+            video_id,
+            list(
+              {{
+                'country': country,
+                'days_trended': days_trended,
+                'first_trending': first_trending,
+                'last_trending': last_trending,
+                'dates': dates,
+                'views': views,
+                'likes': likes,
+                'comments': comments
+              }}
+              ORDER BY days_trended DESC, country
+            ) AS countries
+          FROM per_country
+          GROUP BY video_id
+        )
+        SELECT
+          d.*,
+          r.countries_count,
+          coalesce(v.countries, []) AS countries
+        FROM video_dim d
+        {restrict}
+        LEFT JOIN {reach} r USING (video_id)
+        LEFT JOIN per_video v USING (video_id)
+    """
+
+
+def _channel_video_agg_select(source: str) -> str:
+    """Per (country, channel, video): days trended, first/last day and maxima."""
+    return f"""
+        SELECT
+          country,
+          channel_id,
+          video_id,
+          COUNT(DISTINCT date) AS days_trended,
+          MIN(date) AS first_trending,
+          MAX(date) AS last_trending,
+          MAX(video_view_count) AS max_views,
+          MAX(video_like_count) AS max_likes,
+          MAX(video_comment_count) AS max_comments
+        FROM {source}
+        WHERE country IS NOT NULL
+          AND channel_id IS NOT NULL
+        GROUP BY country, channel_id, video_id
+    """
+
+
+def _channel_video_stats_select(agg: str, reach: str = "video_reach") -> str:
+    """
+    channel_video_stats rows for the (country, channel) pages in `agg` (a
+    _channel_video_agg_select), which must hold every video of those pages:
+    the page ranks are per page.
+    """
+    return f"""
+        SELECT
+          a.country,
+          a.channel_id,
+          a.video_id,
+          d.video_title,
+          d.video_default_thumbnail,
+          a.days_trended,
+          a.first_trending,
+          a.last_trending,
+          a.max_views,
+          a.max_likes,
+          a.max_comments,
+          r.countries_count,
+          row_number() OVER (
+            PARTITION BY a.country, a.channel_id
+            ORDER BY a.days_trended DESC, coalesce(a.max_views, -1) DESC, a.video_id
+          ) AS page_rank
+        FROM ({agg}) a
+        JOIN (SELECT video_id, video_title, video_default_thumbnail FROM video_dim) d USING (video_id)
+        LEFT JOIN {reach} r USING (video_id)
+    """
+
+
+def _catalog_select(days: str) -> str:
+    """catalog 'date' and 'month' rows for the DISTINCT (country, date) pairs of `days`."""
+    return f"""
+        WITH d AS ({days})
+        SELECT country, 'date', CAST(date AS VARCHAR) FROM d
+        UNION ALL
+        SELECT DISTINCT country, 'month', CAST(CAST(date_trunc('month', date) AS DATE) AS VARCHAR) FROM d
+    """
+
+
+# What a full rebuild gives, aggregated straight from trending; --verify compares
+# each table's (SELECT from the table, expected rows) pair. The display fields of
+# video_dim and channel_dim are ANY_VALUE picks, so they (and their copies in the
+# other tables) are left out of the comparison.
+_TRENDING = f"(SELECT {FACT_COLUMNS} FROM trending)"
+_EXPECTED_STICKINESS = f"({_day_spans_select(_TRENDING, ('country', 'video_id'))})"
+_EXPECTED_REACH = f"({_video_reach_select(_TRENDING)})"
+_LEADERBOARD_COLUMNS = """
+  country, date, video_id, video_category_id, video_published_at, video_view_count, video_like_count,
+  video_comment_count, days_trended, countries_count, rank_views, rank_likes, rank_stickiness, rank_reach
+"""
+_CHANNEL_VIDEO_STATS_COLUMNS = """
+  country, channel_id, video_id, days_trended, first_trending, last_trending, max_views, max_likes,
+  max_comments, countries_count, page_rank
+"""
+VERIFY_SQL = {
+    "channel_daily": ("SELECT * FROM channel_daily", _channel_daily_select(_TRENDING)),
+    "video_stickiness": ("SELECT * FROM video_stickiness", _day_spans_select(_TRENDING, ("country", "video_id"))),
+    "channel_videos": (
+        "SELECT * FROM channel_videos",
+        _day_spans_select(_TRENDING, ("country", "channel_id", "video_id")),
+    ),
+    "channel_alltime": (
+        "SELECT * FROM channel_alltime",
+        f"""
+        SELECT
+          country,
+          channel_id,
+          COUNT(DISTINCT video_id) AS distinct_videos_alltime,
+          COUNT(DISTINCT date) AS days_active,
+          COUNT(*) AS appearances_alltime,
+          MIN(date) AS first_date,
+          MAX(date) AS last_date,
+          SUM(video_view_count) AS sum_views_alltime,
+          SUM(video_like_count) AS sum_likes_alltime
+        FROM {_TRENDING}
+        WHERE country IS NOT NULL
+        GROUP BY 1, 2
+        """,
+    ),
+    "video_dim": ("SELECT video_id FROM video_dim", f"SELECT video_id FROM ({_video_dim_select(_TRENDING)})"),
+    "video_reach": ("SELECT * FROM video_reach", _video_reach_select(_TRENDING)),
+    "channel_dim": ("SELECT channel_id FROM channel_dim", f"SELECT channel_id FROM ({_channel_dim_select(_TRENDING)})"),
+    "daily_leaderboard": (
+        f"SELECT {_LEADERBOARD_COLUMNS} FROM daily_leaderboard",
+        f"SELECT {_LEADERBOARD_COLUMNS} FROM ({_leaderboard_select(_TRENDING, _EXPECTED_STICKINESS, _EXPECTED_REACH)})",
+    ),
+    "video_history": (
+        "SELECT video_id, countries_count, countries FROM video_history",
+        f"SELECT video_id, countries_count, countries FROM ({_video_history_select(_TRENDING, _EXPECTED_REACH)})",
+    ),
+    "channel_video_stats": (
+        f"SELECT {_CHANNEL_VIDEO_STATS_COLUMNS} FROM channel_video_stats",
+        f"""
+        SELECT {_CHANNEL_VIDEO_STATS_COLUMNS}
+        FROM ({_channel_video_stats_select(_channel_video_agg_select(_TRENDING), _EXPECTED_REACH)})
+        """,
+    ),
+    "catalog": (
+        "SELECT * FROM catalog WHERE kind IN ('date', 'month')",
+        _catalog_select(f"SELECT DISTINCT country, date FROM {_TRENDING} WHERE country IS NOT NULL"),
+    ),
+}
+
+
+def _build_full(con) -> None:
+    """Every analytics table from the whole of trending, scanned once into analytics_fact."""
+    con.execute(f"CREATE OR REPLACE TEMP TABLE analytics_fact AS SELECT {FACT_COLUMNS} FROM trending;")
+
+    # -------------------------
+    # Video analytics (existing)
+    # -------------------------
+    con.execute("DROP TABLE IF EXISTS video_dim;")
+    con.execute(f"CREATE TABLE video_dim AS {_video_dim_select('analytics_fact')};")
+    # Point lookups of the candidate ids the search index returns. Created with the
+    # table: dropping video_dim drops them, and the search_index stage is skipped when
+    # video_dim's content comes out unchanged.
+    con.execute("CREATE INDEX video_dim_video_id_idx ON video_dim (video_id);")
+    con.execute("CREATE INDEX video_dim_channel_id_idx ON video_dim (channel_id);")
+
+    con.execute("DROP TABLE IF EXISTS video_reach;")
+    con.execute(f"CREATE TABLE video_reach AS {_video_reach_select('analytics_fact')};")
+
+    # Per-country tables below are keyed and sorted by country first, so a
+    # country's rows sit in their own row groups and per-country reads skip
+    # everything else via min/max pruning.
+    con.execute("DROP TABLE IF EXISTS video_stickiness;")
+    con.execute(f"""
+        CREATE TABLE video_stickiness AS
+        {_day_spans_select("analytics_fact", ("country", "video_id"))}
+        ORDER BY country, video_id;
+    """)
+
+    con.execute("DROP TABLE IF EXISTS channel_daily;")
+    con.execute(f"""
+        CREATE TABLE channel_daily AS
+        {_channel_daily_select("analytics_fact")}
+        ORDER BY country, date, distinct_videos DESC, sum_views DESC NULLS LAST;
+    """)
+
+    con.execute("DROP TABLE IF EXISTS channel_videos;")
+    con.execute(f"""
+        CREATE TABLE channel_videos AS
+        {_day_spans_select("analytics_fact", ("country", "channel_id", "video_id"))}
+        ORDER BY country, channel_id, video_id;
+    """)
+
+    con.execute("DROP TABLE IF EXISTS channel_alltime;")
+    con.execute(f"""
+        CREATE TABLE channel_alltime AS
+        SELECT * FROM ({_channel_alltime_select()})
+        ORDER BY country, distinct_videos_alltime DESC, days_active DESC;
+    """)
+
+    # Ranked per-date leaderboard: one row per trending row with display fields
+    # denormalized, so the top-N routes read the first N rows of a
+    # (country, date) range instead of filtering, joining and sorting trending.
+    # The ranks are computed on ids and counts only; the display text is joined
+    # on afterwards, so the window sorts do not carry it around.
+    con.execute("DROP TABLE IF EXISTS daily_leaderboard;")
+    con.execute(f"""
+        CREATE TABLE daily_leaderboard AS
+        {_leaderboard_select("analytics_fact")}
+        ORDER BY country, date, rank_views;
+    """)
+
+    # Per-video store for /api/video/<video_id>: one row per video, sorted by video_id,
+    # with the display fields and, per country, the day count, first/last day and the
+    # daily views/likes/comments as lists (countries with the most days first). A video
+    # page is one point lookup, small enough for the API to keep hot videos in memory.
+    # The index keeps the lookup a point read once incremental builds have appended
+    # rows out of video_id order.
+    con.execute("DROP TABLE IF EXISTS video_history;")
+    con.execute(f"""
+        CREATE TABLE video_history AS
+        {_video_history_select("analytics_fact")}
+        ORDER BY video_id;
+    """)
+    con.execute("CREATE INDEX video_history_video_id_idx ON video_history (video_id);")
+
+    # -------------------------
+    # NEW: Channel analytics
+    # -------------------------
+    con.execute("DROP TABLE IF EXISTS channel_dim;")
+    con.execute(f"CREATE TABLE channel_dim AS {_channel_dim_select('analytics_fact')};")
+
+    # Channel page rollup: one row per (country, channel, video) with the video's days
+    # trended, first/last day and max views/likes/comments in that country, its display
+    # fields and reach, ranked in the page's order (days trended, then views). Sorted by
+    # channel, so /api/<country>/channel/<id> is a range read.
+    con.execute("DROP TABLE IF EXISTS channel_video_stats;")
+    con.execute(f"""
+        CREATE TABLE channel_video_stats AS
+        {_channel_video_stats_select(_channel_video_agg_select("analytics_fact"))}
+        ORDER BY country, channel_id, page_rank;
+    """)
+
+    # Small catalog of available dates/months per country, kept in memory by the API
+    # so default-date requests never scan trending. channel_daily already has one
+    # group per (country, date) for every channel, NULL channel_id included.
+    con.execute("CREATE TABLE IF NOT EXISTS catalog (country VARCHAR, kind VARCHAR, value VARCHAR);")
+    con.execute("DELETE FROM catalog WHERE kind IN ('date', 'month');")
+    con.execute(f"INSERT INTO catalog {_catalog_select('SELECT DISTINCT country, date FROM channel_daily')};")
+
+    con.execute("DROP TABLE analytics_fact;")
+
+
+def _apply_delta(con) -> bool:
+    """
+    Bring every analytics table up to date with trending, recomputing only the rows
+    the new days touch. Each country's boundary is the latest date channel_daily
+    holds (re-read, because build_duckdb.py replaces that day); countries it does
+    not hold come in whole. From trending this reads:
+    - analytics_delta: the rows on or after the boundary, and the rows without a country;
+    - analytics_fact: every row of the videos in the delta or trending on the old
+      boundary day, for their per-video rows and day spans;
+    - leaderboard_fact: every row of the days those videos trended on, which are
+      re-ranked with the videos' new days_trended and countries_count.
+    Returns False, touching nothing, when rows before a boundary changed: only a
+    full build fixes that.
+    """
+    con.execute("""
+        CREATE OR REPLACE TEMP TABLE analytics_bounds AS
+        SELECT country, MAX(date) AS boundary FROM channel_daily GROUP BY country;
+    """)
+    # The rows before the boundary must be the ones aggregated last time (reads
+    # only the country and date columns of trending)
+    changed = con.execute("""
+        WITH f AS (
+          SELECT b.country, COUNT(*) AS n
+          FROM trending t JOIN analytics_bounds b ON b.country = t.video_trending_country
+          WHERE t.video_trending_date < b.boundary
+          GROUP BY 1
+        ),
+        c AS (
+          SELECT c.country, SUM(c.appearances) AS n
+          FROM channel_daily c JOIN analytics_bounds b USING (country)
+          WHERE c.date < b.boundary
+          GROUP BY 1
+        )
+        SELECT string_agg(b.country, ', ' ORDER BY b.country)
+        FROM analytics_bounds b
+        LEFT JOIN f USING (country)
+        LEFT JOIN c USING (country)
+        WHERE coalesce(f.n, 0) <> coalesce(c.n, 0);
+    """).fetchone()[0]
+    if changed:
+        print(f"Earlier trending days changed for {changed}; rebuilding in full")
+        return False
+
+    con.execute(f"""
+        CREATE OR REPLACE TEMP TABLE analytics_delta AS
+        SELECT f.*
+        FROM (SELECT {FACT_COLUMNS} FROM trending) f
+        LEFT JOIN analytics_bounds b USING (country)
+        WHERE f.country IS NULL OR b.boundary IS NULL OR f.date >= b.boundary;
+    """)
+    n_delta = con.execute("SELECT count(*) FROM analytics_delta").fetchone()[0]
+    print(f"Incremental update: {n_delta:,} trending rows on or after each country's last aggregated date")
+
+    # Videos whose rows change: those in the delta, those that trended on the
+    # boundary day being replaced, and those trending nowhere (rows without a
+    # country are re-read every time)
+    con.execute("""
+        CREATE OR REPLACE TEMP TABLE touched_videos AS
+        SELECT DISTINCT video_id FROM analytics_delta
+        UNION
+        SELECT s.video_id
+        FROM video_stickiness s JOIN analytics_bounds b USING (country)
+        WHERE s.last_trending >= b.boundary
+        UNION
+        SELECT video_id FROM video_reach WHERE countries_count = 0;
+    """)
+    con.execute(f"""
+        CREATE OR REPLACE TEMP TABLE analytics_fact AS
+        SELECT {FACT_COLUMNS}
+        FROM trending
+        WHERE video_id IN (SELECT video_id FROM touched_videos);
+    """)
+    n_videos, n_fact = con.execute(
+        "SELECT (SELECT count(*) FROM touched_videos), (SELECT count(*) FROM analytics_fact)"
+    ).fetchone()
+    print(f"Recomputing {n_videos:,} videos from their {n_fact:,} trending rows")
+
+    # Per-video tables: the touched videos' rows, from their whole history
+    touched = "video_id IN (SELECT video_id FROM touched_videos)"
+    con.execute(f"DELETE FROM video_dim WHERE {touched};")
+    con.execute(f"INSERT INTO video_dim {_video_dim_select('analytics_fact')};")
+    con.execute(f"DELETE FROM video_reach WHERE {touched};")
+    con.execute(f"INSERT INTO video_reach {_video_reach_select('analytics_fact')};")
+    con.execute(f"DELETE FROM video_stickiness WHERE {touched};")
+    con.execute(f"""
+        INSERT INTO video_stickiness
+        {_day_spans_select("analytics_fact", ("country", "video_id"))}
+        ORDER BY country, video_id;
+    """)
+    con.execute(f"DELETE FROM channel_videos WHERE {touched};")
+    con.execute(f"""
+        INSERT INTO channel_videos
+        {_day_spans_select("analytics_fact", ("country", "channel_id", "video_id"))}
+        ORDER BY country, channel_id, video_id;
+    """)
+    con.execute(f"DELETE FROM video_history WHERE {touched};")
+    con.execute(f"""
+        INSERT INTO video_history
+        {_video_history_select("analytics_fact", only="touched_videos")}
+        ORDER BY video_id;
+    """)
+
+    # channel_daily: the boundary day is replaced and the later days appended
+    con.execute("""
+        DELETE FROM channel_daily c
+        USING analytics_bounds b
+        WHERE c.country = b.country AND c.date >= b.boundary;
+    """)
+    con.execute(f"""
+        INSERT INTO channel_daily
+        {_channel_daily_select("analytics_delta")}
+        ORDER BY country, date, distinct_videos DESC, sum_views DESC NULLS LAST;
+    """)
+
+    # Channels whose all-time row changes: those of the touched videos, and those
+    # whose last day is the boundary day being replaced. They are rolled up again
+    # from their channel_daily and channel_videos rows (exact for sums over NULLs,
+    # and for a last day that moved back).
+    con.execute("""
+        CREATE OR REPLACE TEMP TABLE touched_channels AS
+        SELECT DISTINCT country, channel_id FROM analytics_fact WHERE country IS NOT NULL
+        UNION
+        SELECT a.country, a.channel_id
+        FROM channel_alltime a JOIN analytics_bounds b USING (country)
+        WHERE a.last_date >= b.boundary;
+    """)
+    con.execute("""
+        DELETE FROM channel_alltime a
+        USING touched_channels t
+        WHERE a.country = t.country AND a.channel_id IS NOT DISTINCT FROM t.channel_id;
+    """)
+    con.execute(f"""
+        INSERT INTO channel_alltime
+        SELECT * FROM ({_channel_alltime_select("touched_channels")})
+        ORDER BY country, distinct_videos_alltime DESC, days_active DESC;
+    """)
+
+    # channel_dim: the touched videos' channels from their rows; a touched channel
+    # left with no trending day anywhere is dropped
+    con.execute("""
+        DELETE FROM channel_dim c
+        USING (SELECT DISTINCT channel_id FROM analytics_fact) t
+        WHERE c.channel_id IS NOT DISTINCT FROM t.channel_id;
+    """)
+    con.execute(f"INSERT INTO channel_dim {_channel_dim_select('analytics_fact')};")
+    con.execute("""
+        DELETE FROM channel_dim c
+        USING touched_channels t
+        WHERE c.channel_id IS NOT DISTINCT FROM t.channel_id
+          AND NOT EXISTS (SELECT 1 FROM channel_alltime a WHERE a.channel_id IS NOT DISTINCT FROM c.channel_id)
+          AND NOT EXISTS (SELECT 1 FROM analytics_fact f WHERE f.channel_id IS NOT DISTINCT FROM c.channel_id);
+    """)
+
+    # daily_leaderboard: every day a touched video trended on (its days_trended and
+    # countries_count move the day's ranks), and the replaced boundary days, ranked
+    # again from all of those days' rows
+    con.execute("""
+        CREATE OR REPLACE TEMP TABLE leaderboard_days AS
+        SELECT DISTINCT country, date FROM analytics_fact WHERE country IS NOT NULL
+        UNION
+        SELECT DISTINCT l.country, l.date
+        FROM daily_leaderboard l JOIN analytics_bounds b USING (country)
+        WHERE l.date >= b.boundary;
+    """)
+    con.execute(f"""
+        CREATE OR REPLACE TEMP TABLE leaderboard_fact AS
+        SELECT f.*
+        FROM (SELECT {FACT_COLUMNS} FROM trending) f
+        SEMI JOIN leaderboard_days d ON d.country = f.country AND d.date = f.date;
+    """)
+    con.execute("""
+        DELETE FROM daily_leaderboard l
+        USING leaderboard_days d
+        WHERE l.country = d.country AND l.date = d.date;
+    """)
+    con.execute(f"""
+        INSERT INTO daily_leaderboard
+        {_leaderboard_select("leaderboard_fact")}
+        ORDER BY country, date, rank_views;
+    """)
+
+    # channel_video_stats: every (country, channel) page a touched video is or was
+    # on, ranked again from its untouched rows and the touched videos' new ones
+    con.execute(f"""
+        CREATE OR REPLACE TEMP TABLE touched_pages AS
+        SELECT DISTINCT country, channel_id
+        FROM analytics_fact
+        WHERE country IS NOT NULL AND channel_id IS NOT NULL
+        UNION
+        SELECT country, channel_id FROM channel_video_stats WHERE {touched};
+    """)
+    con.execute(f"""
+        CREATE OR REPLACE TEMP TABLE page_agg AS
+        SELECT
+          s.country, s.channel_id, s.video_id, s.days_trended, s.first_trending, s.last_trending,
+          s.max_views, s.max_likes, s.max_comments
+        FROM channel_video_stats s
+        SEMI JOIN touched_pages p ON p.country = s.country AND p.channel_id = s.channel_id
+        WHERE s.video_id NOT IN (SELECT video_id FROM touched_videos)
+        UNION ALL
+        {_channel_video_agg_select("analytics_fact")};
+    """)
+    con.execute("""
+        DELETE FROM channel_video_stats s
+        USING touched_pages p
+        WHERE s.country = p.country AND s.channel_id = p.channel_id;
+    """)
+    con.execute(f"""
+        INSERT INTO channel_video_stats
+        {_channel_video_stats_select("SELECT * FROM page_agg")}
+        ORDER BY country, channel_id, page_rank;
+    """)
+
+    # catalog: dates from the boundary on, and months from the boundary's month on
+    con.execute("""
+        DELETE FROM catalog c
+        USING analytics_bounds b
+        WHERE c.country = b.country
+          AND (
+            (c.kind = 'date' AND c.value >= CAST(b.boundary AS VARCHAR))
+            OR (c.kind = 'month' AND c.value >= CAST(CAST(date_trunc('month', b.boundary) AS DATE) AS VARCHAR))
+          );
+    """)
+    con.execute(f"""
+        INSERT INTO catalog
+        SELECT r.*
+        FROM ({_catalog_select(
+            "SELECT DISTINCT c.country, c.date FROM channel_daily c LEFT JOIN analytics_bounds b USING (country) "
+            "WHERE b.boundary IS NULL OR c.date >= CAST(date_trunc('month', b.boundary) AS DATE)"
+        )}) r(country, kind, value)
+        LEFT JOIN analytics_bounds b USING (country)
+        WHERE b.boundary IS NULL OR r.kind = 'month' OR r.value >= CAST(b.boundary AS VARCHAR);
+    """)
+
+    for name in (
+        "analytics_bounds",
+        "analytics_delta",
+        "analytics_fact",
+        "touched_videos",
+        "touched_channels",
+        "leaderboard_days",
+        "leaderboard_fact",
+        "touched_pages",
+        "page_agg",
+    ):
+        con.execute(f"DROP TABLE IF EXISTS {name};")
+    return True
+
+
+def verify(con) -> dict[str, int]:
+    """Rows that differ, either way, between each analytics table and a full rebuild."""
+    diffs = {}
+    for table, (actual, expected) in VERIFY_SQL.items():
+        diffs[table] = con.execute(f"""
+            WITH actual AS ({actual}), expected AS ({expected})
             SELECT
-              channel_id,
-              COUNT(DISTINCT video_id) AS distinct_videos_alltime,
-              COUNT(DISTINCT video_trending_date) AS days_active,
-              COUNT(*) AS appearances_alltime,
-              MIN(video_trending_date) AS first_date,
-              MAX(video_trending_date) AS last_date,
-              SUM(video_view_count) AS sum_views_alltime,
-              SUM(video_like_count) AS sum_likes_alltime
-            FROM trending
-            WHERE video_trending_country = 'United States'
-            GROUP BY 1;
-        """)
-
-        print("✅ Analytics tables created:")
-        print("- video_dim, video_reach, video_us_stickiness")
-        print("- channel_dim, channel_us_daily, channel_us_alltime")
-        print("- view v_us_dates")
-
-    finally:
-        con.close()
+              (SELECT count(*) FROM (SELECT * FROM actual EXCEPT ALL SELECT * FROM expected))
+              + (SELECT count(*) FROM (SELECT * FROM expected EXCEPT ALL SELECT * FROM actual))
+        """).fetchone()[0]
+    return diffs
+
+
+def build(con, incremental: bool = False) -> str:
+    """
+    Create the analytics tables and views from `trending`. A full build scans it
+    once; an incremental one, when every table exists already, reads only the new
+    days and the history of the videos they touch. Returns the mode used:
+    "incremental" or "full".
+    """
+    missing = INCREMENTAL_TABLES - _existing_tables(con)
+    if incremental and missing:
+        print(f"Full build (no earlier {', '.join(sorted(missing))})")
+    mode = "incremental" if incremental and not missing and _apply_delta(con) else "full"
+    if mode == "full":
+        _build_full(con)
+
+    replace_view(con, "v_us_dates", f"""
+        SELECT DISTINCT video_trending_date
+        FROM trending
+        WHERE video_trending_country = '{US}'
+        ORDER BY video_trending_date DESC;
+    """)
+
+    # The original US-only names, as views, for notebooks and older queries
+    replace_view(con, "video_us_stickiness", f"""
+        SELECT
+          video_id,
+          days_trended AS days_trended_us,
+          first_trending AS first_trending_us,
+          last_trending AS last_trending_us
+        FROM video_stickiness
+        WHERE country = '{US}';
+    """)
+    replace_view(con, "channel_us_daily", f"""
+        SELECT * EXCLUDE (country) FROM channel_daily WHERE country = '{US}';
+    """)
+    replace_view(con, "channel_us_alltime", f"""
+        SELECT * EXCLUDE (country) FROM channel_alltime WHERE country = '{US}';
+    """)
+    return mode
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Build video/channel analytics tables for every country.")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Rebuild every analytics table from all of trending instead of recomputing the rows "
+        "the days since the last build touch.",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Build nothing: compare the analytics tables with a full rebuild and exit 1 if they differ.",
+    )
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    settings = Settings.resolve(args)
+
+    if args.verify:
+        # Compares only: reads the current database instead of starting a new build
+        con = connect(current_db_path(), settings, read_only=True)
+        try:
+            print(f"DuckDB settings: {settings.describe()}")
+            diffs = verify(con)
+        finally:
+            con.close()
+        for table, n in diffs.items():
+            print(f"{'ok  ' if n == 0 else 'DIFF'} {table}: {n} rows differ from a full rebuild")
+        if any(diffs.values()):
+            raise SystemExit(1)
+        return
+
+    with build_target() as db_path:
+        con = connect(db_path, settings)
+        try:
+            print(f"DuckDB settings: {settings.describe()}")
+            con.execute("PRAGMA enable_progress_bar;")
+
+            mode = build(con, incremental=not args.full)
+
+            n_countries = con.execute("SELECT count(DISTINCT country) FROM video_stickiness").fetchone()[0]
+            print(f"✅ Analytics tables created ({n_countries} countries, {mode} build):")
+            print("- video_dim, video_reach, video_stickiness, daily_leaderboard, video_history")
+            print("- channel_dim, channel_daily, channel_alltime, channel_videos, channel_video_stats")
+            print("- catalog (date/month)")
+            print("- views v_us_dates, video_us_stickiness, channel_us_daily, channel_us_alltime")
+
+        finally:
+            con.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from db_versions import build_target
+from duckdb_settings import Settings, add_arguments, connect
+
+# Trailing pad so the last two characters of a text also start a trigram;
+# 2-character queries are answered by a prefix match on the trigrams.
+PAD = "chr(1)"
+
+
+def _build_index(con, name: str, docs_sql: str, key: str, scores_sql: str, order_by: str) -> None:
+    """
+    <name>_grams: (gram, country, doc, <key>) for every distinct lowercase trigram of
+      the <key>s that trended in the country, sorted by gram, country, doc.
+      doc numbers a country's <key>s from 1 in the search route's order (order_by over
+      scores_sql's (country, <key>, ...) rows), so the head of a gram's postings for a
+      country holds its most trended documents there
+    <name>_gram_df: number of distinct <key>s per gram and country, used to pick the rarest grams
+    """
+    con.execute(f"DROP TABLE IF EXISTS {name}_grams;")
+    con.execute(
+        f"""
+        CREATE TABLE {name}_grams AS
+        WITH texts AS (
+          SELECT {key}, lower(doc) || {PAD} AS text
+          FROM ({docs_sql})
+          WHERE doc IS NOT NULL
+        ),
+        docs AS (
+          SELECT
+            country,
+            {key},
+            row_number() OVER (PARTITION BY country ORDER BY {order_by}, {key}) AS doc
+          FROM ({scores_sql})
+          WHERE country IS NOT NULL
+        ),
+        pos AS (
+          SELECT d.country, d.doc, t.{key}, t.text, unnest(range(1, length(t.text) - 1)) AS i
+          FROM texts t
+          JOIN docs d USING ({key})
+        )
+        SELECT DISTINCT substring(text, i, 3) AS gram, country, doc, {key}
+        FROM pos
+        ORDER BY gram, country, doc;
+        """
+    )
+
+    con.execute(f"DROP TABLE IF EXISTS {name}_gram_df;")
+    con.execute(
+        f"""
+        CREATE TABLE {name}_gram_df AS
+        SELECT gram, country, count(*) AS n
+        FROM {name}_grams
+        GROUP BY gram, country
+        ORDER BY gram, country;
+        """
+    )
+
+
+def _build_indexes(db_path: Path, settings: Settings) -> None:
+    print(f"Using DB: {db_path}")
+    print(f"DuckDB settings: {settings.describe()}")
+    con = connect(db_path, settings)
+    try:
+        con.execute("PRAGMA enable_progress_bar;")
+
+        # Video titles
+        _build_index(
+            con,
+            "search_video",
+            "SELECT video_id, video_title AS doc FROM video_dim",
+            "video_id",
+            "SELECT country, video_id, days_trended, last_trending FROM video_stickiness",
+            "days_trended DESC NULLS LAST, last_trending DESC NULLS LAST",
+        )
+
+        # Channel titles and ids (as stored on video_dim, which the search routes filter on)
+        _build_index(
+            con,
+            "search_channel",
+            """
+            SELECT DISTINCT channel_id, channel_title AS doc FROM video_dim
+            UNION
+            SELECT DISTINCT channel_id, channel_id AS doc FROM video_dim
+            """,
+            "channel_id",
+            """
+            SELECT s.country, d.channel_id, count(*) AS videos, sum(s.days_trended) AS days_trended
+            FROM video_dim d
+            JOIN video_stickiness s USING (video_id)
+            GROUP BY ALL
+            """,
+            "videos DESC, days_trended DESC",
+        )
+
+        for name in ("search_video", "search_channel"):
+            rows, grams = con.execute(f"SELECT count(*), count(DISTINCT gram) FROM {name}_grams").fetchone()
+            print(f"✅ {name}_grams: {rows:,} postings, {grams:,} trigrams")
+
+    finally:
+        con.close()
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Build the trigram search index over video and channel titles.")
+    add_arguments(parser)
+    settings = Settings.resolve(parser.parse_args(argv))
+
+    with build_target() as db_path:
+        _build_indexes(db_path, settings)
+
+
+if __name__ == "__main__":
+    main()
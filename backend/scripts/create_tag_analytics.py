@@ -1,20 +1,19 @@
+import argparse
 from pathlib import Path
-import duckdb
 
-REPO_ROOT = Path(__file__).resolve().parents[2]
-DB_PATH = REPO_ROOT / "data" / "processed" / "trending.duckdb"
+from db_versions import build_target
+from duckdb_settings import Settings, add_arguments, connect
 
 COUNTRY = "United States"
 
 
-def main():
-    if not DB_PATH.exists():
-        raise FileNotFoundError(f"DuckDB not found at: {DB_PATH}")
+def _build(db_path: Path, settings: Settings) -> None:
+    if not db_path.exists():
+        raise FileNotFoundError(f"DuckDB not found at: {db_path}")
 
-    con = duckdb.connect(str(DB_PATH))
-    con.execute("PRAGMA threads=4;")
+    con = connect(db_path, settings)
 
-    print(f"Using DB: {DB_PATH}")
+    print(f"Using DB: {db_path}")
     print(f"Building monthly tag analytics for: {COUNTRY}")
 
     # 1) Exploded tag events (US)
@@ -161,5 +160,14 @@ def main():
     con.close()
 
 
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Build the legacy US-only monthly tag analytics.")
+    add_arguments(parser)
+    settings = Settings.resolve(parser.parse_args(argv))
+
+    with build_target() as db_path:
+        _build(db_path, settings)
+
+
 if __name__ == "__main__":
     main()
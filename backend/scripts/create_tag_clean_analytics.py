@@ -1,113 +1,164 @@
 from __future__ import annotations
 
+import argparse
+import sys
 from pathlib import Path
-import duckdb
 
+import pyarrow as pa
 
-def main():
-    repo_root = Path(__file__).resolve().parents[2]  # .../backend/scripts -> repo root
-    db_path = repo_root / "data" / "processed" / "trending.duckdb"
+from db_objects import drop_relation, replace_view
+from db_versions import build_target
+from duckdb_settings import Settings, add_arguments, connect
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))  # backend/, for the shared app.tag_normalize
+from app.tag_normalize import explode_tags  # noqa: E402
+
+US = "United States"
+
+# Trending rows handed to the tag cleaner per Arrow batch
+BATCH_ROWS = 1 << 17
+
+# Sort order each tag table is written in, chosen by how the API reads it, so DuckDB's
+# per-row-group min/max (zone maps) skip everything outside the requested range:
+#   tag_dim                tag text -> id lookups (ids are numbered in tag order)
+#   tag_events_clean       notebooks: one (country, month, tag)
+#   tag_video_stats_clean  /tags/videos: one (country, month, tag) by views (or likes)
+#   tag_monthly_clean      /tags/top: one (country, month) by share
+#   tag_monthly_by_tag     /tags/series: one (country, tag) across months (copy of tag_monthly_clean)
+#   tag_movers_clean       /tags/rising, /tags/falling: one (country, month) by rank
+LAYOUTS = {
+    "tag_dim": "tag_id",
+    "tag_events_clean": "country, month, tag_id",
+    "tag_video_stats_clean": "country, month, tag_id, views_rank",
+    "tag_monthly_clean": "country, month, video_share DESC, tag_id",
+    "tag_monthly_by_tag": "country, tag_id, month",
+    "tag_movers_clean": "country, month, rising_rank",
+}
+
+TAG_SOURCE_SQL = """
+    SELECT
+      video_trending_country AS country,
+      video_id,
+      video_trending_date,
+      video_tags
+    FROM trending
+    WHERE video_trending_country IS NOT NULL
+      AND video_trending_date IS NOT NULL
+      AND video_tags IS NOT NULL
+"""
+
+
+def clean_tag_events(con, country: str | None = None, batch_rows: int = BATCH_ROWS) -> pa.RecordBatchReader:
+    """
+    Stream of (country, video_id, video_trending_date, tag): one row per cleaned,
+    kept tag of each trending row (of one country if given), before deduplication.
+    """
+    sql, params = TAG_SOURCE_SQL, []
+    if country is not None:
+        sql, params = sql + "  AND video_trending_country = ?", [country]
+    source = con.cursor().execute(sql, params).fetch_record_batch(batch_rows)
+    batches = (explode_tags(batch) for batch in source)
+    schema = source.schema.remove(source.schema.get_field_index("video_tags")).append(pa.field("tag", pa.string()))
+    return pa.RecordBatchReader.from_batches(schema, batches)
+
+
+def _build(db_path: Path, settings: Settings) -> None:
     print(f"Using DB: {db_path}")
-    con = duckdb.connect(str(db_path))
-    con.execute("PRAGMA threads=4")
-
-    # Drop old cleaned artifacts if they exist
-    con.execute("DROP VIEW IF EXISTS v_us_tag_months_clean;")
-    con.execute("DROP TABLE IF EXISTS us_tag_monthly_clean;")
-    con.execute("DROP TABLE IF EXISTS us_tag_events_clean;")
-
-    # 1) Build cleaned tag events (US only)
-    # - explode tags
-    # - normalize: lowercase, trim, remove leading '#', collapse spaces, strip quotes
-    # - filter junk: yt:*, urls, @mentions, empty, too short/too long
+    print(f"DuckDB settings: {settings.describe()}")
+    con = connect(db_path, settings)
+
+    # Drop old cleaned artifacts if they exist (the us_* names are views over the per-country tables now)
+    for name in (
+        "v_us_tag_months_clean",
+        "us_tag_monthly_clean",
+        "us_tag_events_clean",
+        "v_tag_months_clean",
+        "tag_video_stats_clean",
+        "tag_movers_clean",
+        "tag_monthly_by_tag",
+        "tag_monthly_clean",
+        "tag_events_clean",
+        "tag_dim",
+    ):
+        drop_relation(con, name)
+
+    # 1) Build cleaned tag events (every country, sorted by country, month, tag)
+    # - explode and clean tags in Arrow batches (app/tag_normalize.py, shared with the API)
     # - dedupe per video/day/tag
-    con.execute(
-        r"""
-        CREATE TABLE us_tag_events_clean AS
-        WITH base AS (
-          SELECT
-            t.video_id,
-            t.video_trending_date,
-            date_trunc('month', t.video_trending_date) AS month,
-            unnest(str_split(t.video_tags, ',')) AS tag_raw
-          FROM trending t
-          WHERE t.video_trending_country = 'United States'
-            AND t.video_trending_date IS NOT NULL
-            AND t.video_tags IS NOT NULL
-        ),
-        norm AS (
-          SELECT
-            video_id,
-            video_trending_date,
-            month,
-            lower(trim(tag_raw)) AS tag0
-          FROM base
-        ),
-        cleaned AS (
-          SELECT
-            video_id,
-            video_trending_date,
-            month,
-            regexp_replace(
-              regexp_replace(
-                regexp_replace(tag0, '^#+', ''),      -- remove leading ####
-                '\s+', ' '                             -- collapse whitespace
-              ),
-              '(^"+|"+$)', ''                          -- strip surrounding quotes
-            ) AS tag
-          FROM norm
+    con.register("tag_events_raw", clean_tag_events(con))
+    try:
+        con.execute(
+            """
+            CREATE TEMP TABLE tag_events_text AS
+            SELECT DISTINCT country, video_id, video_trending_date, tag
+            FROM tag_events_raw;
+            """
         )
-        SELECT DISTINCT
-          video_id,
-          video_trending_date,
-          month,
-          tag
-        FROM cleaned
-        WHERE tag IS NOT NULL
-          AND tag <> ''
-          AND length(tag) >= 2
-          AND length(tag) <= 80
-          AND tag NOT LIKE 'yt:%'
-          AND tag NOT LIKE '%http%'
-          AND tag NOT LIKE '%https%'
-          AND tag NOT LIKE '%www.%'
-          AND tag NOT LIKE '%@%';
+    finally:
+        con.unregister("tag_events_raw")
+
+    # - tag text is stored once, in tag_dim; the tag tables carry the integer id.
+    #   Ids are numbered in tag order, so ORDER BY tag_id sorts alphabetically
+    con.execute(
+        f"""
+        CREATE TABLE tag_dim AS
+        SELECT CAST(row_number() OVER (ORDER BY tag) AS INTEGER) AS tag_id, tag
+        FROM (SELECT DISTINCT tag FROM tag_events_text)
+        ORDER BY {LAYOUTS['tag_dim']};
         """
     )
+    con.execute(
+        f"""
+        CREATE TABLE tag_events_clean AS
+        SELECT
+          e.country,
+          e.video_id,
+          e.video_trending_date,
+          date_trunc('month', e.video_trending_date) AS month,
+          d.tag_id
+        FROM tag_events_text e
+        JOIN tag_dim d USING (tag)
+        ORDER BY {LAYOUTS['tag_events_clean']};
+        """
+    )
+    con.execute("DROP TABLE tag_events_text;")
 
     # 2) Monthly aggregates (cleaned)
     con.execute(
-        r"""
-        CREATE TABLE us_tag_monthly_clean AS
+        f"""
+        CREATE TABLE tag_monthly_clean AS
         WITH totals_all AS (
           SELECT
+            video_trending_country AS country,
             date_trunc('month', video_trending_date) AS month,
             count(DISTINCT video_id) AS total_videos_all
           FROM trending
-          WHERE video_trending_country = 'United States'
+          WHERE video_trending_country IS NOT NULL
             AND video_trending_date IS NOT NULL
-          GROUP BY 1
+          GROUP BY 1, 2
         ),
         totals_tagged AS (
           SELECT
+            country,
             month,
             count(DISTINCT video_id) AS total_videos_tagged
-          FROM us_tag_events_clean
-          GROUP BY 1
+          FROM tag_events_clean
+          GROUP BY 1, 2
         ),
         tag_counts AS (
           SELECT
+            country,
             month,
-            tag,
+            tag_id,
             count(DISTINCT video_id) AS distinct_videos,
             count(*) AS tag_rows
-          FROM us_tag_events_clean
-          GROUP BY 1,2
+          FROM tag_events_clean
+          GROUP BY 1, 2, 3
         )
         SELECT
+          tc.country,
           tc.month,
-          tc.tag,
+          tc.tag_id,
           tc.distinct_videos,
           tc.tag_rows,
           tt.total_videos_tagged,
@@ -115,30 +166,168 @@ def main():
           tc.distinct_videos::DOUBLE / nullif(tt.total_videos_tagged, 0) AS video_share,
           tc.distinct_videos::DOUBLE / nullif(ta.total_videos_all, 0) AS video_share_all
         FROM tag_counts tc
-        LEFT JOIN totals_tagged tt USING (month)
-        LEFT JOIN totals_all ta USING (month);
+        LEFT JOIN totals_tagged tt USING (country, month)
+        LEFT JOIN totals_all ta USING (country, month)
+        ORDER BY {LAYOUTS['tag_monthly_clean']};
+        """
+    )
+    con.execute(
+        f"""
+        CREATE TABLE tag_monthly_by_tag AS
+        SELECT * FROM tag_monthly_clean
+        ORDER BY {LAYOUTS['tag_monthly_by_tag']};
         """
     )
 
-    # 3) Months view for dropdown (DESC)
+    # 3) Month-over-month movers, ranked once here so /tags/rising and /tags/falling read a
+    #    top-N range: rising covers every tag of the month (a new tag counts from 0), falling
+    #    only tags that were already there the month before
     con.execute(
+        f"""
+        CREATE TABLE tag_movers_clean AS
+        WITH paired AS (
+          SELECT
+            n.country,
+            n.month,
+            n.tag_id,
+            p.video_share AS share_prev,
+            n.video_share AS share_now,
+            (n.video_share - coalesce(p.video_share, 0)) AS delta,
+            CASE
+              WHEN p.video_share IS NULL OR p.video_share = 0 THEN NULL
+              ELSE n.video_share / p.video_share
+            END AS lift
+          FROM tag_monthly_clean n
+          LEFT JOIN tag_monthly_clean p
+            ON p.country = n.country
+           AND p.tag_id = n.tag_id
+           AND p.month = n.month - INTERVAL 1 MONTH
+        )
+        SELECT
+          *,
+          row_number() OVER (
+            PARTITION BY country, month ORDER BY delta DESC NULLS LAST, tag_id
+          ) AS rising_rank,
+          CASE WHEN share_prev IS NOT NULL THEN
+            row_number() OVER (
+              PARTITION BY country, month, share_prev IS NOT NULL ORDER BY delta ASC NULLS LAST, tag_id
+            )
+          END AS falling_rank
+        FROM paired
+        ORDER BY {LAYOUTS['tag_movers_clean']};
+        """
+    )
+
+    # 4) Each tag's videos per month with their stats that month and the video_dim display
+    #    fields, ranked by views and by likes, for the /tags/videos drill-down
+    con.execute(
+        f"""
+        CREATE TABLE tag_video_stats_clean AS
+        WITH pairs AS (
+          SELECT DISTINCT country, month, tag_id, video_id
+          FROM tag_events_clean
+        ),
+        stats AS (
+          SELECT
+            video_trending_country AS country,
+            date_trunc('month', video_trending_date) AS month,
+            video_id,
+            max(video_view_count) AS max_views,
+            max(video_like_count) AS max_likes,
+            max(video_comment_count) AS max_comments,
+            count(DISTINCT video_trending_date) AS days_trended_in_month,
+            min(video_trending_date) AS first_date,
+            max(video_trending_date) AS last_date
+          FROM trending
+          WHERE video_trending_country IS NOT NULL
+            AND video_trending_date IS NOT NULL
+          GROUP BY 1, 2, 3
+        )
+        SELECT
+          p.country,
+          p.month,
+          p.tag_id,
+          p.video_id,
+          d.video_title,
+          d.channel_id,
+          d.channel_title,
+          d.video_default_thumbnail,
+          s.max_views,
+          s.max_likes,
+          s.max_comments,
+          s.days_trended_in_month,
+          s.first_date,
+          s.last_date,
+          row_number() OVER (
+            PARTITION BY p.country, p.month, p.tag_id ORDER BY coalesce(s.max_views, -1) DESC, p.video_id
+          ) AS views_rank,
+          row_number() OVER (
+            PARTITION BY p.country, p.month, p.tag_id ORDER BY coalesce(s.max_likes, -1) DESC, p.video_id
+          ) AS likes_rank
+        FROM pairs p
+        JOIN stats s USING (country, month, video_id)
+        JOIN video_dim d USING (video_id)
+        ORDER BY {LAYOUTS['tag_video_stats_clean']};
+        """
+    )
+
+    # 5) Months view for dropdown (DESC)
+    replace_view(
+        con,
+        "v_tag_months_clean",
         r"""
-        CREATE VIEW v_us_tag_months_clean AS
-        SELECT DISTINCT CAST(month AS VARCHAR) AS month
-        FROM us_tag_monthly_clean
-        ORDER BY month DESC;
+        SELECT DISTINCT country, CAST(month AS VARCHAR) AS month
+        FROM tag_monthly_clean
+        ORDER BY country, month DESC;
+        """,
+    )
+
+    # The original US-only names, as views with the tag text joined back, for notebooks and older queries
+    replace_view(
+        con,
+        "us_tag_events_clean",
+        f"""
+        SELECT e.video_id, e.video_trending_date, e.month, d.tag
+        FROM tag_events_clean e JOIN tag_dim d USING (tag_id)
+        WHERE e.country = '{US}';
+        """,
+    )
+    replace_view(
+        con,
+        "us_tag_monthly_clean",
+        f"""
+        SELECT m.month, d.tag, m.* EXCLUDE (country, month, tag_id)
+        FROM tag_monthly_clean m JOIN tag_dim d USING (tag_id)
+        WHERE m.country = '{US}';
+        """,
+    )
+    replace_view(
+        con,
+        "v_us_tag_months_clean",
+        f"SELECT month FROM v_tag_months_clean WHERE country = '{US}' ORDER BY month DESC;",
+    )
+
+    # 6) Tag months in the shared catalog (served from memory by the API)
+    con.execute("CREATE TABLE IF NOT EXISTS catalog (country VARCHAR, kind VARCHAR, value VARCHAR);")
+    con.execute("DELETE FROM catalog WHERE kind = 'tag_month';")
+    con.execute(
+        r"""
+        INSERT INTO catalog
+        SELECT country, 'tag_month', month
+        FROM v_tag_months_clean;
         """
     )
 
     # --- Print sanity checks ---
-    n_events = con.execute("SELECT count(*) FROM us_tag_events_clean").fetchone()[0]
-    n_tags = con.execute("SELECT count(DISTINCT tag) FROM us_tag_events_clean").fetchone()[0]
-    months = con.execute("SELECT count(DISTINCT month) FROM us_tag_monthly_clean").fetchone()[0]
+    n_events = con.execute("SELECT count(*) FROM tag_events_clean").fetchone()[0]
+    n_countries = con.execute("SELECT count(DISTINCT country) FROM tag_events_clean").fetchone()[0]
+    n_tags = con.execute("SELECT count(*) FROM tag_dim").fetchone()[0]
+    months = con.execute("SELECT count(DISTINCT month) FROM tag_monthly_clean").fetchone()[0]
     min_month, max_month = con.execute(
-        "SELECT CAST(min(month) AS VARCHAR), CAST(max(month) AS VARCHAR) FROM us_tag_monthly_clean"
+        "SELECT CAST(min(month) AS VARCHAR), CAST(max(month) AS VARCHAR) FROM tag_monthly_clean"
     ).fetchone()
 
-    print(f"✅ us_tag_events_clean rows: {n_events:,}")
+    print(f"✅ tag_events_clean rows: {n_events:,} ({n_countries} countries)")
     print(f"✅ unique cleaned tags: {n_tags:,}")
     print(f"✅ months: {months} ({min_month} → {max_month})")
 
@@ -156,7 +345,7 @@ def main():
         """
     ).fetchall()
 
-    print("\nTop 10 cleaned tags in latest month:")
+    print("\nTop 10 cleaned US tags in latest month:")
     for row in latest:
         print(" -", row)
 
@@ -164,5 +353,14 @@ def main():
     print("\nDone.")
 
 
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Build cleaned tag events and monthly tag analytics for every country.")
+    add_arguments(parser)
+    settings = Settings.resolve(parser.parse_args(argv))
+
+    with build_target() as db_path:
+        _build(db_path, settings)
+
+
 if __name__ == "__main__":
     main()
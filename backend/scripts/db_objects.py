@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+
+def relation_type(con, name: str) -> str | None:
+    """'BASE TABLE', 'VIEW' or None if nothing by that name exists."""
+    row = con.execute(
+        "SELECT table_type FROM information_schema.tables WHERE table_name = ?",
+        [name],
+    ).fetchone()
+    return row[0] if row else None
+
+
+def drop_relation(con, name: str) -> None:
+    """Drop a table or view; DuckDB refuses DROP TABLE on a view and vice versa."""
+    kind = relation_type(con, name)
+    if kind == "VIEW":
+        con.execute(f"DROP VIEW {name};")
+    elif kind is not None:
+        con.execute(f"DROP TABLE {name};")
+
+
+def replace_view(con, name: str, sql: str) -> None:
+    """(Re)create view `name`, replacing a table of the same name left by an older build."""
+    if relation_type(con, name) not in (None, "VIEW"):
+        con.execute(f"DROP TABLE {name};")
+    con.execute(f"CREATE OR REPLACE VIEW {name} AS {sql}")
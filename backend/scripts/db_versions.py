@@ -0,0 +1,160 @@
+"""
+Versioned DuckDB builds.
+
+Each refresh writes a brand-new database file under data/processed/builds/ and
+then publishes it by atomically replacing data/processed/current.json. The API
+reads that manifest, so a refresh never rewrites a file the server has open:
+new requests move to the new build, in-flight requests finish on the old one,
+and retired builds are deleted once they are older than a grace period.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]  # youtube-trending-app/
+PROCESSED_DIR = PROJECT_ROOT / "data" / "processed"
+BUILDS_DIR = PROCESSED_DIR / "builds"
+MANIFEST_PATH = PROCESSED_DIR / "current.json"
+LEGACY_DB_PATH = PROCESSED_DIR / "trending.duckdb"
+
+# Set by refresh_data.py so every stage writes into the same unpublished build
+BUILD_DB_ENV = "TRENDING_BUILD_DB"
+
+DEFAULT_GRACE_SECONDS = 15 * 60
+
+
+def read_manifest() -> dict | None:
+    if not MANIFEST_PATH.exists():
+        return None
+    return json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+
+
+def published_db_path() -> Path | None:
+    manifest = read_manifest()
+    if not manifest:
+        return None
+    return (MANIFEST_PATH.parent / manifest["path"]).resolve()
+
+
+def current_db_path() -> Path:
+    """
+    Database a pipeline script reads:
+    the build being assembled by refresh_data.py, else the published build,
+    else the legacy single-file location.
+    """
+    override = os.getenv(BUILD_DB_ENV)
+    if override:
+        return Path(override).resolve()
+    return published_db_path() or LEGACY_DB_PATH
+
+
+@contextmanager
+def build_target(grace_seconds: float = DEFAULT_GRACE_SECONDS) -> Iterator[Path]:
+    """
+    Database a pipeline script writes to.
+
+    Under refresh_data.py, the build it is assembling; refresh_data.py publishes it
+    once every stage has run. A script run by hand gets a new build seeded from the
+    current database, published when the block exits and deleted if it raises, so
+    it never rewrites the file the API is serving.
+    """
+    override = os.getenv(BUILD_DB_ENV)
+    if override:
+        yield Path(override).resolve()
+        return
+
+    build_path = new_build_path()
+    print(f"Building new database version: {build_path}")
+    source = current_db_path()
+    if source.exists():
+        shutil.copyfile(source, build_path)
+        print(f"Seeded from: {source}")
+    try:
+        yield build_path
+    except BaseException:
+        _remove_db_file(build_path)
+        raise
+    manifest = publish(build_path, grace_seconds=grace_seconds)
+    print(f"Published {manifest['version']}. The running API switches to it for new requests.")
+
+
+def new_build_path() -> Path:
+    BUILDS_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = BUILDS_DIR / f"trending-{stamp}.duckdb"
+    n = 1
+    while path.exists():
+        n += 1
+        path = BUILDS_DIR / f"trending-{stamp}-{n}.duckdb"
+    return path
+
+
+def seed_build(build_path: Path) -> Path | None:
+    """
+    Start a new build as a copy of the published one, so build_duckdb.py can
+    ingest only the rows past its watermark. Returns the copied file, or None
+    when nothing has been published yet (the build then starts empty).
+    """
+    source = published_db_path()
+    if source is None or not source.exists():
+        return None
+    shutil.copyfile(source, build_path)
+    return source
+
+
+def _remove_db_file(path: Path) -> bool:
+    try:
+        path.unlink(missing_ok=True)
+        Path(f"{path}.wal").unlink(missing_ok=True)
+        return True
+    except OSError:
+        # Still open somewhere (e.g. Windows file locks); retry on the next publish
+        return False
+
+
+def publish(db_path: Path, grace_seconds: float = DEFAULT_GRACE_SECONDS) -> dict:
+    """Atomically point current.json at db_path, then clean up expired builds."""
+    db_path = db_path.resolve()
+    now = datetime.now(timezone.utc)
+    previous = read_manifest() or {}
+
+    retired = list(previous.get("retired", []))
+    if previous.get("path"):
+        retired.append({"path": previous["path"], "retired_at": now.isoformat()})
+
+    kept = []
+    for entry in retired:
+        path = (MANIFEST_PATH.parent / entry["path"]).resolve()
+        if path == db_path:
+            continue
+        age = (now - datetime.fromisoformat(entry["retired_at"])).total_seconds()
+        if age >= grace_seconds and _remove_db_file(path):
+            continue
+        kept.append(entry)
+
+    # Builds that were never published (e.g. an aborted refresh)
+    referenced = {db_path} | {(MANIFEST_PATH.parent / e["path"]).resolve() for e in kept}
+    for path in BUILDS_DIR.glob("*.duckdb"):
+        if path.resolve() in referenced:
+            continue
+        if now.timestamp() - path.stat().st_mtime >= grace_seconds:
+            _remove_db_file(path)
+
+    manifest = {
+        "version": db_path.stem,
+        "path": os.path.relpath(db_path, MANIFEST_PATH.parent).replace(os.sep, "/"),
+        "published_at": now.isoformat(),
+        "retired": kept,
+    }
+
+    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = MANIFEST_PATH.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp, MANIFEST_PATH)
+    return manifest
@@ -1,42 +1,189 @@
+from __future__ import annotations
+
 from pathlib import Path
-import shutil
+from datetime import datetime, timezone
 import argparse
-import kagglehub
+import json
+import os
+import shutil
+
+from pipeline import file_sha256
 
 DATASET = "canerkonuk/youtube-trending-videos-global"
 
-def main():
+# Where we want raw data to live in *our* project
+PROJECT_ROOT = Path(__file__).resolve().parents[2]  # youtube-trending-app/
+RAW_DIR = PROJECT_ROOT / "data" / "raw" / "youtube_trending_global"
+
+# Size, mtime and SHA-256 of every synced file; later stages read hashes from here
+MANIFEST_NAME = "manifest.json"
+
+LINK_MODES = ("auto", "reflink", "hardlink", "copy")
+
+# Linux FICLONE ioctl: copy-on-write clone on btrfs / XFS (reflink=1) / bcachefs
+_FICLONE = 0x40049409
+
+
+def read_manifest(raw_dir: Path = RAW_DIR) -> dict:
+    path = raw_dir / MANIFEST_NAME
+    if not path.exists():
+        return {"files": {}}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def manifest_sha256(path: Path, raw_dir: Path = RAW_DIR) -> str | None:
+    """Recorded SHA-256 of a synced file, if the file still has the recorded size and mtime."""
+    try:
+        rel = path.resolve().relative_to(raw_dir.resolve()).as_posix()
+        st = path.stat()
+    except (ValueError, FileNotFoundError):
+        return None
+    entry = read_manifest(raw_dir)["files"].get(rel)
+    if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+        return entry["sha256"]
+    return None
+
+
+def _reflink(src: Path, dest: Path) -> None:
+    import fcntl  # not available on Windows; the caller falls back
+
+    with src.open("rb") as s, dest.open("wb") as d:
+        fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+    shutil.copystat(src, dest)
+
+
+def _place(src: Path, dest: Path, mode: str) -> str:
+    """
+    Put src at dest without a window where dest is half-written: materialize a
+    temporary sibling, then os.replace it. Returns the method that worked.
+    """
+    tmp = dest.with_name(f".{dest.name}.sync")
+    tmp.unlink(missing_ok=True)
+    attempts = {
+        "auto": ("reflink", "hardlink", "copy"),
+        "reflink": ("reflink",),
+        "hardlink": ("hardlink",),
+        "copy": ("copy",),
+    }[mode]
+    for method in attempts:
+        try:
+            if method == "reflink":
+                _reflink(src, tmp)
+            elif method == "hardlink":
+                # Shares the inode (and mtime) with the cache file: no bytes are copied
+                os.link(src, tmp)
+            else:
+                shutil.copy2(src, tmp)
+        except (OSError, ImportError):
+            tmp.unlink(missing_ok=True)
+            if method == attempts[-1]:
+                raise
+            continue
+        os.replace(tmp, dest)
+        return method
+    raise AssertionError("unreachable")
+
+
+def sync_tree(src_dir: Path, dest_dir: Path, verify_hash: bool = False, mode: str = "auto") -> dict:
+    """
+    Mirror every file under src_dir into dest_dir, skipping files whose size and
+    mtime already match (and, with verify_hash, whose SHA-256 matches too).
+    Changed files are reflinked, hardlinked or copied (first that works for `auto`).
+    Writes dest_dir/manifest.json and returns it.
+    """
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    previous = read_manifest(dest_dir)["files"]
+    files: dict[str, dict] = {}
+    counts: dict[str, int] = {}
+
+    for item in sorted(src_dir.rglob("*")):
+        if not item.is_file():
+            continue
+        rel = item.relative_to(src_dir).as_posix()
+        dest = dest_dir / rel
+        st = item.stat()
+
+        same = False
+        if dest.exists():
+            dst = dest.stat()
+            same = dst.st_size == st.st_size and dst.st_mtime_ns == st.st_mtime_ns
+            if same and verify_hash:
+                same = file_sha256(item) == file_sha256(dest)
+
+        if same:
+            action = "unchanged"
+        else:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            action = _place(item, dest, mode)
+        counts[action] = counts.get(action, 0) + 1
+
+        # Hash only what changed: a file the manifest already describes keeps its hash
+        dst = dest.stat()
+        entry = previous.get(rel)
+        if not (action == "unchanged" and entry and entry["size"] == dst.st_size and entry["mtime_ns"] == dst.st_mtime_ns):
+            entry = {"size": dst.st_size, "mtime_ns": dst.st_mtime_ns, "sha256": file_sha256(dest)}
+        files[rel] = entry
+        print(f" - {rel}: {action}")
+
+    manifest = {
+        "source": str(src_dir),
+        "synced_at": datetime.now(timezone.utc).isoformat(),
+        "files": files,
+        "counts": counts,
+    }
+    path = dest_dir / MANIFEST_NAME
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+    return manifest
+
+
+def main(argv: list[str] | None = None):
     parser = argparse.ArgumentParser(description="Download the Kaggle trending dataset into data/raw/.")
     parser.add_argument(
         "--force-download",
         action="store_true",
         help="Re-download from Kaggle even if already present in the local kagglehub cache.",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--source-dir",
+        type=Path,
+        help="Sync from this local directory instead of kagglehub (e.g. a copy of its cache).",
+    )
+    parser.add_argument(
+        "--verify-hash",
+        action="store_true",
+        help="Compare SHA-256 as well, not just size and mtime, before skipping a file.",
+    )
+    parser.add_argument(
+        "--link-mode",
+        choices=LINK_MODES,
+        default="auto",
+        help="How changed files are placed: reflink, hardlink or copy (auto tries them in that order).",
+    )
+    args = parser.parse_args(argv)
 
-    # Where we want raw data to live in *our* project
-    project_root = Path(__file__).resolve().parents[2]  # youtube-trending-app/
-    raw_dir = project_root / "data" / "raw" / "youtube_trending_global"
+    raw_dir = RAW_DIR
     raw_dir.mkdir(parents=True, exist_ok=True)
 
-    print(f"Downloading Kaggle dataset: {DATASET}")
-    downloaded_path = Path(kagglehub.dataset_download(DATASET, force_download=args.force_download))
-    print(f"Kagglehub cache location: {downloaded_path}")
+    if args.source_dir:
+        downloaded_path = args.source_dir.resolve()
+        print(f"Using local source directory: {downloaded_path}")
+    else:
+        import kagglehub
 
-    # Copy files from kagglehub cache -> our raw folder
-    # (We do this so our project is self-contained and predictable)
-    for item in downloaded_path.rglob("*"):
-        if item.is_file():
-            rel = item.relative_to(downloaded_path)
-            dest = raw_dir / rel
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(item, dest)
+        print(f"Downloading Kaggle dataset: {DATASET}")
+        downloaded_path = Path(kagglehub.dataset_download(DATASET, force_download=args.force_download))
+        print(f"Kagglehub cache location: {downloaded_path}")
+
+    # Mirror the cache into our raw folder (so our project is self-contained and predictable),
+    # touching only files that changed
+    print(f"\nSyncing into: {raw_dir}")
+    manifest = sync_tree(downloaded_path, raw_dir, verify_hash=args.verify_hash, mode=args.link_mode)
 
-    print(f"\nCopied raw files into: {raw_dir}")
-    print("Files found:")
-    for f in sorted(raw_dir.rglob("*")):
-        if f.is_file():
-            print(" -", f.relative_to(raw_dir))
+    summary = ", ".join(f"{n} {action}" for action, n in sorted(manifest["counts"].items()))
+    print(f"\nSynced {len(manifest['files'])} files ({summary or 'none'})")
+    print(f"Manifest: {raw_dir / MANIFEST_NAME}")
 
 if __name__ == "__main__":
     main()
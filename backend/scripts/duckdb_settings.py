@@ -0,0 +1,190 @@
+"""
+DuckDB execution settings shared by the pipeline scripts.
+
+Every script connects through connect(), which applies:
+
+- threads: cores available to this process (CPU affinity and cgroup quota
+  respected), instead of a hard-coded 4
+- memory_limit: DuckDB's own default, except inside a memory-limited
+  container where it is 75% of the cgroup limit (DuckDB sizes itself from
+  the host's RAM there)
+- temp_directory: where operators spill when memory_limit is reached;
+  data/tmp/duckdb by default, so in-memory connections can spill too
+- preserve_insertion_order: on by default; turning it off lets large
+  CREATE TABLE AS / COPY statements without ORDER BY use less memory
+
+Each one can be set with a command-line flag (see add_arguments) or an
+environment variable; the flag wins, then the variable, then the default.
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import duckdb
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]  # youtube-trending-app/
+DEFAULT_TEMP_DIR = PROJECT_ROOT / "data" / "tmp" / "duckdb"
+
+ENV_THREADS = "PIPELINE_DUCKDB_THREADS"
+ENV_MEMORY_LIMIT = "PIPELINE_DUCKDB_MEMORY_LIMIT"
+ENV_TEMP_DIR = "PIPELINE_DUCKDB_TEMP_DIR"
+ENV_PRESERVE_ORDER = "PIPELINE_DUCKDB_PRESERVE_INSERTION_ORDER"
+
+# Share of a container's memory limit given to DuckDB when none is configured
+CGROUP_MEMORY_SHARE = 0.75
+
+
+def _read_first_line(path: str) -> str | None:
+    try:
+        with open(path, encoding="ascii") as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def available_cpus() -> int:
+    """Cores this process may use: CPU affinity, capped by a cgroup CPU quota."""
+    try:
+        n = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on Windows / macOS
+        n = os.cpu_count() or 1
+
+    # cgroup v2: "<quota> <period>" or "max <period>"; v1: two files
+    quota = period = None
+    cpu_max = _read_first_line("/sys/fs/cgroup/cpu.max")
+    if cpu_max:
+        q, _, p = cpu_max.partition(" ")
+        if q != "max" and p:
+            quota, period = int(q), int(p)
+    else:
+        q = _read_first_line("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+        p = _read_first_line("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+        if q and p and int(q) > 0:
+            quota, period = int(q), int(p)
+    if quota and period:
+        n = min(n, max(1, math.ceil(quota / period)))
+    return max(1, n)
+
+
+def cgroup_memory_limit() -> int | None:
+    """Container memory limit in bytes, or None when unlimited / not in a cgroup."""
+    raw = _read_first_line("/sys/fs/cgroup/memory.max") or _read_first_line(
+        "/sys/fs/cgroup/memory/memory.limit_in_bytes"
+    )
+    if not raw or raw == "max":
+        return None
+    limit = int(raw)
+    # cgroup v1 reports "unlimited" as a huge page-aligned number
+    return limit if limit < 2**60 else None
+
+
+def _parse_bool(raw: str) -> bool:
+    value = raw.strip().lower()
+    if value in ("1", "true", "yes", "on"):
+        return True
+    if value in ("0", "false", "no", "off"):
+        return False
+    raise ValueError(f"Expected a boolean, got {raw!r}")
+
+
+@dataclass(frozen=True)
+class Settings:
+    threads: int
+    memory_limit: str | None
+    temp_directory: Path
+    preserve_insertion_order: bool
+
+    @classmethod
+    def resolve(cls, args: argparse.Namespace | None = None) -> "Settings":
+        """Command-line flags (if parsed with add_arguments), then environment, then defaults."""
+
+        def pick(attr: str, env: str):
+            value = getattr(args, attr, None) if args is not None else None
+            if value is not None:
+                return value
+            raw = os.getenv(env)
+            return raw if raw not in (None, "") else None
+
+        threads = pick("duckdb_threads", ENV_THREADS)
+        memory_limit = pick("duckdb_memory_limit", ENV_MEMORY_LIMIT)
+        if memory_limit is None:
+            limit = cgroup_memory_limit()
+            if limit is not None:
+                memory_limit = f"{int(limit * CGROUP_MEMORY_SHARE) // 2**20}MiB"
+        temp_directory = pick("duckdb_temp_dir", ENV_TEMP_DIR)
+        preserve = pick("preserve_insertion_order", ENV_PRESERVE_ORDER)
+        if isinstance(preserve, str):
+            preserve = _parse_bool(preserve)
+
+        return cls(
+            threads=int(threads) if threads is not None else available_cpus(),
+            memory_limit=memory_limit,
+            temp_directory=Path(temp_directory) if temp_directory else DEFAULT_TEMP_DIR,
+            preserve_insertion_order=True if preserve is None else preserve,
+        )
+
+    def export_env(self) -> None:
+        """Hand these settings to scripts run later in this process or in child processes."""
+        os.environ[ENV_THREADS] = str(self.threads)
+        if self.memory_limit:
+            os.environ[ENV_MEMORY_LIMIT] = self.memory_limit
+        os.environ[ENV_TEMP_DIR] = str(self.temp_directory)
+        os.environ[ENV_PRESERVE_ORDER] = "true" if self.preserve_insertion_order else "false"
+
+    def describe(self) -> str:
+        return (
+            f"threads={self.threads}, memory_limit={self.memory_limit or 'duckdb default'}, "
+            f"temp_directory={self.temp_directory}, preserve_insertion_order={self.preserve_insertion_order}"
+        )
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("DuckDB settings")
+    group.add_argument(
+        "--duckdb-threads",
+        type=int,
+        help=f"Worker threads (env {ENV_THREADS}; default: available cores).",
+    )
+    group.add_argument(
+        "--duckdb-memory-limit",
+        help=f"e.g. 8GB (env {ENV_MEMORY_LIMIT}; default: DuckDB's, or 75%% of a container limit).",
+    )
+    group.add_argument(
+        "--duckdb-temp-dir",
+        help=f"Spill directory (env {ENV_TEMP_DIR}; default: data/tmp/duckdb).",
+    )
+    group.add_argument(
+        "--preserve-insertion-order",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help=f"Keep insertion order for queries without ORDER BY (env {ENV_PRESERVE_ORDER}; default: on).",
+    )
+
+
+def apply(con: duckdb.DuckDBPyConnection, settings: Settings) -> None:
+    """SET rather than connect(config=...): stages run by refresh_data.py share one database instance."""
+    settings.temp_directory.mkdir(parents=True, exist_ok=True)
+    temp_dir = settings.temp_directory.as_posix().replace("'", "''")
+    con.execute(f"SET threads = {int(settings.threads)};")
+    if settings.memory_limit:
+        con.execute(f"SET memory_limit = '{settings.memory_limit}';")
+    con.execute(f"SET temp_directory = '{temp_dir}';")
+    con.execute(f"SET preserve_insertion_order = {'true' if settings.preserve_insertion_order else 'false'};")
+
+
+def connect(
+    database: str | Path = ":memory:", settings: Settings | None = None, read_only: bool = False
+) -> duckdb.DuckDBPyConnection:
+    """duckdb.connect() with the pipeline settings applied."""
+    settings = settings or Settings.resolve()
+    con = duckdb.connect(str(database), read_only=read_only)
+    try:
+        apply(con, settings)
+    except Exception:
+        con.close()
+        raise
+    return con
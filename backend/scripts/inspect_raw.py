@@ -1,18 +1,31 @@
-from pathlib import Path
-import pandas as pd
+from duckdb_settings import connect
+from stage_parquet import parquet_glob, read_parquet_sql
+
 
 def main():
-    project_root = Path(__file__).resolve().parents[2]
-    csv_path = project_root / "data" / "raw" / "youtube_trending_global" / "youtube_trending_videos_global.csv"
+    glob = parquet_glob()
 
-    print("Reading:", csv_path)
-    df = pd.read_csv(csv_path, nrows=200)  # sample first 200 rows (fast)
+    print("Reading:", glob)
+    con = connect()
+    try:
+        # Typed columns come from the Parquet schema; only the sampled row groups are read
+        df = con.execute(f"SELECT * FROM {read_parquet_sql(glob)} LIMIT 200").df()  # sample 200 rows (fast)
+        partitions = con.execute(
+            f"""
+            SELECT video_trending_country, count(DISTINCT trending_month) AS months, count(*) AS rows
+            FROM {read_parquet_sql(glob)}
+            GROUP BY 1
+            ORDER BY 1
+            """
+        ).df()
+    finally:
+        con.close()
 
     print("\n--- Columns ---")
     for c in df.columns:
         print("-", c)
 
-    print("\n--- dtypes (sample-based) ---")
+    print("\n--- dtypes (Parquet schema) ---")
     print(df.dtypes)
 
     print("\n--- Head (5) ---")
@@ -22,5 +35,8 @@ def main():
     na = df.isna().mean().sort_values(ascending=False).head(15)
     print((na * 100).round(2).astype(str) + "%")
 
+    print("\n--- Partitions per country ---")
+    print(partitions.to_string(index=False))
+
 if __name__ == "__main__":
     main()
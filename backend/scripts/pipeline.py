@@ -0,0 +1,294 @@
+"""
+Stage graph for the data refresh.
+
+Each Stage declares what it reads and writes, as "table:<name>" (in the build
+database) or "file:<path>". A stage depends on whichever stages produce its
+inputs; stages whose dependencies are done run concurrently, in threads of
+this process sharing one DuckDB instance (so the database is opened once).
+
+Before running a stage its key is computed: a hash of its source files, its
+arguments and the fingerprints of its inputs (file: SHA-256, table: content
+hash recorded when the producing stage finished). When the key matches the
+one stored in pipeline_state and every output still exists, the stage is
+skipped. pipeline_state lives in the build database itself, so a build seeded
+from the published one inherits it, and a build left behind by a failed run
+resumes at the stage that failed.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+import duckdb
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    run: Callable[[], None]
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+    # Files whose code decides the stage's output (relative to scripts/)
+    sources: tuple[str, ...] = ()
+    args: tuple[str, ...] = ()
+    # Run every time (e.g. the download, whose real input is remote)
+    always: bool = False
+
+
+@dataclass
+class StageResult:
+    status: str = "pending"  # pending | skipped | ran | failed | blocked
+    seconds: float = 0.0
+    output: str = ""
+    error: str = ""
+
+
+class _ThreadOutput(io.TextIOBase):
+    """sys.stdout replacement: each stage thread prints into its own buffer."""
+
+    def __init__(self, default):
+        self.default = default
+        self.local = threading.local()
+
+    def write(self, s: str) -> int:
+        buf = getattr(self.local, "buf", None)
+        return (buf if buf is not None else self.default).write(s)
+
+    def flush(self) -> None:
+        self.default.flush()
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_sha256(path: Path, chunk_size: int = 8 * 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class Pipeline:
+    def __init__(
+        self,
+        con: duckdb.DuckDBPyConnection,
+        stages: list[Stage],
+        jobs: int = 2,
+        force: set[str] | frozenset[str] = frozenset(),
+        hash_hint: Callable[[Path], str | None] | None = None,
+    ):
+        self.con = con
+        self.stages = {s.name: s for s in stages}
+        unknown = set(force) - set(self.stages)
+        if unknown:
+            raise ValueError(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+        self.force = set(force)
+        self.jobs = max(1, jobs)
+        # Known SHA-256 of a file (e.g. from the download manifest), used before hashing it
+        self.hash_hint = hash_hint
+        self.results = {s.name: StageResult() for s in stages}
+        self._lock = threading.Lock()
+        self._db_lock = threading.RLock()
+
+        producers = {out: s.name for s in stages for out in s.outputs}
+        self.deps = {
+            s.name: {producers[i] for i in s.inputs if i in producers and producers[i] != s.name} for s in stages
+        }
+
+        con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pipeline_state (
+              stage VARCHAR PRIMARY KEY,
+              input_key VARCHAR,
+              outputs VARCHAR,      -- JSON: output -> fingerprint
+              seconds DOUBLE,
+              finished_at TIMESTAMPTZ
+            );
+            """
+        )
+        con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pipeline_file_hashes (
+              path VARCHAR PRIMARY KEY,
+              size BIGINT,
+              mtime_ns BIGINT,
+              sha256 VARCHAR
+            );
+            """
+        )
+
+    # -- fingerprints ---------------------------------------------------------
+
+    def _cursor(self) -> duckdb.DuckDBPyConnection:
+        with self._db_lock:
+            return self.con.cursor()
+
+    def _file_fingerprint(self, path: Path) -> str | None:
+        """SHA-256 of a file, re-hashed only when its size or mtime changed."""
+        if not path.exists():
+            return None
+        st = path.stat()
+        # One thread at a time: concurrent stages may hash the same file
+        with self._db_lock:
+            cur = self._cursor()
+            row = cur.execute(
+                "SELECT size, mtime_ns, sha256 FROM pipeline_file_hashes WHERE path = ?", [str(path)]
+            ).fetchone()
+            if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+                return row[2]
+            digest = (self.hash_hint and self.hash_hint(path)) or file_sha256(path)
+            cur.execute(
+                "INSERT OR REPLACE INTO pipeline_file_hashes VALUES (?, ?, ?, ?)",
+                [str(path), st.st_size, st.st_mtime_ns, digest],
+            )
+            return digest
+
+    def _table_exists(self, name: str) -> bool:
+        return (
+            self._cursor()
+            .execute("SELECT count(*) FROM duckdb_tables() WHERE table_name = ? AND schema_name = 'main'", [name])
+            .fetchone()[0]
+            > 0
+        )
+
+    def _table_fingerprint(self, name: str) -> str | None:
+        """Order-independent content hash: row count + sum of row hashes."""
+        if not self._table_exists(name):
+            return None
+        n, total = (
+            self._cursor()
+            .execute(f'SELECT count(*), CAST(sum(hash(t)::HUGEINT) AS VARCHAR) FROM "{name}" t')
+            .fetchone()
+        )
+        return f"{n}:{total}"
+
+    def _recorded_outputs(self) -> dict[str, str]:
+        recorded: dict[str, str] = {}
+        for (outputs,) in self._cursor().execute("SELECT outputs FROM pipeline_state").fetchall():
+            recorded.update(json.loads(outputs or "{}"))
+        return recorded
+
+    def _fingerprint(self, ref: str, recorded: dict[str, str]) -> str | None:
+        kind, _, target = ref.partition(":")
+        if kind == "file":
+            return self._file_fingerprint(Path(target))
+        if kind == "table":
+            return recorded.get(ref) or self._table_fingerprint(target)
+        raise ValueError(f"Unknown input kind: {ref}")
+
+    def _exists(self, ref: str) -> bool:
+        kind, _, target = ref.partition(":")
+        if kind == "file":
+            return Path(target).exists()
+        return self._table_exists(target)
+
+    def stage_key(self, stage: Stage) -> str:
+        recorded = self._recorded_outputs()
+        payload = {
+            "sources": {src: file_sha256(SCRIPTS_DIR / src) for src in stage.sources},
+            "args": list(stage.args),
+            "inputs": {ref: self._fingerprint(ref, recorded) for ref in stage.inputs},
+        }
+        return _sha256(json.dumps(payload, sort_keys=True).encode("utf-8"))
+
+    # -- running ----------------------------------------------------------------
+
+    def _is_current(self, stage: Stage, key: str) -> bool:
+        if stage.always or stage.name in self.force:
+            return False
+        row = self._cursor().execute("SELECT input_key FROM pipeline_state WHERE stage = ?", [stage.name]).fetchone()
+        return bool(row) and row[0] == key and all(self._exists(ref) for ref in stage.outputs)
+
+    def _record(self, stage: Stage, key: str, seconds: float) -> None:
+        outputs = {}
+        for ref in stage.outputs:
+            kind, _, target = ref.partition(":")
+            outputs[ref] = self._file_fingerprint(Path(target)) if kind == "file" else self._table_fingerprint(target)
+        self._cursor().execute(
+            "INSERT OR REPLACE INTO pipeline_state VALUES (?, ?, ?, ?, now())",
+            [stage.name, key, json.dumps(outputs), seconds],
+        )
+
+    def _run_stage(self, stage: Stage, out: _ThreadOutput) -> None:
+        result = self.results[stage.name]
+        out.local.buf = buf = io.StringIO()
+        started = time.perf_counter()
+        try:
+            key = self.stage_key(stage)
+            if self._is_current(stage, key):
+                result.status = "skipped"
+                return
+            stage.run()
+            self._record(stage, key, time.perf_counter() - started)
+            result.status = "ran"
+        except BaseException as e:  # noqa: BLE001 - reported in the summary, dependents are blocked
+            result.status = "failed"
+            result.error = f"{type(e).__name__}: {e}"
+            traceback.print_exc(file=buf)
+        finally:
+            result.seconds = time.perf_counter() - started
+            result.output = buf.getvalue()
+            out.local.buf = None
+
+    def _report(self, name: str) -> None:
+        r = self.results[name]
+        with self._lock:
+            print(f"\n==> {name}: {r.status} ({r.seconds:.1f}s)", file=sys.__stdout__)
+            if r.output:
+                print(r.output.rstrip("\n"), file=sys.__stdout__)
+            sys.__stdout__.flush()
+
+    def _schedule(self, pool: ThreadPoolExecutor, running: dict, out: _ThreadOutput) -> None:
+        """Submit every pending stage whose dependencies are done; block those behind a failure."""
+        changed = True
+        while changed:
+            changed = False
+            for name, deps in self.deps.items():
+                r = self.results[name]
+                if r.status != "pending" or name in running.values():
+                    continue
+                dep_status = {self.results[d].status for d in deps}
+                if dep_status & {"failed", "blocked"}:
+                    r.status = "blocked"
+                    changed = True
+                elif dep_status <= {"ran", "skipped"}:
+                    with self._lock:
+                        print(f"\n--> {name} started", file=sys.__stdout__)
+                    running[pool.submit(self._run_stage, self.stages[name], out)] = name
+
+    def run(self) -> bool:
+        """Run every stage whose dependencies succeeded. True when all stages ran or were skipped."""
+        out = _ThreadOutput(sys.stdout)
+        previous, sys.stdout = sys.stdout, out
+        try:
+            with ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="stage") as pool:
+                running: dict = {}
+                while True:
+                    self._schedule(pool, running, out)
+                    if not running:
+                        break
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        self._report(running.pop(fut))
+        finally:
+            sys.stdout = previous
+        return all(r.status in ("ran", "skipped") for r in self.results.values())
+
+    def summary(self) -> str:
+        lines = [f"{'stage':<16} {'status':<8} {'seconds':>8}"]
+        for name, r in self.results.items():
+            lines.append(f"{name:<16} {r.status:<8} {r.seconds:>8.1f}" + (f"  {r.error}" if r.error else ""))
+        return "\n".join(lines)
@@ -1,18 +1,132 @@
 from __future__ import annotations
 
 import argparse
-import subprocess
+import json
+import os
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
 
+import build_duckdb
+import create_analytics
+import create_search_index
+import create_tag_clean_analytics
+import download_dataset
+import stage_parquet
+from db_versions import (
+    BUILD_DB_ENV,
+    DEFAULT_GRACE_SECONDS,
+    PROCESSED_DIR,
+    new_build_path,
+    published_db_path,
+    publish,
+    seed_build,
+)
+from duckdb_settings import Settings, add_arguments, connect
+from pipeline import Pipeline, Stage
 
-def _run(backend_dir: Path, script_name: str, extra_args: list[str] | None = None) -> None:
-    script_path = backend_dir / "scripts" / script_name
-    print(f"\n==> {script_name}")
-    cmd = [sys.executable, str(script_path)]
-    if extra_args:
-        cmd.extend(extra_args)
-    subprocess.run(cmd, cwd=str(backend_dir), check=True)
+# Unpublished build of an interrupted refresh; the next run resumes it
+RUN_STATE_PATH = PROCESSED_DIR / "refresh_state.json"
+
+
+def _stages(args: argparse.Namespace) -> list[Stage]:
+    """
+    download -> stage_parquet -> build_duckdb -> analytics -> search_index
+                                                         -> tags
+    (tags reads video_dim for the /tags/videos display fields; search_index and
+    tags run side by side)
+    """
+    dl_args = ["--force-download"] if args.force_download else []
+    if args.source_dir:
+        dl_args += ["--source-dir", str(args.source_dir)]
+    build_args = ["--full"] if args.full else []
+
+    return [
+        Stage(
+            "download",
+            lambda: download_dataset.main(dl_args),
+            outputs=(f"file:{stage_parquet.RAW_CSV}",),
+            sources=("download_dataset.py",),
+            args=tuple(dl_args),
+            always=True,
+        ),
+        Stage(
+            "stage_parquet",
+            lambda: stage_parquet.main([]),
+            inputs=(f"file:{stage_parquet.RAW_CSV}",),
+            outputs=(f"file:{stage_parquet.STATE_PATH}",),
+            sources=("stage_parquet.py",),
+        ),
+        Stage(
+            "build_duckdb",
+            lambda: build_duckdb.main(build_args),
+            inputs=(f"file:{stage_parquet.STATE_PATH}",),
+            outputs=("table:trending", "table:trending_rejects", "table:ingest_watermark"),
+            sources=("build_duckdb.py", "stage_parquet.py"),
+            args=tuple(build_args),
+        ),
+        Stage(
+            "analytics",
+            lambda: create_analytics.main(build_args),
+            inputs=("table:trending",),
+            outputs=(
+                "table:video_dim",
+                "table:video_reach",
+                "table:video_stickiness",
+                "table:daily_leaderboard",
+                "table:channel_dim",
+                "table:channel_daily",
+                "table:channel_alltime",
+                "table:channel_videos",
+                "table:channel_video_stats",
+                "table:video_history",
+            ),
+            sources=("create_analytics.py", "db_objects.py"),
+            args=tuple(build_args),
+        ),
+        Stage(
+            "search_index",
+            lambda: create_search_index.main([]),
+            inputs=("table:video_dim", "table:video_stickiness"),
+            outputs=(
+                "table:search_video_grams",
+                "table:search_video_gram_df",
+                "table:search_channel_grams",
+                "table:search_channel_gram_df",
+            ),
+            sources=("create_search_index.py",),
+        ),
+        Stage(
+            "tags",
+            lambda: create_tag_clean_analytics.main([]),
+            inputs=("table:trending", "table:video_dim"),
+            outputs=(
+                "table:tag_dim",
+                "table:tag_events_clean",
+                "table:tag_monthly_clean",
+                "table:tag_monthly_by_tag",
+                "table:tag_movers_clean",
+                "table:tag_video_stats_clean",
+            ),
+            sources=("create_tag_clean_analytics.py", "db_objects.py", "../app/tag_normalize.py"),
+        ),
+    ]
+
+
+def _resumable_build() -> Path | None:
+    if not RUN_STATE_PATH.exists():
+        return None
+    state = json.loads(RUN_STATE_PATH.read_text(encoding="utf-8"))
+    path = (RUN_STATE_PATH.parent / state["build"]).resolve()
+    return path if path.exists() else None
+
+
+def _write_run_state(build_path: Path) -> None:
+    state = {
+        "build": os.path.relpath(build_path, RUN_STATE_PATH.parent).replace(os.sep, "/"),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+    }
+    RUN_STATE_PATH.write_text(json.dumps(state, indent=2), encoding="utf-8")
 
 
 def main() -> None:
@@ -22,17 +136,94 @@ def main() -> None:
         action="store_true",
         help="Force a fresh Kaggle download (ignores kagglehub cache).",
     )
+    parser.add_argument(
+        "--source-dir",
+        type=Path,
+        help="Sync the raw files from this local directory instead of kagglehub.",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Rebuild `trending` from the whole CSV instead of only the rows past each country's watermark.",
+    )
+    parser.add_argument(
+        "--grace-seconds",
+        type=float,
+        default=DEFAULT_GRACE_SECONDS,
+        help="Keep retired database builds at least this long before deleting them.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=2,
+        help="How many independent stages may run at the same time.",
+    )
+    parser.add_argument(
+        "--force",
+        action="append",
+        default=[],
+        metavar="STAGE",
+        help="Run STAGE even if its inputs are unchanged (repeatable).",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Discard the build left by an interrupted refresh instead of resuming it.",
+    )
+    add_arguments(parser)
     args = parser.parse_args()
 
-    backend_dir = Path(__file__).resolve().parents[1]  # .../backend
+    # Stages run in this process and read their settings from the environment
+    settings = Settings.resolve(args)
+    settings.export_env()
+    print(f"DuckDB settings: {settings.describe()}")
+
+    # Resume the unpublished build of a failed run: its finished stages are recorded in
+    # pipeline_state, so only the failed stage and what depends on it run again
+    build_path = None if args.restart else _resumable_build()
+    resumed = build_path is not None
+    if resumed:
+        print(f"Resuming unpublished build: {build_path}")
+    else:
+        # Build into a fresh versioned file; the API keeps serving the published one meanwhile
+        build_path = new_build_path()
+        print(f"Building new database version: {build_path}")
+        # Incremental by default: start from a copy of the published build and ingest the delta
+        seeded_from = None if args.full else seed_build(build_path)
+        if seeded_from is not None:
+            print(f"Seeded from published build: {seeded_from}")
+        _write_run_state(build_path)
 
-    dl_args = ["--force-download"] if args.force_download else None
-    _run(backend_dir, "download_dataset.py", extra_args=dl_args)
-    _run(backend_dir, "build_duckdb.py")
-    _run(backend_dir, "create_analytics.py")
-    _run(backend_dir, "create_tag_clean_analytics.py")
+    # Stages run in this process and reach the build through build_target()
+    os.environ[BUILD_DB_ENV] = str(build_path)
+    con = connect(build_path, settings)
+    try:
+        pipeline = Pipeline(
+            con, _stages(args), jobs=args.jobs, force=set(args.force), hash_hint=download_dataset.manifest_sha256
+        )
+        ok = pipeline.run()
+    finally:
+        con.close()
+
+    print(f"\n{pipeline.summary()}")
+    if not ok:
+        print(f"\nRefresh failed; {build_path.name} was not published. Rerun to resume from the failed stage.")
+        sys.exit(1)
+
+    RUN_STATE_PATH.unlink(missing_ok=True)
+    # A resumed build may hold changes from the stages that finished before the failure
+    changed = resumed or any(
+        r.status == "ran" for name, r in pipeline.results.items() if not pipeline.stages[name].always
+    )
+    published = published_db_path()
+    if not changed and published is not None and published.exists():
+        build_path.unlink(missing_ok=True)
+        Path(f"{build_path}.wal").unlink(missing_ok=True)
+        print(f"\nNo inputs changed; still serving {published.stem}.")
+        return
 
-    print("\nDone. Restart the Flask app to pick up the updated DuckDB file.")
+    manifest = publish(build_path, grace_seconds=args.grace_seconds)
+    print(f"\nPublished {manifest['version']}. The running API switches to it for new requests.")
 
 
 if __name__ == "__main__":
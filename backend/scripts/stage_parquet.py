@@ -0,0 +1,179 @@
+"""
+Convert the raw Kaggle CSV into Parquet once, so builds stop re-parsing it.
+
+Output lives in data/staging/youtube_trending_global/<sha256 prefix>/ as hive
+partitions video_trending_country=<country>/trending_month=<YYYY-MM>/, zstd
+compressed, with explicit column types. current.json next to it records the
+CSV's content hash (plus size/mtime, so an untouched file is not re-hashed);
+when the hash is unchanged the stage is skipped.
+
+Validation stays in build_duckdb.py: video_id and video_trending__date are
+kept as the raw text, and rows whose date does not parse land in
+trending_month=NULL.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+
+from download_dataset import manifest_sha256
+from duckdb_settings import Settings, add_arguments, connect
+from pipeline import file_sha256
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]  # youtube-trending-app/
+RAW_CSV = PROJECT_ROOT / "data" / "raw" / "youtube_trending_global" / "youtube_trending_videos_global.csv"
+STAGING_DIR = PROJECT_ROOT / "data" / "staging" / "youtube_trending_global"
+STATE_PATH = STAGING_DIR / "current.json"
+
+PARTITION_COLUMNS = ("video_trending_country", "trending_month")
+
+# Explicit types for the CSV columns (read as text, then try_cast, so one bad
+# value becomes NULL instead of failing the whole conversion)
+COLUMN_TYPES = {
+    "video_id": "VARCHAR",
+    "video_published_at": "TIMESTAMPTZ",
+    "video_trending__date": "VARCHAR",
+    "video_trending_country": "VARCHAR",
+    "channel_id": "VARCHAR",
+    "video_title": "VARCHAR",
+    "video_description": "VARCHAR",
+    "video_default_thumbnail": "VARCHAR",
+    "video_category_id": "BIGINT",
+    "video_tags": "VARCHAR",
+    "video_duration": "VARCHAR",
+    "video_dimension": "VARCHAR",
+    "video_definition": "VARCHAR",
+    "video_licensed_content": "BOOLEAN",
+    "video_view_count": "BIGINT",
+    "video_like_count": "BIGINT",
+    "video_comment_count": "BIGINT",
+    "channel_title": "VARCHAR",
+    "channel_description": "VARCHAR",
+    "channel_custom_url": "VARCHAR",
+    "channel_published_at": "TIMESTAMPTZ",
+    "channel_country": "VARCHAR",
+    "channel_view_count": "BIGINT",
+    "channel_subscriber_count": "BIGINT",
+    "channel_have_hidden_subscribers": "BOOLEAN",
+    "channel_video_count": "BIGINT",
+    "channel_localized_title": "VARCHAR",
+    "channel_localized_description": "VARCHAR",
+}
+
+
+def read_state() -> dict | None:
+    if not STATE_PATH.exists():
+        return None
+    return json.loads(STATE_PATH.read_text(encoding="utf-8"))
+
+
+def source_hash(csv_path: Path, state: dict | None) -> str:
+    """
+    Content hash of the CSV; reuses the one recorded here or in the download
+    manifest while size and mtime are unchanged.
+    """
+    st = csv_path.stat()
+    if state and state.get("source_size") == st.st_size and state.get("source_mtime_ns") == st.st_mtime_ns:
+        return state["sha256"]
+    return manifest_sha256(csv_path) or file_sha256(csv_path)
+
+
+def parquet_glob() -> str:
+    """Glob of the staged Parquet files (forward slashes for DuckDB)."""
+    state = read_state()
+    if not state:
+        raise FileNotFoundError(f"No staged Parquet under {STAGING_DIR}; run scripts/stage_parquet.py first")
+    return (STAGING_DIR / state["path"]).as_posix() + "/**/*.parquet"
+
+
+def read_parquet_sql(glob: str) -> str:
+    """read_parquet(...) over the staged dataset with the partition columns typed as text."""
+    return (
+        f"read_parquet('{glob}', hive_partitioning=true, "
+        "hive_types={'video_trending_country': VARCHAR, 'trending_month': VARCHAR})"
+    )
+
+
+def stage(csv_path: Path = RAW_CSV, force: bool = False, settings: Settings | None = None) -> dict:
+    """Convert csv_path to partitioned Parquet unless the current staging already matches its hash."""
+    if not csv_path.exists():
+        raise FileNotFoundError(f"Raw CSV not found at: {csv_path}")
+
+    state = read_state()
+    digest = source_hash(csv_path, state)
+    if not force and state and state["sha256"] == digest and (STAGING_DIR / state["path"]).exists():
+        print(f"Parquet staging is current ({digest[:16]}); skipping conversion")
+        return state
+
+    out_dir = STAGING_DIR / digest[:16]
+    tmp_dir = STAGING_DIR / f"{digest[:16]}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    STAGING_DIR.mkdir(parents=True, exist_ok=True)
+
+    select_cols = ",\n              ".join(
+        f"try_cast({name} AS {type_}) AS {name}" for name, type_ in COLUMN_TYPES.items()
+    )
+    columns = ", ".join(f"'{name}': 'VARCHAR'" for name in COLUMN_TYPES)
+
+    print(f"Converting {csv_path.name} -> {out_dir}")
+    con = connect(settings=settings)
+    try:
+        con.execute("PRAGMA enable_progress_bar;")
+        con.execute(
+            f"""
+            COPY (
+              SELECT
+              {select_cols},
+              strftime(try_cast(replace(video_trending__date, '.', '-') AS DATE), '%Y-%m') AS trending_month
+              FROM read_csv('{csv_path.as_posix()}', header=true, columns={{{columns}}})
+            ) TO '{tmp_dir.as_posix()}'
+            (FORMAT parquet, PARTITION_BY ({', '.join(PARTITION_COLUMNS)}), COMPRESSION zstd);
+            """
+        )
+        rows, files = con.execute(
+            f"SELECT count(*), count(DISTINCT filename) FROM {read_parquet_sql(tmp_dir.as_posix() + '/**/*.parquet')}"
+        ).fetchone()
+    finally:
+        con.close()
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+
+    st = csv_path.stat()
+    new_state = {
+        "sha256": digest,
+        "path": out_dir.name,
+        "source": csv_path.name,
+        "source_size": st.st_size,
+        "source_mtime_ns": st.st_mtime_ns,
+        "rows": rows,
+        "files": files,
+        "converted_at": datetime.now(timezone.utc).isoformat(),
+    }
+    tmp = STATE_PATH.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(new_state, indent=2), encoding="utf-8")
+    os.replace(tmp, STATE_PATH)
+
+    # Older conversions are no longer referenced
+    for old in STAGING_DIR.iterdir():
+        if old.is_dir() and old.name != out_dir.name:
+            shutil.rmtree(old, ignore_errors=True)
+
+    print(f"Staged {rows:,} rows in {files} Parquet files")
+    return new_state
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Convert the raw CSV into country/month partitioned Parquet.")
+    parser.add_argument("--force", action="store_true", help="Convert even if the CSV hash is unchanged.")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    stage(RAW_CSV, force=args.force, settings=Settings.resolve(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Shared fixtures. Run from backend/:  python -m pytest -q
+
+The pipeline scripts import each other by bare name (they are run as
+`python scripts/x.py`), so scripts/ goes on sys.path next to backend/.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "scripts"))
+
+import build_duckdb  # noqa: E402
+import db_versions  # noqa: E402
+import duckdb_settings  # noqa: E402
+import refresh_data  # noqa: E402
+import stage_parquet  # noqa: E402
+from pipeline import Pipeline  # noqa: E402
+
+from app.api import cache  # noqa: E402
+from app.db import catalog, duckdb_client  # noqa: E402
+from app.main import create_app  # noqa: E402
+
+US = "United States"
+
+
+def trending_row(video_id: str, date: str, country: str | None = US, **fields) -> dict:
+    """One raw CSV row (dates as in the dataset, e.g. 2024.01.31); unspecified columns get placeholders."""
+    n = sum(map(ord, video_id))
+    row = {
+        "video_id": video_id,
+        "video_published_at": "2023-12-01T00:00:00Z",
+        "video_trending__date": date,
+        "video_trending_country": country or "",
+        "channel_id": f"UC{n % 7:022d}",
+        "video_title": f"Title {video_id}",
+        "video_description": "desc",
+        "video_default_thumbnail": f"https://i.ytimg.com/{video_id}.jpg",
+        "video_category_id": "10",
+        "video_tags": "music,vlog",
+        "video_duration": "PT3M",
+        "video_dimension": "2d",
+        "video_definition": "hd",
+        "video_licensed_content": "True",
+        "video_view_count": str(1000 * n),
+        "video_like_count": str(10 * n),
+        "video_comment_count": str(n),
+        "channel_title": f"Channel {n % 7}",
+        "channel_description": "cdesc",
+        "channel_custom_url": f"@ch{n % 7}",
+        "channel_published_at": "2015-01-01T00:00:00Z",
+        "channel_country": "US",
+        "channel_view_count": "100000000",
+        "channel_subscriber_count": "1000000",
+        "channel_have_hidden_subscribers": "False",
+        "channel_video_count": "300",
+        "channel_localized_title": f"Channel {n % 7}",
+        "channel_localized_description": "cdesc",
+    }
+    row.update(fields)
+    return row
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """
+    Point the pipeline's data/ locations (raw CSV, Parquet staging, builds,
+    manifest, QA reports, spill directory) at a temporary directory, with
+    TRENDING_BUILD_DB set to build.duckdb there as refresh_data.py would.
+    """
+    raw_csv = tmp_path / "raw" / "trending.csv"
+    staging = tmp_path / "staging"
+    processed = tmp_path / "processed"
+    monkeypatch.setattr(stage_parquet, "RAW_CSV", raw_csv)
+    monkeypatch.setattr(stage_parquet, "STAGING_DIR", staging)
+    monkeypatch.setattr(stage_parquet, "STATE_PATH", staging / "current.json")
+    monkeypatch.setattr(build_duckdb, "RAW_CSV", raw_csv)
+    monkeypatch.setattr(build_duckdb, "QA_DIR", processed / "qa")
+    monkeypatch.setattr(db_versions, "PROCESSED_DIR", processed)
+    monkeypatch.setattr(db_versions, "BUILDS_DIR", processed / "builds")
+    monkeypatch.setattr(db_versions, "MANIFEST_PATH", processed / "current.json")
+    monkeypatch.setattr(db_versions, "LEGACY_DB_PATH", processed / "trending.duckdb")
+    monkeypatch.setenv(duckdb_settings.ENV_TEMP_DIR, str(tmp_path / "duckdb_tmp"))
+    monkeypatch.setenv(db_versions.BUILD_DB_ENV, str(processed / "build.duckdb"))
+    processed.mkdir()
+    return tmp_path
+
+
+def write_trending_csv(rows: list[dict]) -> Path:
+    """Write the raw CSV where the data_dir fixture points the pipeline."""
+    path = stage_parquet.RAW_CSV
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(stage_parquet.COLUMN_TYPES))
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+@pytest.fixture
+def api(data_dir, monkeypatch):
+    """
+    Factory: api(rows) runs the pipeline stages over those raw CSV rows, publishes
+    the build and returns a Flask test client reading it (response cache off).
+    """
+    monkeypatch.setenv("DUCKDB_MANIFEST", str(db_versions.MANIFEST_PATH))
+    monkeypatch.setenv("API_CACHE_MAX_ENTRIES", "0")
+    monkeypatch.setattr(cache, "_cache", None)
+    monkeypatch.setattr(catalog, "_catalog", None)
+
+    def make(rows: list[dict]):
+        write_trending_csv(rows)
+        build_path = Path(os.environ[db_versions.BUILD_DB_ENV])
+        args = argparse.Namespace(force_download=False, source_dir=None, full=False)
+        con = duckdb_settings.connect(build_path)
+        try:
+            pipeline = Pipeline(con, [s for s in refresh_data._stages(args) if s.name != "download"])
+            assert pipeline.run(), pipeline.summary()
+        finally:
+            con.close()
+        db_versions.publish(build_path)
+        duckdb_client.reset_pool()
+        return create_app().test_client()
+
+    yield make
+    duckdb_client.reset_pool()
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import os
+
+import build_duckdb
+from conftest import trending_row, write_trending_csv
+from db_versions import BUILD_DB_ENV
+from duckdb_settings import connect
+
+
+def _counts() -> dict[str, int]:
+    con = connect(os.environ[BUILD_DB_ENV])
+    try:
+        return {
+            "trending": con.execute("SELECT count(*) FROM trending").fetchone()[0],
+            **dict(
+                con.execute(
+                    "SELECT coalesce(video_trending_country, '<null>') || ':' || reject_reason, count(*) "
+                    "FROM trending_rejects GROUP BY 1"
+                ).fetchall()
+            ),
+        }
+    finally:
+        con.close()
+
+
+def test_incremental_ingest_does_not_duplicate_rejects(data_dir):
+    write_trending_csv(
+        [
+            *(trending_row(f"vid{i:08d}", f"2024.01.{day:02d}") for i in range(3) for day in range(1, 4)),
+            # Re-read by every incremental load: an unparseable date (here without a country
+            # either), and a country with no accepted rows, hence no watermark
+            trending_row("vid00000009", "not a date", country=None),
+            trending_row("bad id", "2024.01.02", country="Atlantis"),
+            # Before the watermark, so read by the full load only
+            trending_row("bad id", "2024.01.01"),
+        ]
+    )
+
+    build_duckdb.main([])
+    full = _counts()
+    assert full == {
+        "trending": 9,
+        "<null>:bad_trending_date": 1,
+        "Atlantis:invalid_video_id": 1,
+        "United States:invalid_video_id": 1,
+    }
+
+    for _ in range(2):
+        build_duckdb.main([])
+        assert _counts() == full
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import pytest
+from flask import Flask
+
+from app.api import cache
+from app.api.cache import ResponseCache, _cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """cache.time.monotonic(), advanced by hand."""
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _put(c: ResponseCache, key: str, generation: int = 1, body: bytes = b"{}") -> None:
+    c.put((key,), generation, body, 200, "application/json")
+
+
+def _cached(c: ResponseCache, generation: int = 1, build_id: str = "b1") -> list[str]:
+    return [key for key in "abcd" if c.get((key,), build_id, generation) is not None]
+
+
+def test_entries_expire_after_the_ttl(clock):
+    c = ResponseCache(ttl_seconds=10)
+    c.get(("a",), "b1", 1)
+    _put(c, "a")
+
+    clock[0] += 9.9
+    assert c.get(("a",), "b1", 1) is not None
+    clock[0] += 0.1
+    assert c.get(("a",), "b1", 1) is None
+    assert c.stats()["expired"] == 1
+    assert c.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted_first(clock):
+    c = ResponseCache(max_entries=2)
+    c.get(("a",), "b1", 1)
+    _put(c, "a")
+    _put(c, "b")
+    c.get(("a",), "b1", 1)  # b is now the least recently used
+    _put(c, "c")
+
+    assert _cached(c) == ["a", "c"]
+    assert c.stats()["evictions"] == 1
+
+
+def test_byte_budget_evicts_and_skips_oversized_bodies(clock):
+    c = ResponseCache(max_bytes=100)
+    c.get(("a",), "b1", 1)
+    _put(c, "a", body=b"x" * 60)
+    _put(c, "b", body=b"x" * 30)
+    _put(c, "c", body=b"x" * 30)  # over budget: a goes
+    _put(c, "d", body=b"x" * 200)  # larger than the whole cache: not stored
+
+    assert _cached(c) == ["b", "c"]
+    assert c.stats()["bytes"] == 62
+
+
+def test_newer_build_invalidates_and_older_one_does_not_flip_back(clock):
+    c = ResponseCache()
+    c.get(("a",), "b1", 1)
+    _put(c, "a")
+
+    assert c.get(("a",), "b2", 2) is None
+    assert c.stats()["invalidations"] == 1
+    _put(c, "a", generation=2, body=b"new")
+
+    # A request that picked up the previous build before the switch
+    assert c.get(("a",), "b1", 1) is None
+    _put(c, "a", generation=1, body=b"old")
+    stats = c.stats()
+    assert (stats["build_id"], stats["generation"], stats["invalidations"]) == ("b2", 2, 1)
+    assert c.get(("a",), "b2", 2).body == b"new"
+
+
+@pytest.mark.parametrize(
+    "first, second, same",
+    [
+        ("/api/x?a=1&b=2", "/api/x?b=2&a=1", True),
+        ("/api/x?date=2024-01-01", "/api/x?date=2024-01-01%20", False),
+        ("/api/x?date=", "/api/x", False),
+        ("/api/x?limit=5&limit=6", "/api/x?limit=6&limit=5", False),
+        ("/api/x?a=1", "/api/y?a=1", False),
+    ],
+)
+def test_key_is_built_from_the_raw_query_values(first, second, same):
+    app = Flask(__name__)
+    keys = []
+    for url in (first, second):
+        with app.test_request_context(url):
+            keys.append(_cache_key())
+
+    assert (keys[0] == keys[1]) is same
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import duckdb
+import pytest
+
+from app.db.catalog import Catalog, _load_rows
+
+
+@pytest.fixture
+def con():
+    """A build from before the catalog table: trending only."""
+    con = duckdb.connect()
+    con.execute(
+        """
+        CREATE TABLE trending AS
+        SELECT * FROM (VALUES
+          ('Japan', DATE '2024-01-31'),
+          ('Japan', DATE '2024-02-01'),
+          ('Brazil', DATE '2024-02-01'),
+          (NULL, DATE '2024-02-02')
+        ) t(video_trending_country, video_trending_date);
+        """
+    )
+    yield con
+    con.close()
+
+
+def test_dates_and_months_come_from_trending(con):
+    catalog = Catalog("old", _load_rows(con))
+
+    assert catalog.values("Japan", "date") == ["2024-02-01", "2024-01-31"]
+    assert catalog.values("Japan", "month") == ["2024-02-01", "2024-01-01"]
+    assert catalog.latest("Brazil", "date") == "2024-02-01"
+    # No tag tables in this build: no tag months, and no error
+    assert catalog.values("Japan", "tag_month") == []
+    assert catalog.countries() == ["Brazil", "Japan"]
+
+
+def test_tag_months_per_country(con):
+    con.execute(
+        """
+        CREATE TABLE tag_monthly_clean AS
+        SELECT * FROM (VALUES ('Japan', DATE '2024-01-01'), ('Brazil', DATE '2024-02-01')) t(country, month);
+        """
+    )
+    catalog = Catalog("old", _load_rows(con))
+
+    assert catalog.values("Japan", "tag_month") == ["2024-01-01"]
+    assert catalog.values("Brazil", "tag_month") == ["2024-02-01"]
+
+
+def test_us_only_tag_months_of_older_builds(con):
+    con.execute("CREATE TABLE v_us_tag_months_clean AS SELECT '2024-01-01' AS month;")
+
+    assert Catalog("old", _load_rows(con)).values("United States", "tag_month") == ["2024-01-01"]
+
+
+def test_catalog_table_wins(con):
+    con.execute("CREATE TABLE catalog AS SELECT 'Japan' AS country, 'date' AS kind, '2024-03-01' AS value;")
+
+    assert _load_rows(con) == [("Japan", "date", "2024-03-01")]
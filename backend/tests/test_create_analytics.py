@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import argparse
+import os
+
+import create_analytics
+import refresh_data
+from conftest import trending_row, write_trending_csv
+from db_versions import BUILD_DB_ENV
+from duckdb_settings import connect
+from pipeline import Pipeline
+
+
+def _run(con) -> None:
+    args = argparse.Namespace(force_download=False, source_dir=None, full=False)
+    stages = [s for s in refresh_data._stages(args) if s.name in ("stage_parquet", "build_duckdb", "analytics")]
+    pipeline = Pipeline(con, stages)
+    assert pipeline.run(), pipeline.summary()
+
+
+def test_incremental_build_matches_a_full_rebuild(data_dir, monkeypatch):
+    full_builds = []
+    build_full = create_analytics._build_full
+    monkeypatch.setattr(create_analytics, "_build_full", lambda con: (full_builds.append(1), build_full(con)))
+    rows = [trending_row(f"vid{i:08d}", f"2024.01.{day:02d}") for i in range(5) for day in range(1, 4)]
+    rows += [trending_row("vid00000009", "2024.01.02", country=None)]
+    write_trending_csv(rows)
+    con = connect(os.environ[BUILD_DB_ENV])
+    try:
+        _run(con)
+        assert len(full_builds) == 1
+
+        # The boundary day changes (a video drops out, another comes in), a later day
+        # and a new country arrive, and an earlier video trends again
+        rows = [r for r in rows if not (r["video_id"] == "vid00000004" and r["video_trending__date"] == "2024.01.03")]
+        rows += [
+            trending_row("vid00000005", "2024.01.03", video_view_count="999999999"),
+            trending_row("vid00000000", "2024.01.04"),
+            trending_row("vid00000005", "2024.01.04", channel_id="UC_new"),
+            trending_row("vid00000001", "2024.01.02", country="Japan"),
+            trending_row("vid00000009", "2024.01.04", country="Japan"),
+        ]
+        write_trending_csv(rows)
+        _run(con)
+        assert len(full_builds) == 1
+
+        assert create_analytics.verify(con) == {table: 0 for table in create_analytics.VERIFY_SQL}
+        # A video that no longer trends on a day leaves that day's leaderboard
+        assert con.execute(
+            "SELECT count(*) FROM daily_leaderboard WHERE video_id = 'vid00000004' AND date = DATE '2024-01-03'"
+        ).fetchone() == (0,)
+        assert con.execute(
+            "SELECT value FROM catalog WHERE country = 'Japan' AND kind = 'date' ORDER BY value"
+        ).fetchall() == [("2024-01-02",), ("2024-01-04",)]
+    finally:
+        con.close()
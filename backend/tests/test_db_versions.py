@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import create_search_index
+import pytest
+from db_versions import BUILD_DB_ENV, build_target, new_build_path, publish, published_db_path
+from duckdb_settings import connect
+
+
+def _tables(path) -> set[str]:
+    con = connect(path, read_only=True)
+    try:
+        return {r[0] for r in con.execute("SELECT table_name FROM duckdb_tables()").fetchall()}
+    finally:
+        con.close()
+
+
+@pytest.fixture
+def published(data_dir, monkeypatch):
+    """A published build holding what create_search_index.py reads, with no TRENDING_BUILD_DB set."""
+    monkeypatch.delenv(BUILD_DB_ENV)
+    path = new_build_path()
+    con = connect(path)
+    con.execute(
+        """
+        CREATE TABLE video_dim AS
+        SELECT 'vid00000001' AS video_id, 'Cat video' AS video_title, 'UC1' AS channel_id, 'Cats' AS channel_title;
+        CREATE TABLE video_stickiness AS
+        SELECT 'United States' AS country, 'vid00000001' AS video_id, 3 AS days_trended, DATE '2024-01-03' AS last_trending;
+        """
+    )
+    con.close()
+    publish(path)
+    return path.resolve()
+
+
+def test_script_run_by_hand_publishes_a_new_build(published):
+    create_search_index.main([])
+
+    current = published_db_path()
+    assert current != published
+    assert {"search_video_grams", "search_channel_grams", "video_dim"} <= _tables(current)
+    # The build the API was serving is left as it was
+    assert "search_video_grams" not in _tables(published)
+
+
+def test_failed_run_discards_its_build(published):
+    with pytest.raises(RuntimeError):
+        with build_target() as path:
+            connect(path).close()
+            raise RuntimeError("stage failed")
+
+    assert published_db_path() == published
+    assert not path.exists()
+
+
+def test_refresh_build_is_left_to_refresh_data(data_dir):
+    with build_target() as path:
+        pass
+
+    assert path == (data_dir / "processed" / "build.duckdb").resolve()
+    assert published_db_path() is None
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import db_versions
+import duckdb
+import pytest
+from db_versions import new_build_path, publish
+from duckdb_settings import connect
+
+from app.db import duckdb_client
+from app.db.duckdb_client import get_conn, get_pool
+
+
+@pytest.fixture
+def pool(data_dir, monkeypatch):
+    """The API's pool over a published build holding one table."""
+    path = new_build_path()
+    con = connect(path)
+    con.execute("CREATE TABLE t AS SELECT 1 AS x;")
+    con.close()
+    publish(path)
+    monkeypatch.setenv("DUCKDB_MANIFEST", str(db_versions.MANIFEST_PATH))
+    duckdb_client.reset_pool()
+    yield get_pool()
+    duckdb_client.reset_pool()
+
+
+def test_request_errors_keep_the_cursor(pool):
+    with pytest.raises(LookupError):
+        with get_conn() as con:
+            con.execute("SELECT x FROM t").fetchone()
+            raise LookupError("404")
+
+    with get_conn() as con:
+        assert con.execute("SELECT x FROM t").fetchone() == (1,)
+    assert (pool.stats()["opened"], pool.stats()["reused"], pool.stats()["discarded"]) == (1, 1, 0)
+
+
+def test_database_errors_discard_the_cursor(pool):
+    with pytest.raises(duckdb.Error):
+        with get_conn() as con:
+            con.execute("SELECT missing FROM t")
+
+    assert (pool.stats()["idle"], pool.stats()["discarded"]) == (0, 1)
+
+
+def test_writes_are_rejected(pool):
+    with pytest.raises(ValueError):
+        with get_conn(read_only=False):
+            pass
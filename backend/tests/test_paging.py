@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import base64
+import json
+
+import duckdb
+import pytest
+from conftest import trending_row
+
+from app.api.paging import Keyset
+from app.api.serialize import fetch_rows
+
+KEYSET = Keyset(("score", "DESC"), ("id", "ASC"))
+
+
+@pytest.fixture
+def con():
+    """30 rows whose scores tie in runs of 4, so pages split groups of equal sort keys."""
+    con = duckdb.connect()
+    con.execute("CREATE TABLE t AS SELECT 'id-' || lpad(CAST(i AS VARCHAR), 2, '0') AS id, i // 4 AS score FROM range(30) r(i);")
+    yield con
+    con.close()
+
+
+def _token(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def test_walking_every_page_gives_the_unpaged_list(con):
+    unpaged = [{"id": i, "score": s} for i, s in con.execute("SELECT id, score FROM t ORDER BY score DESC, id").fetchall()]
+
+    walked, token = [], None
+    while True:
+        sql, params = KEYSET.paginate("SELECT id, score FROM t", [], KEYSET.parse(token), 3)
+        rows = fetch_rows(con.execute(sql, params), KEYSET.columns)
+        walked += json.loads(rows.json)
+        token = KEYSET.next_cursor(rows, 3)
+        if token is None:
+            break
+
+    assert walked == unpaged
+    # Ties are broken by id: the first page ends inside the score-7 group
+    assert [r["id"] for r in walked[:3]] == ["id-28", "id-29", "id-24"]
+
+
+def test_cursor_round_trips_the_last_rows_keys(con):
+    sql, params = KEYSET.paginate("SELECT id, score FROM t", [], None, 5)
+    rows = fetch_rows(con.execute(sql, params), KEYSET.columns)
+
+    assert rows.last == [6, "id-26"]
+    assert KEYSET.parse(KEYSET.next_cursor(rows, 5)) == [6, "id-26"]
+    assert KEYSET.parse(_token([0.5, "vidéo"])) == [0.5, "vidéo"]
+
+
+def test_short_page_has_no_next_cursor(con):
+    sql, params = KEYSET.paginate("SELECT id, score FROM t", [], [0, "id-01"], 5)
+    rows = fetch_rows(con.execute(sql, params), KEYSET.columns)
+
+    assert [r["id"] for r in json.loads(rows.json)] == ["id-02", "id-03"]
+    assert KEYSET.next_cursor(rows, 5) is None
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "%%%",
+        base64.urlsafe_b64encode(b"not json").decode(),
+        base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+        _token({"score": 1, "id": "x"}),
+        _token([1]),
+        _token([1, "x", 2]),
+        _token([True, "x"]),
+        _token([None, "x"]),
+        _token([[1], "x"]),
+    ],
+)
+def test_tampered_cursors_are_rejected(token):
+    with pytest.raises(ValueError):
+        KEYSET.parse(token)
+
+
+def test_no_cursor_starts_at_the_first_page():
+    assert KEYSET.parse(None) is None
+    assert KEYSET.parse("") is None
+
+
+@pytest.fixture
+def client(api):
+    """One US day of 9 videos, views tied in pairs, all on one channel."""
+    rows = [
+        trending_row(f"vid{i:08d}", "2024.01.05", video_view_count=str(1000 * (i // 2)), channel_id="UCpaging")
+        for i in range(9)
+    ]
+    return api(rows)
+
+
+def _walk(client, url: str, key: str, limit: int) -> list[dict]:
+    items, cursor = [], None
+    while True:
+        page = client.get(url, query_string={"limit": limit, **({"cursor": cursor} if cursor else {})}).get_json()
+        items += page[key]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items
+
+
+@pytest.mark.parametrize(
+    "url, key", [("/api/us/trending", "results"), ("/api/us/channel/UCpaging", "videos")]
+)
+def test_route_pages_walk_to_the_unpaged_list(client, url, key):
+    unpaged = client.get(url).get_json()
+    assert unpaged["count"] == 9 and unpaged["next_cursor"] is None
+
+    assert _walk(client, url, key, 2) == unpaged[key]
+
+
+def test_route_ties_are_broken_by_video_id(client):
+    results = client.get("/api/us/trending").get_json()["results"]
+
+    assert [r["video_id"] for r in results[:4]] == ["vid00000008", "vid00000006", "vid00000007", "vid00000004"]
+
+
+@pytest.mark.parametrize(
+    "url, key", [("/api/us/trending", "results"), ("/api/us/channel/UCpaging", "videos")]
+)
+def test_ndjson_streams_the_same_rows(client, url, key):
+    unpaged = client.get(url).get_json()[key]
+
+    resp = client.get(url, query_string={"format": "ndjson"})
+    assert resp.mimetype == "application/x-ndjson"
+    assert [json.loads(line) for line in resp.get_data(as_text=True).splitlines()] == unpaged
+
+    # A limit and a cursor apply to streams as well
+    first = client.get(url, query_string={"limit": 4}).get_json()
+    resp = client.get(url, query_string={"format": "ndjson", "cursor": first["next_cursor"]})
+    assert [json.loads(line) for line in resp.get_data(as_text=True).splitlines()] == unpaged[4:]
+
+
+@pytest.mark.parametrize("cursor", ["%%%", _token(["x"]), _token([1, 2])])
+def test_route_rejects_tampered_cursors(client, cursor):
+    resp = client.get("/api/us/trending", query_string={"cursor": cursor})
+
+    assert resp.status_code == 400
+    assert resp.get_json() == {"error": "invalid cursor"}
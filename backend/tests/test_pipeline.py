@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import argparse
+import os
+
+import refresh_data
+from conftest import trending_row, write_trending_csv
+from db_versions import BUILD_DB_ENV
+from duckdb_settings import connect
+from pipeline import Pipeline
+
+VIDEO_DIM_INDEXES = {"video_dim_video_id_idx", "video_dim_channel_id_idx"}
+
+
+def _stages(*names: str):
+    args = argparse.Namespace(force_download=False, source_dir=None, full=False)
+    return [s for s in refresh_data._stages(args) if s.name in names]
+
+
+def _run(con, force=()) -> dict[str, str]:
+    pipeline = Pipeline(con, _stages("stage_parquet", "build_duckdb", "analytics", "search_index"), force=set(force))
+    assert pipeline.run(), pipeline.summary()
+    return {name: r.status for name, r in pipeline.results.items()}
+
+
+def test_forced_analytics_keeps_video_dim_indexes(data_dir):
+    write_trending_csv(
+        [trending_row(f"vid{i:08d}", f"2024.01.{day:02d}") for i in range(6) for day in range(1, 4)]
+    )
+    con = connect(os.environ[BUILD_DB_ENV])
+    try:
+        assert set(_run(con).values()) == {"ran"}
+
+        # analytics drops and recreates video_dim with the same content, so search_index is skipped
+        statuses = _run(con, force={"analytics"})
+        assert statuses == {
+            "stage_parquet": "skipped",
+            "build_duckdb": "skipped",
+            "analytics": "ran",
+            "search_index": "skipped",
+        }
+
+        indexes = {
+            r[0] for r in con.execute("SELECT index_name FROM duckdb_indexes() WHERE table_name = 'video_dim'").fetchall()
+        }
+        assert indexes == VIDEO_DIM_INDEXES
+    finally:
+        con.close()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import os
+
+import create_search_index
+import pytest
+from conftest import US, trending_row
+from db_versions import BUILD_DB_ENV
+from duckdb_settings import connect
+
+from app.api import search
+
+N_VIDEOS = 30
+
+
+@pytest.fixture
+def search_db(data_dir, monkeypatch):
+    """
+    video_dim / video_stickiness for N_VIDEOS "Funny cat video <i>" titles (video i
+    trended i days in the US, on channel i % 3) and the search index over them,
+    with MAX_CANDIDATES lowered so the common queries below exceed it.
+    """
+    con = connect(os.environ[BUILD_DB_ENV])
+    con.execute(
+        f"""
+        CREATE TABLE video_dim AS
+        SELECT
+          printf('vid%08d', i) AS video_id,
+          'Funny cat video ' || i AS video_title,
+          'UC' || (i % 3) AS channel_id,
+          'Cat channel ' || (i % 3) AS channel_title
+        FROM range(1, {N_VIDEOS + 1}) r(i);
+        """
+    )
+    con.execute(
+        """
+        CREATE TABLE video_stickiness AS
+        SELECT
+          'United States' AS country,
+          video_id,
+          CAST(substring(video_title, 17) AS INTEGER) AS days_trended,
+          DATE '2024-01-31' AS last_trending
+        FROM video_dim;
+        """
+    )
+    con.close()
+    create_search_index.main([])
+
+    monkeypatch.setattr(search, "MAX_CANDIDATES", 5)
+    con = connect(os.environ[BUILD_DB_ENV])
+    yield con
+    con.close()
+
+
+def _videos(*numbers: int) -> set[str]:
+    return {f"vid{i:08d}" for i in numbers}
+
+
+def test_common_query_takes_the_index_path(search_db):
+    # Every title matches: the most trended MAX_CANDIDATES come back instead of "scan everything"
+    assert set(search.search_candidates(search_db, "video", "cat video", US)) == _videos(30, 29, 28, 27, 26)
+    assert set(search.search_candidates(search_db, "video", "fu", US)) == _videos(30, 29, 28, 27, 26)
+    # 11 titles have "video 2"; the cut-off is on the rarest trigram, the others only narrow it
+    assert set(search.search_candidates(search_db, "video", "video 2", US)) == _videos(29, 28, 27, 26, 25)
+    assert set(search.search_candidates(search_db, "channel", "channel", US)) == {"UC0", "UC1", "UC2"}
+
+
+def test_selective_query_returns_every_candidate(search_db):
+    assert set(search.search_candidates(search_db, "video", "video 3", US)) == _videos(3, 30)
+    assert set(search.search_candidates(search_db, "video", "video 7", US)) == _videos(7)
+    assert set(search.search_candidates(search_db, "video", "UC1", US)) == set()
+    assert set(search.search_candidates(search_db, "channel", "uc1", US)) == {"UC1"}
+    assert search.search_candidates(search_db, "video", "dog", US) == []
+    # Two characters: the range of trigrams starting with them
+    assert search.search_candidates(search_db, "channel", "c0", US) == ["UC0"]
+    assert search.search_candidates(search_db, "video", "zz", US) == []
+
+
+def test_candidates_feed_the_id_lookup(search_db):
+    ids = search.search_candidates(search_db, "video", "cat video", US)
+    source, params = search.candidate_rows("video_dim", "video_id", ids)
+    rows = search_db.execute(f"WITH d AS {source} SELECT video_title FROM d ORDER BY video_id", params).fetchall()
+    assert [r[0] for r in rows] == [f"Funny cat video {i}" for i in range(26, 31)]
+
+
+def test_cut_off_widens_past_false_positives(monkeypatch):
+    """The most trended docs with the rarest trigram lack another one; the window widens past them."""
+    con = connect()
+    postings = {"aaa": range(1, 11), "a b": range(1, 11), "bbb": range(8, 11)}
+    df = {"aaa": 10, "bbb": 11, "a b": 50, "aa ": 100, " bb": 100}
+    con.execute("CREATE TABLE search_video_grams (gram VARCHAR, country VARCHAR, doc INTEGER, video_id VARCHAR);")
+    con.executemany(
+        "INSERT INTO search_video_grams VALUES (?, ?, ?, ?)",
+        [(gram, US, doc, f"vid{doc:08d}") for gram, docs in postings.items() for doc in docs],
+    )
+    con.execute("CREATE TABLE search_video_gram_df (gram VARCHAR, country VARCHAR, n BIGINT);")
+    con.executemany("INSERT INTO search_video_gram_df VALUES (?, ?, ?)", [(g, US, n) for g, n in df.items()])
+    monkeypatch.setattr(search, "MAX_CANDIDATES", 2)
+    try:
+        assert search.search_candidates(con, "video", "aaa bbb", US) == ["vid00000008", "vid00000009"]
+    finally:
+        con.close()
+
+
+def test_small_country_matches_outside_the_global_top(api):
+    """The cap is taken per country: Japan's 10 matches trail Brazil's 390 more trended ones."""
+    rows = [
+        trending_row(f"br{i:09d}", f"2024.01.{day:02d}", "Brazil", video_title=f"Music video {i}")
+        for i in range(390)
+        for day in range(1, 4)
+    ]
+    rows += [trending_row(f"jp{i:09d}", "2024.01.01", "Japan", video_title=f"Music video {i}") for i in range(10)]
+    client = api(rows)
+
+    japan = client.get("/api/japan/search/videos?q=music&scope=all").get_json()
+    assert {r["video_id"] for r in japan["results"]} == {f"jp{i:09d}" for i in range(10)}
+
+    brazil = client.get("/api/brazil/search/videos?q=music&scope=all&limit=50").get_json()
+    assert brazil["count"] == 50
+    assert all(r["video_id"].startswith("br") for r in brazil["results"])
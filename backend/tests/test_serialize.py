@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import duckdb
+import pytest
+from flask import jsonify
+
+from app.api.serialize import fetch_rows, json_response
+from app.main import create_app
+
+CASES = {
+    # Bulk (Arrow) path: VARCHAR, integers, floats, booleans
+    "escaping": """
+        SELECT 'Título "quoted" \\ 日本語 😀 %s ' || i AS title, i AS n, i % 2 = 0 AS even
+        FROM range(5) r(i)
+    """,
+    "floats_and_nulls": """
+        SELECT * FROM (VALUES
+          (CAST('NaN' AS DOUBLE), NULL::VARCHAR, NULL::BIGINT),
+          (CAST('inf' AS DOUBLE), 'x', 1),
+          (CAST('-inf' AS DOUBLE), NULL, NULL),
+          (1.0 / 3, 'y', -9223372036854775808),
+          (NULL, 'z', 0),
+          (CAST(0.1 AS FLOAT), '', 2)
+        ) t(ratio, label, n)
+    """,
+    "hugeint": "SELECT sum(i) OVER () AS total, CAST(i AS HUGEINT) * 170141183460469231731687303715884105 AS big FROM range(3) r(i)",
+    # Per-value fallback: dates, timestamps, decimals, lists
+    "dates": """
+        SELECT DATE '2024-01-31' + CAST(i AS INTEGER) AS day, TIMESTAMP '2024-01-31 12:34:56' AS at, NULL::DATE AS missing
+        FROM range(3) r(i)
+    """,
+    "decimals": "SELECT CAST(i AS DECIMAL(18, 3)) / 8 AS amount, 'Zürich' AS city FROM range(4) r(i)",
+    "lists": "SELECT [i, NULL, i * 2] AS xs, {'b': 'ü', 'a': i} AS s FROM range(2) r(i)",
+    "duplicate_names": "SELECT 1 AS a, 2 AS b, 3 AS a",
+    "empty": "SELECT 1 AS a WHERE false",
+}
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def con():
+    con = duckdb.connect()
+    yield con
+    con.close()
+
+
+def _jsonify(con, sql: str, **extra) -> bytes:
+    """The route bodies before fetch_rows(): a list of row dicts through jsonify()."""
+    cur = con.execute(sql)
+    cols = [c[0] for c in cur.description]
+    rows = [dict(zip(cols, row)) for row in cur.fetchall()]
+    return jsonify({"count": len(rows), "results": rows, **extra}).get_data()
+
+
+@pytest.mark.parametrize("sql", CASES.values(), ids=CASES.keys())
+def test_body_is_byte_identical_to_jsonify(app, con, sql):
+    rows = fetch_rows(con.execute(sql))
+    body = json_response({"count": len(rows), "results": rows, "meta": {"note": "ß", "rows": []}}).get_data()
+
+    assert body == _jsonify(con, sql, meta={"note": "ß", "rows": []})
+
+
+def test_hidden_columns_are_left_out_and_returned_last(app, con):
+    sql = "SELECT i AS n, 'k' || i AS cursor_key FROM range(3) r(i)"
+    rows = fetch_rows(con.execute(sql), hidden=("cursor_key",))
+
+    assert rows.last == ["k2"]
+    assert json_response({"count": len(rows), "results": rows}).get_data() == _jsonify(
+        con, "SELECT i AS n FROM range(3) r(i)"
+    )
+
+
+def test_debug_provider_output_is_unchanged(con):
+    app = create_app()
+    app.json.compact = False
+    with app.app_context():
+        rows = fetch_rows(con.execute(CASES["decimals"]))
+        body = json_response({"count": len(rows), "results": rows}, status=201)
+
+        assert body.status_code == 201
+        assert body.get_data() == _jsonify(con, CASES["decimals"])
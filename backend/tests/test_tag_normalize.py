@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import duckdb
+import pyarrow as pa
+import pytest
+
+from app.tag_normalize import explode_tags, normalize_tag, normalize_tags
+
+# raw tag -> cleaned tag, None when the cleaned tag is dropped
+SQL_RULES = {
+    # Rules the pipeline's SQL cleaning already applied
+    "MUSIC": "music",
+    "#Travel": "travel",
+    "line\nbreak": "line break",
+    '"news': "news",
+    "a": None,
+    "x" * 81: None,
+    "YT:cc=on": None,
+    "https://t.co/x": None,
+    "www.example.com": None,
+    "@creator": None,
+    "": None,
+    '""': None,
+    # Inside a tag nothing is stripped
+    "vlog#2": "vlog#2",
+    'rock "n" roll': 'rock "n" roll',
+    # Only ASCII whitespace is collapsed; lowercasing is Arrow's (no final sigma)
+    "non\u00a0breaking": "non\u00a0breaking",
+    "ΟΔΟΣ": "οδοσ",
+    "Straße": "straße",
+}
+
+# raw tag -> (shared normalizer, pipeline SQL). The SQL rewrote only the first
+# match of each pattern: it kept the closing quote, a space after '#' and a
+# second whitespace run. The shared rules strip every '#' and '"' at the ends,
+# with the spaces next to them, and collapse every run.
+CHANGED = {
+    "  Lo-Fi    Beats\t": ("lo-fi beats", "lo-fi beats\t"),
+    '"news"': ("news", 'news"'),
+    '" news "': ("news", ' news "'),
+    "## #vlog": ("vlog", " #vlog"),
+    '# "Quoted Tag" ': ("quoted tag", ' "quoted tag'),
+}
+
+GOLDEN = {**SQL_RULES, **{raw: new for raw, (new, _) in CHANGED.items()}}
+
+# The tag_events_clean cleaning and filter before the shared normalizer
+LEGACY_SQL = r"""
+    WITH cleaned AS (
+      SELECT
+        tag_raw,
+        regexp_replace(
+          regexp_replace(
+            regexp_replace(lower(trim(tag_raw)), '^#+', ''),
+            '\s+', ' '
+          ),
+          '(^"+|"+$)', ''
+        ) AS tag
+      FROM unnest(?) t(tag_raw)
+    )
+    SELECT tag_raw, tag
+    FROM cleaned
+    WHERE tag IS NOT NULL
+      AND tag <> ''
+      AND length(tag) >= 2
+      AND length(tag) <= 80
+      AND tag NOT LIKE 'yt:%'
+      AND tag NOT LIKE '%http%'
+      AND tag NOT LIKE '%https%'
+      AND tag NOT LIKE '%www.%'
+      AND tag NOT LIKE '%@%'
+"""
+
+
+@pytest.mark.parametrize("raw, expected", GOLDEN.items())
+def test_golden_values(raw, expected):
+    batch = pa.record_batch({"video_id": ["v"], "video_tags": pa.array([raw], pa.string())})
+    exploded = explode_tags(batch).column("tag").to_pylist()
+    assert exploded == ([] if expected is None else [expected])
+    if expected is not None:
+        assert normalize_tag(raw) == expected
+
+
+def test_pipeline_sql_agrees_except_for_the_changed_rules():
+    con = duckdb.connect()
+    try:
+        legacy = dict(con.execute(LEGACY_SQL, [list(GOLDEN)]).fetchall())
+    finally:
+        con.close()
+
+    assert {raw: legacy.get(raw) for raw in SQL_RULES} == SQL_RULES
+    assert {raw: legacy.get(raw) for raw in CHANGED} == {raw: old for raw, (_, old) in CHANGED.items()}
+
+
+def test_batch_keeps_nulls_and_order():
+    assert normalize_tags(pa.array(["#B", None, " a "])).to_pylist() == ["b", None, "a"]
+
+
+def test_exploded_tags_match_api_lookup_keys():
+    # Raw video_tags values as they come in the dataset: comma-separated, messy
+    batch = pa.record_batch(
+        {
+            "video_id": ["v1", "v2", "v3"],
+            "video_tags": ['#Travel,"Lo-Fi  Beats" , VLOG', "travel vlog,##vlog, yt:cc=on", None],
+        }
+    )
+    exploded = explode_tags(batch)
+    assert exploded.column("video_id").to_pylist() == ["v1", "v1", "v1", "v2", "v2"]
+    stored = set(exploded.column("tag").to_pylist())
+    assert stored == {"travel", "lo-fi beats", "vlog", "travel vlog"}
+
+    # What users type into ?tag= finds the stored key
+    for typed, key in {
+        "Travel": "travel",
+        "#travel": "travel",
+        "lo-fi beats": "lo-fi beats",
+        '"Lo-Fi Beats"': "lo-fi beats",
+        "  #VLOG ": "vlog",
+        "Travel   Vlog": "travel vlog",
+    }.items():
+        assert normalize_tag(typed) == key
+        assert key in stored